@@ -1,8 +1,19 @@
 {% macro generate_person_id(column) %}
+    {{ return(adapter.dispatch('generate_person_id')(column)) }}
+{% endmacro %}
+
+{% macro default__generate_person_id(column) %}
     {#-
     Generates a deterministic 14-digit numeric person_id from a UUID string.
     Uses MD5_NUMBER_LOWER64 constrained to the range 10^13..10^14-1,
-    guaranteeing exactly 14 digits and zero collisions for up to ~5M persons.
+    guaranteeing exactly 14 digits. Collisions are unlikely but not impossible,
+    so base models take person_id from int_person_key_registry, which assigns
+    this hash once per UUID and rehashes the rare collision.
     -#}
     ABS(MOD(MD5_NUMBER_LOWER64({{ column }}), 9 * POWER(10, 13)::NUMBER)) + POWER(10, 13)::NUMBER
-{% endmacro %}
\ No newline at end of file
+{% endmacro %}
+
+{% macro duckdb__generate_person_id(column) %}
+    {#- Local benchmark equivalent; md5_number_lower returns the low 64 bits as UBIGINT -#}
+    (md5_number_lower({{ column }}) % 90000000000000)::BIGINT + 10000000000000
+{% endmacro %}
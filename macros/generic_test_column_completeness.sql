@@ -1,4 +1,6 @@
-{% test column_completeness(model, column_name, tolerance_percent=1.0) %}
+{% test column_completeness(model, column_name, tolerance_percent=1.0, sample_size=0,
+                            sample_percent=none, sample_rows=none, sample_method='bernoulli', confidence_z=1.96,
+                            incremental_window=false, window_column='lds_start_date_time', window_lookback_days=none, full_sweep_weekday=none) %}
 
     {#-
         Generic test to check column completeness with tolerance threshold.
@@ -6,7 +8,26 @@
         Checks that the percentage of NULL values in a column does not exceed tolerance_percent.
         Fails if NULL percentage exceeds tolerance_percent.
         
+        The model is scanned once. A failing test returns a single summary row
+        (total_rows, null_count, null_percentage, tolerance_threshold) rather than
+        every NULL row; the reported failure count is still null_count (fail_calc).
+        Set sample_size to also return up to that many NULL rows, each carrying the
+        summary columns. With store_failures: true the summary row is what lands in
+        the test_audit schema.
+        
+        Sampled mode (sample_percent or sample_rows, or the test_sample_percent
+        var): the NULL rate is measured on a TABLESAMPLE of the model, and the test
+        fails only when the Wilson confidence interval (confidence_z, default 1.96
+        for 95%) lies entirely above tolerance. See test_sample_clause.
+        
+        Incremental window mode (incremental_window: true, for the stable models):
+        only the latest batch of rows is tested, selected by the run watermark or
+        window_lookback_days, with a scheduled full sweep. See test_window_predicate.
+        The window column's own completeness is always checked in full, as the
+        window predicate would drop its NULL rows.
+        
         Default tolerance: 1.0%
+        Default sample_size: 0 (summary row only)
         sk_patient_id should use tolerance_percent=5.0
         
         Usage:
@@ -19,38 +40,68 @@
               tests:
                 - column_completeness:
                     tolerance_percent: 5.0
+
+            - name: person_id
+              tests:
+                - column_completeness:
+                    arguments:
+                      tolerance_percent: 1.0
+                      sample_size: 20
+                    config:
+                      store_failures: true
     -#}
 
+    {{ config(fail_calc='coalesce(max(null_count), 0)') }}
+    {%- set sample = test_sample_clause(sample_percent, sample_rows, sample_method) | trim %}
+    {%- set windowed = incremental_window and column_name | lower != window_column | lower %}
+    {%- set window = test_window_predicate(model, windowed, window_column, window_lookback_days, full_sweep_weekday) | trim %}
+
     with stats as (
         select
             count(*) as total_rows,
-            sum(case when {{ column_name }} is null then 1 else 0 end) as null_count,
-            {{ tolerance_percent }} as tolerance_threshold
-        from {{ model }}
+            sum(case when {{ column_name }} is null then 1 else 0 end) as null_count
+        from {{ model }} {{ sample }}
+        {%- if window %}
+        where {{ window }}
+        {%- endif %}
     ),
-    null_percentage as (
+    summary as (
         select
             total_rows,
             null_count,
-            tolerance_threshold,
-            case 
-                when total_rows > 0 
-                then 100.0 * null_count / total_rows 
-                else 0 
-            end as null_percentage
+            round(100.0 * null_count / total_rows, 4) as null_percentage,
+            {%- if sample %}
+            round({{ failure_rate_bound('null_count', 'total_rows', confidence_z, 'lower') }}, 4) as null_percentage_lower,
+            round({{ failure_rate_bound('null_count', 'total_rows', confidence_z, 'upper') }}, 4) as null_percentage_upper,
+            {%- endif %}
+            {{ tolerance_percent }} as tolerance_threshold
         from stats
+        where total_rows > 0
+            {%- if sample %}
+            and {{ failure_rate_bound('null_count', 'total_rows', confidence_z, 'lower') }} > {{ tolerance_percent }}
+            {%- else %}
+            and 100.0 * null_count / total_rows > {{ tolerance_percent }}
+            {%- endif %}
+    )
+    {%- if sample_size > 0 %},
+    null_sample as (
+        select *
+        from {{ model }}
+        where {{ column_name }} is null
+            {%- if window %}
+            and {{ window }}
+            {%- endif %}
+        limit {{ sample_size }}
     )
     select
-        {{ column_name }}
-    from {{ model }}
-    where {{ column_name }} is null
-        and (
-            select null_percentage 
-            from null_percentage
-        ) > (
-            select tolerance_threshold 
-            from null_percentage
-        )
+        summary.*,
+        null_sample.*
+    from summary
+    cross join null_sample
+    {%- else %}
+    select *
+    from summary
+    {%- endif %}
 
 {% endtest %}
 
@@ -1,4 +1,6 @@
-{% test concept_mapping_integrity(model, column_name, tolerance_percent=1.0) %}
+{% test concept_mapping_integrity(model, column_name, tolerance_percent=1.0, sample_size=100,
+                                  sample_percent=none, confidence_z=1.96,
+                                  incremental_window=false, window_column='lds_start_date_time', window_lookback_days=none, full_sweep_weekday=none) %}
 
     {#-
         Generic test to check concept mapping integrity with tolerance threshold.
@@ -7,7 +9,27 @@
         exist in base_olids_concept_map.source_code_id.
         Fails if failure rate exceeds tolerance_percent.
         
+        Single pass: the distinct concept IDs are anti-joined to CONCEPT_MAP once,
+        with total and unmapped distinct counts as window aggregates over the join.
+        A failing test returns at most sample_size unmapped concept IDs with the
+        summary counts; the reported failure count is the full unmapped distinct
+        count (fail_calc).
+        
+        Sampled mode (sample_percent, or the test_sample_percent var): the key
+        space is sampled by hash, with the same predicate on the tested values and
+        the CONCEPT_MAP keys, so each distinct value is equally likely to be
+        sampled (see test_key_sample_predicate). The failure rate is measured
+        over the sampled distinct values, and the test fails only when its Wilson
+        confidence interval (confidence_z, default 1.96 for 95%) lies entirely
+        above tolerance.
+        
+        Incremental window mode (incremental_window: true, for the stable models):
+        only the latest batch of rows is tested, selected by the run watermark or
+        window_lookback_days, with a scheduled full sweep. See test_window_predicate.
+        
         Default tolerance: 1.0%
+        Default sample_size: 100 (must be at least 1: the failing keys are the
+        test result, so a limit of 0 would make every test pass)
         Medications should use tolerance_percent=3.0 (dev only)
         
         Usage:
@@ -24,41 +46,61 @@
                       tolerance_percent: 3.0
     -#}
 
+    {%- if sample_size < 1 %}
+        {{ exceptions.raise_compiler_error("sample_size must be at least 1, got " ~ sample_size) }}
+    {%- endif %}
+    {{ config(fail_calc='coalesce(max(failed_distinct), 0)') }}
+    {%- set sample = test_key_sample_predicate(column_name, sample_percent) | trim %}
+    {%- set parent_sample = test_key_sample_predicate('source_code_id', sample_percent) | trim %}
+    {%- set window = test_window_predicate(model, incremental_window, window_column, window_lookback_days, full_sweep_weekday) | trim %}
+
     with left_table as (
         select distinct {{ column_name }} as id
         from {{ model }}
         where {{ column_name }} is not null
+            {%- if sample %}
+            and {{ sample }}
+            {%- endif %}
+            {%- if window %}
+            and {{ window }}
+            {%- endif %}
     ),
     right_table as (
         select distinct source_code_id as id
         from {{ ref('base_olids_concept_map') }}
         where source_code_id is not null
+            {%- if parent_sample %}
+            and {{ parent_sample }}
+            {%- endif %}
     ),
-    exceptions as (
+    checked as (
         select
             left_table.id,
-            right_table.id as right_id
+            right_table.id is null as is_unmapped,
+            count(*) over () as total_distinct,
+            sum(case when right_table.id is null then 1 else 0 end) over () as failed_distinct
         from left_table
         left join right_table
             on left_table.id = right_table.id
-        where right_table.id is null
-    ),
-    stats as (
-        select
-            (select count(distinct id) from left_table) as total_distinct,
-            (select count(distinct id) from exceptions) as failed_distinct,
-            {{ tolerance_percent }} as tolerance_threshold
     )
-    select *
-    from exceptions
-    where (
-        select case 
-            when total_distinct > 0 
-            then 100.0 * failed_distinct / total_distinct 
-            else 0 
-        end
-        from stats
-    ) > (select tolerance_threshold from stats)
+    select
+        id,
+        total_distinct,
+        failed_distinct,
+        round(100.0 * failed_distinct / total_distinct, 4) as failed_percentage,
+        {%- if sample %}
+        round({{ failure_rate_bound('failed_distinct', 'total_distinct', confidence_z, 'lower') }}, 4) as failed_percentage_lower,
+        round({{ failure_rate_bound('failed_distinct', 'total_distinct', confidence_z, 'upper') }}, 4) as failed_percentage_upper,
+        {%- endif %}
+        {{ tolerance_percent }} as tolerance_threshold
+    from checked
+    where is_unmapped
+        {%- if sample %}
+        and {{ failure_rate_bound('failed_distinct', 'total_distinct', confidence_z, 'lower') }} > {{ tolerance_percent }}
+        {%- else %}
+        and 100.0 * failed_distinct / total_distinct > {{ tolerance_percent }}
+        {%- endif %}
+    limit {{ sample_size }}
 
 {% endtest %}
 
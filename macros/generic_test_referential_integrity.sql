@@ -1,4 +1,6 @@
-{% test referential_integrity(model, column_name, to, field='id', tolerance_percent=1.0) %}
+{% test referential_integrity(model, column_name, to, field='id', tolerance_percent=1.0, sample_size=100,
+                              sample_percent=none, confidence_z=1.96,
+                              incremental_window=false, window_column='lds_start_date_time', window_lookback_days=none, full_sweep_weekday=none) %}
 
     {#-
         Generic test to check referential integrity with tolerance threshold.
@@ -6,7 +8,27 @@
         Checks that foreign key values exist in the referenced table's primary key column.
         Fails if orphaned FK percentage exceeds tolerance_percent.
         
+        Single pass: the distinct FK values are anti-joined to the referenced keys
+        once, and the total and orphaned distinct counts are window aggregates over
+        that join. A failing test returns at most sample_size orphaned keys, each
+        carrying the summary counts; the reported failure count is the full
+        orphaned distinct count (fail_calc), not the sample size.
+        
+        Sampled mode (sample_percent, or the test_sample_percent var): the key
+        space is sampled by hash, with the same predicate on the tested values and
+        the referenced keys, so each distinct value is equally likely to be
+        sampled (see test_key_sample_predicate). The failure rate is measured
+        over the sampled distinct values, and the test fails only when its Wilson
+        confidence interval (confidence_z, default 1.96 for 95%) lies entirely
+        above tolerance.
+        
+        Incremental window mode (incremental_window: true, for the stable models):
+        only the latest batch of rows is tested, selected by the run watermark or
+        window_lookback_days, with a scheduled full sweep. See test_window_predicate.
+        
         Default tolerance: 1.0%
+        Default sample_size: 100 (must be at least 1: the failing keys are the
+        test result, so a limit of 0 would make every test pass)
         
         Usage:
             - name: patient_id
@@ -25,41 +47,61 @@
                       tolerance_percent: 1.0
     -#}
 
+    {%- if sample_size < 1 %}
+        {{ exceptions.raise_compiler_error("sample_size must be at least 1, got " ~ sample_size) }}
+    {%- endif %}
+    {{ config(fail_calc='coalesce(max(orphaned_distinct_fk), 0)') }}
+    {%- set sample = test_key_sample_predicate(column_name, sample_percent) | trim %}
+    {%- set parent_sample = test_key_sample_predicate(field, sample_percent) | trim %}
+    {%- set window = test_window_predicate(model, incremental_window, window_column, window_lookback_days, full_sweep_weekday) | trim %}
+
     with left_table as (
         select distinct {{ column_name }} as id
         from {{ model }}
         where {{ column_name }} is not null
+            {%- if sample %}
+            and {{ sample }}
+            {%- endif %}
+            {%- if window %}
+            and {{ window }}
+            {%- endif %}
     ),
     right_table as (
         select distinct {{ field }} as id
         from {{ to }}
         where {{ field }} is not null
+            {%- if parent_sample %}
+            and {{ parent_sample }}
+            {%- endif %}
     ),
-    exceptions as (
+    checked as (
         select
             left_table.id,
-            right_table.id as right_id
+            right_table.id is null as is_orphaned,
+            count(*) over () as total_distinct_fk,
+            sum(case when right_table.id is null then 1 else 0 end) over () as orphaned_distinct_fk
         from left_table
         left join right_table
             on left_table.id = right_table.id
-        where right_table.id is null
-    ),
-    stats as (
-        select
-            (select count(distinct id) from left_table) as total_distinct_fk,
-            (select count(distinct id) from exceptions) as orphaned_distinct_fk,
-            {{ tolerance_percent }} as tolerance_threshold
     )
-    select *
-    from exceptions
-    where (
-        select case 
-            when total_distinct_fk > 0 
-            then 100.0 * orphaned_distinct_fk / total_distinct_fk 
-            else 0 
-        end
-        from stats
-    ) > (select tolerance_threshold from stats)
+    select
+        id,
+        total_distinct_fk,
+        orphaned_distinct_fk,
+        round(100.0 * orphaned_distinct_fk / total_distinct_fk, 4) as orphaned_percentage,
+        {%- if sample %}
+        round({{ failure_rate_bound('orphaned_distinct_fk', 'total_distinct_fk', confidence_z, 'lower') }}, 4) as orphaned_percentage_lower,
+        round({{ failure_rate_bound('orphaned_distinct_fk', 'total_distinct_fk', confidence_z, 'upper') }}, 4) as orphaned_percentage_upper,
+        {%- endif %}
+        {{ tolerance_percent }} as tolerance_threshold
+    from checked
+    where is_orphaned
+        {%- if sample %}
+        and {{ failure_rate_bound('orphaned_distinct_fk', 'total_distinct_fk', confidence_z, 'lower') }} > {{ tolerance_percent }}
+        {%- else %}
+        and 100.0 * orphaned_distinct_fk / total_distinct_fk > {{ tolerance_percent }}
+        {%- endif %}
+    limit {{ sample_size }}
 
 {% endtest %}
 
@@ -0,0 +1,89 @@
+{% macro test_sample_clause(sample_percent=none, sample_rows=none, sample_method='bernoulli') %}
+    {#-
+    Sampling clause for the tolerance-based generic tests, placed after the
+    tested relation: from {{ model }} {{ test_sample_clause(...) }}
+
+    Tests without sample_percent or sample_rows fall back to the project var
+    test_sample_percent, so a PR build can sample every test at once:
+        dbt test --vars '{test_sample_percent: 5}'
+
+    Returns an empty string (full scan) when nothing is set or sample_percent >= 100.
+    sample_method: bernoulli (row) or system (block). Snowflake only supports
+    system sampling on tables, so keep bernoulli for the base views.
+
+    Row sampling suits row-level rates such as completeness. The distinct-key
+    tests sample the key space with test_key_sample_predicate instead.
+    -#}
+    {%- if sample_percent is none and sample_rows is none -%}
+        {%- set sample_percent = var('test_sample_percent', none) -%}
+    {%- endif -%}
+    {%- if sample_rows is none and (sample_percent is none or sample_percent >= 100) -%}
+        {{ return('') }}
+    {%- endif -%}
+    {%- if sample_method not in ('bernoulli', 'system') -%}
+        {{ exceptions.raise_compiler_error("sample_method must be 'bernoulli' or 'system', got '" ~ sample_method ~ "'") }}
+    {%- endif -%}
+    {{ return(adapter.dispatch('test_sample_clause')(sample_percent, sample_rows, sample_method)) }}
+{% endmacro %}
+
+{% macro default__test_sample_clause(sample_percent, sample_rows, sample_method) %}
+    {%- if sample_rows is not none -%}
+        sample row ({{ sample_rows }} rows)
+    {%- else -%}
+        sample {{ sample_method }} ({{ sample_percent }})
+    {%- endif -%}
+{% endmacro %}
+
+{% macro duckdb__test_sample_clause(sample_percent, sample_rows, sample_method) %}
+    {%- if sample_rows is not none -%}
+        tablesample reservoir({{ sample_rows }} rows)
+    {%- else -%}
+        tablesample {{ sample_percent }}% ({{ sample_method }})
+    {%- endif -%}
+{% endmacro %}
+
+{% macro test_key_sample_predicate(column, sample_percent=none) %}
+    {#-
+    Key-space sampling predicate for the distinct-key tests (referential and
+    concept mapping integrity), applied to the tested column and to the
+    referenced key alike: where ... and {{ test_key_sample_predicate(...) }}
+
+    A key is kept when its hash falls in the first sample_percent of 1,000,000
+    buckets, so it is sampled on both sides of the join or on neither, and
+    every distinct key has the same chance of selection however many rows
+    carry it. The orphaned share of the sampled keys is then an unbiased
+    estimate of the full-scan distinct-key rate, as in
+    scripts/tests/ri_engine.py. Row sampling would favour frequent keys.
+
+    Falls back to the test_sample_percent var like test_sample_clause; returns
+    an empty string (no sampling) when nothing is set or sample_percent >= 100.
+    -#}
+    {%- if sample_percent is none -%}
+        {%- set sample_percent = var('test_sample_percent', none) -%}
+    {%- endif -%}
+    {%- if sample_percent is none or sample_percent >= 100 -%}
+        {{ return('') }}
+    {%- endif -%}
+    {{ return(adapter.dispatch('test_key_sample_predicate')(column, (sample_percent * 10000) | round | int)) }}
+{% endmacro %}
+
+{% macro default__test_key_sample_predicate(column, buckets) %}
+    mod(abs(hash({{ column }})), 1000000) < {{ buckets }}
+{%- endmacro %}
+
+{% macro duckdb__test_key_sample_predicate(column, buckets) %}
+    hash({{ column }}) % 1000000 < {{ buckets }}
+{%- endmacro %}
+
+{% macro failure_rate_bound(failed, total, z=1.96, side='lower') %}
+    {#-
+    Wilson score interval bound for the failure rate failed / total, as a
+    percentage. A sampled test fails only when the lower bound is above
+    tolerance, i.e. the whole interval lies above it.
+    -#}
+    {%- set sign = '-' if side == 'lower' else '+' -%}
+    {%- set z2 = (z * z) | round(6) -%}
+    {%- set p = '(' ~ failed ~ ' * 1.0 / nullif(' ~ total ~ ', 0))' -%}
+    {%- set n = 'nullif(' ~ total ~ ', 0)' -%}
+    100.0 * ({{ p }} + {{ z2 }} / (2.0 * {{ n }}) {{ sign }} {{ z }} * sqrt({{ p }} * (1 - {{ p }}) / {{ n }} + {{ z2 }} / (4.0 * {{ n }} * {{ n }}))) / (1 + {{ z2 }} / {{ n }})
+{%- endmacro %}
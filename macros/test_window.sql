@@ -0,0 +1,95 @@
+{% macro test_window_predicate(model, incremental_window=false, window_column='lds_start_date_time', window_lookback_days=none, full_sweep_weekday=none) %}
+    {#-
+    Row filter for generic tests run in incremental_window mode on the stable
+    (incremental) models. Returns an empty string for a full scan, otherwise a
+    predicate on window_column selecting the latest batch:
+
+    - window_lookback_days set: rows within that many days of the model's max(window_column)
+    - otherwise: rows newer than the watermark record_test_watermarks stored
+      after the last run, i.e. exactly the rows that run added
+
+    A full sweep runs instead on full_sweep_weekday (ISO weekday, default from
+    var test_full_sweep_weekday: 7 = Sunday), when --vars '{test_full_sweep: true}'
+    is passed, or when no watermark has been recorded yet or the model was last
+    fully refreshed (NULL watermark).
+    -#}
+    {%- if not incremental_window -%}
+        {{ return('') }}
+    {%- endif -%}
+
+    {%- set sweep_weekday = full_sweep_weekday if full_sweep_weekday is not none else var('test_full_sweep_weekday', 7) -%}
+    {%- if var('test_full_sweep', false) or run_started_at.isoweekday() == sweep_weekday | int -%}
+        {{ return('') }}
+    {%- endif -%}
+
+    {%- if window_lookback_days is not none -%}
+        {%- set latest = '(select max(' ~ window_column ~ ') from ' ~ model ~ ')' -%}
+        {{ return(window_column ~ ' >= ' ~ dbt.dateadd('day', -1 * window_lookback_days, latest)) }}
+    {%- endif -%}
+
+    {%- set watermarks = test_watermark_relation() -%}
+    {%- if execute and adapter.get_relation(watermarks.database, watermarks.schema, watermarks.identifier) is none -%}
+        {{ return('') }}
+    {%- endif -%}
+    {%- set model_key = (model.schema ~ '.' ~ model.identifier) | lower -%}
+    {{ return(window_column ~ " > coalesce((select watermark from " ~ watermarks ~ " where model_name = '" ~ model_key ~ "'), '1900-01-01'::timestamp)") }}
+{% endmacro %}
+
+{% macro test_watermark_relation() %}
+    {#- Table holding each stable model's max(lds_start_date_time) from before and after its latest run -#}
+    {%- set schema = generate_schema_name(var('dbt_audit_schema'), none) | trim -%}
+    {{ return(api.Relation.create(database=target.database, schema=schema, identifier='test_watermarks')) }}
+{% endmacro %}
+
+{% macro create_test_watermarks() %}
+    {#- on-run-start: create the watermark table once, before any model runs -#}
+    {%- if execute -%}
+        {%- set watermarks = test_watermark_relation() -%}
+        {% do adapter.create_schema(watermarks) %}
+        {% do run_query("create table if not exists " ~ watermarks ~ " (model_name varchar, watermark timestamp, loaded_max timestamp, recorded_at timestamp)") %}
+    {%- endif -%}
+{% endmacro %}
+
+{% macro record_test_watermarks(results, column='lds_start_date_time') %}
+    {#-
+    on-run-end: one MERGE for every incremental model that ran successfully,
+    so concurrent dbt threads never write the table. Each model's previous
+    loaded_max (its max(column) after the last run) becomes the watermark and
+    its current max(column) the new loaded_max, so incremental_window tests
+    select exactly the rows this run added. A full refresh or first build
+    stores a NULL watermark, which makes the next windowed test a full scan.
+    -#}
+    {%- if not execute -%}
+        {{ return('') }}
+    {%- endif -%}
+    {%- set loaded = [] -%}
+    {%- for result in results
+        if result.node.resource_type == 'model'
+        and result.status == 'success'
+        and result.node.config.materialized == 'incremental' -%}
+        {%- set node = result.node -%}
+        {%- set full_refresh = node.config.full_refresh if node.config.full_refresh is not none else flags.FULL_REFRESH -%}
+        {%- set model_key = (node.schema ~ '.' ~ (node.alias or node.name)) | lower -%}
+        {%- do loaded.append(
+            "select '" ~ model_key ~ "' as model_name, (select max(" ~ column ~ ") from " ~ node.relation_name ~ ") as loaded_max, "
+            ~ ('true' if full_refresh else 'false') ~ " as full_refresh"
+        ) -%}
+    {%- endfor -%}
+    {%- if not loaded -%}
+        {{ return('') }}
+    {%- endif -%}
+    {%- set watermarks = test_watermark_relation() -%}
+    {% do run_query(
+        "merge into " ~ watermarks ~ " as w
+        using (
+            " ~ loaded | join('\n            union all\n            ') ~ "
+        ) as s
+        on w.model_name = s.model_name
+        when matched then update set
+            watermark = case when s.full_refresh then null else w.loaded_max end,
+            loaded_max = s.loaded_max,
+            recorded_at = current_timestamp
+        when not matched then insert (model_name, watermark, loaded_max, recorded_at)
+            values (s.model_name, null, s.loaded_max, current_timestamp)"
+    ) %}
+{% endmacro %}
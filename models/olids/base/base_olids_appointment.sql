@@ -8,7 +8,7 @@
 Base APPOINTMENT View
 Filters to NCL practices and excludes sensitive patients.
 Pattern: Clinical table with patient_id + record_owner_organisation_code
-Uses native person_id from source table.
+Maps native person_id UUID to numeric person_id via int_person_key_registry.
 */
 
 SELECT
@@ -16,7 +16,7 @@ SELECT
     src.id,
     src.organisation_id,
     src.patient_id,
-    {{ generate_person_id('src.person_id') }} AS person_id,
+    person_keys.person_id AS person_id,
     src.practitioner_in_role_id,
     src.schedule_id,
     src.start_date,
@@ -70,6 +70,8 @@ INNER JOIN {{ ref('base_olids_patient') }} patients
     ON src.patient_id = patients.id
 INNER JOIN {{ ref('int_wnl_practices') }} wnl_practices
     ON src.record_owner_organisation_code = wnl_practices.practice_code
+LEFT JOIN {{ ref('int_person_key_registry') }} person_keys
+    ON src.person_id = person_keys.person_uuid
 LEFT JOIN {{ ref('int_enriched_concept_map') }} appointment_status_map
     ON src.appointment_status_concept_id = appointment_status_map.source_code_id
 LEFT JOIN {{ ref('int_enriched_concept_map') }} booking_method_map
@@ -8,13 +8,13 @@
 Base ENCOUNTER View
 Filters to NCL practices and excludes sensitive patients.
 Pattern: Clinical table with patient_id + record_owner_organisation_code
-Uses native person_id from source table.
+Maps native person_id UUID to numeric person_id via int_person_key_registry.
 */
 
 SELECT
     src.lds_record_id,
     src.id,
-    {{ generate_person_id('src.person_id') }} AS person_id,
+    person_keys.person_id AS person_id,
     src.patient_id,
     src.practitioner_id,
     src.appointment_id,
@@ -49,4 +49,6 @@ INNER JOIN {{ ref('base_olids_patient') }} patients
     ON src.patient_id = patients.id
 INNER JOIN {{ ref('int_wnl_practices') }} wnl_practices
     ON src.record_owner_organisation_code = wnl_practices.practice_code
+LEFT JOIN {{ ref('int_person_key_registry') }} person_keys
+    ON src.person_id = person_keys.person_uuid
 WHERE src.lds_start_date_time IS NOT NULL
\ No newline at end of file
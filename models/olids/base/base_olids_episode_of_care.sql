@@ -8,7 +8,7 @@
 Base EPISODE_OF_CARE View
 Filters to NCL practices and excludes sensitive patients.
 Pattern: Clinical table with patient_id + organisation_code_publisher
-Uses native person_id from source table.
+Maps native person_id UUID to numeric person_id via int_person_key_registry.
 */
 
 SELECT
@@ -17,7 +17,7 @@ SELECT
     src.organisation_id_publisher,
     src.organisation_id_managing,
     src.patient_id,
-    {{ generate_person_id('src.person_id') }} AS person_id,
+    person_keys.person_id AS person_id,
     src.episode_type_source_concept_id,
     episode_type_map.source_code AS episode_type_source_code,
     episode_type_map.source_display AS episode_type_source_display,
@@ -49,6 +49,8 @@ INNER JOIN {{ ref('base_olids_patient') }} patients
     ON src.patient_id = patients.id
 INNER JOIN {{ ref('int_wnl_practices') }} wnl_practices
     ON src.organisation_code_publisher = wnl_practices.practice_code
+LEFT JOIN {{ ref('int_person_key_registry') }} person_keys
+    ON src.person_id = person_keys.person_uuid
 LEFT JOIN {{ ref('int_enriched_concept_map') }} episode_type_map
     ON src.episode_type_source_concept_id = episode_type_map.source_code_id
 LEFT JOIN {{ ref('int_enriched_concept_map') }} episode_status_map
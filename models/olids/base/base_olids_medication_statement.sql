@@ -8,7 +8,7 @@
 Base MEDICATION_STATEMENT View
 Filters to NCL practices and excludes sensitive patients.
 Pattern: Clinical table with patient_id + record_owner_organisation_code
-Uses native person_id from source table.
+Maps native person_id UUID to numeric person_id via int_person_key_registry.
 Simplified concept mapping using CONCEPT_MAP columns directly.
 */
 
@@ -16,7 +16,7 @@ SELECT
     src.lds_record_id,
     src.id,
     src.organisation_id,
-    {{ generate_person_id('src.person_id') }} AS person_id,
+    person_keys.person_id AS person_id,
     src.patient_id,
     src.encounter_id,
     src.practitioner_id,
@@ -79,6 +79,8 @@ INNER JOIN {{ ref('base_olids_patient') }} patients
     ON src.patient_id = patients.id
 INNER JOIN {{ ref('int_wnl_practices') }} wnl_practices
     ON src.record_owner_organisation_code = wnl_practices.practice_code
+LEFT JOIN {{ ref('int_person_key_registry') }} person_keys
+    ON src.person_id = person_keys.person_uuid
 LEFT JOIN {{ ref('int_enriched_concept_map') }} concept_map
     ON src.medication_statement_source_concept_id = concept_map.source_code_id
 LEFT JOIN {{ ref('int_enriched_concept_map') }} auth_concept_map
@@ -7,7 +7,7 @@
 /*
 Base PATIENT_PERSON View
 Filters to NCL practices through patient relationships.
-Pattern: Bridge table with numeric person_id hashed from source UUID
+Pattern: Bridge table with numeric person_id from int_person_key_registry
 */
 
 SELECT
@@ -15,7 +15,7 @@ SELECT
     src.lds_record_id_person,
     src.id,
     src.patient_id,
-    {{ generate_person_id('src.person_id') }} AS person_id,
+    person_keys.person_id AS person_id,
     src.person_id AS person_uuid,
     src.lds_id,
     src.lds_business_key,
@@ -29,4 +29,6 @@ SELECT
 FROM {{ source('olids_common', 'PATIENT_PERSON') }} src
 INNER JOIN {{ ref('base_olids_patient') }} patients
     ON src.patient_id = patients.id
+LEFT JOIN {{ ref('int_person_key_registry') }} person_keys
+    ON src.person_id = person_keys.person_uuid
 WHERE src.lds_start_date_time IS NOT NULL
\ No newline at end of file
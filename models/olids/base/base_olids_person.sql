@@ -8,8 +8,8 @@
 Base PERSON View
 Sources native OLIDS_MASKED.PERSON, filtered to persons linked to NCL patients
 via the PATIENT_PERSON bridge.
-Pattern: id = numeric hash of native UUID (matches person_id on all other base
-tables); person_uuid = native UUID.
+Pattern: id = numeric person_id from int_person_key_registry (matches person_id
+on all other base tables); person_uuid = native UUID.
 
 Gender backfill: native PERSON.gender is currently 100% null upstream, so we
 fall back to the gender_concept_id from the person's most recently registered
@@ -33,7 +33,7 @@ WITH gender_fallback AS (
 )
 
 SELECT
-    {{ generate_person_id('per.id') }} AS id,
+    person_keys.person_id AS id,
     per.id AS person_uuid,
     per.composite_id,
     per.matched_nhs_no_hash,
@@ -65,6 +65,8 @@ SELECT
     per.lds_lakehouse_date_processed,
     per.lds_lakehouse_datetime_updated
 FROM {{ source('olids_masked', 'PERSON') }} per
+LEFT JOIN {{ ref('int_person_key_registry') }} person_keys
+    ON per.id = person_keys.person_uuid
 LEFT JOIN gender_fallback gf
     ON gf.person_uuid = per.id
 WHERE EXISTS (
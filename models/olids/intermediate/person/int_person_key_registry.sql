@@ -0,0 +1,114 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='append',
+        transient=false,
+        full_refresh=false,
+        tags=['intermediate', 'person'],
+        cluster_by=['person_id'],
+        alias='person_key_registry')
+}}
+
+/*
+Person Key Registry
+Persistent mapping of native person UUID to the numeric person_id used on every
+base model. Each UUID is assigned once and never changes; runs only append
+UUIDs not yet registered.
+
+Assignment: person_id = generate_person_id(person_uuid), the same 14-digit
+hash the base views previously computed inline, so ids are unchanged. A UUID
+whose hash is already held by a registered person, or by a new person with a
+lower UUID, is rehashed with a salt (person_uuid || '#<round>'). hash_round
+records how many rehashes were needed: 0 for all but collided persons. A UUID
+still colliding after the last round is left unregistered and retried next
+run; the unique tests on person_id flag any collision that slips through.
+
+Base views LEFT JOIN this table and never hash inline, so a person_id can
+only change through this registry. A UUID that reaches the sources after the
+last build has a NULL person_id until the next run registers it; the
+zero-tolerance completeness tests on base_olids_person.id and
+base_olids_patient_person.person_id fail until then.
+
+full_refresh=false protects the assignments from `dbt run --full-refresh`.
+*/
+
+{%- set collision_rounds = 3 %}
+
+WITH source_persons AS (
+    SELECT person_id AS person_uuid
+    FROM {{ source('olids_common', 'PATIENT_PERSON') }}
+    WHERE person_id IS NOT NULL
+    UNION
+    SELECT id AS person_uuid
+    FROM {{ source('olids_masked', 'PERSON') }}
+    WHERE id IS NOT NULL
+),
+
+unassigned_0 AS (
+    SELECT person_uuid
+    FROM source_persons
+    {%- if is_incremental() %}
+    WHERE person_uuid NOT IN (SELECT person_uuid FROM {{ this }})
+    {%- endif %}
+),
+
+taken_0 AS (
+    {%- if is_incremental() %}
+    SELECT person_id FROM {{ this }}
+    {%- else %}
+    SELECT CAST(NULL AS BIGINT) AS person_id WHERE 1 = 0
+    {%- endif %}
+),
+
+{%- for round in range(collision_rounds + 1) %}
+
+candidates_{{ round }} AS (
+    SELECT
+        person_uuid,
+        {{ generate_person_id("person_uuid" if round == 0 else "person_uuid || '#" ~ round ~ "'") }} AS person_id
+    FROM unassigned_{{ round }}
+),
+
+assigned_{{ round }} AS (
+    SELECT
+        person_uuid,
+        person_id,
+        {{ round }} AS hash_round
+    FROM candidates_{{ round }} c
+    WHERE NOT EXISTS (
+        SELECT 1 FROM taken_{{ round }} t WHERE t.person_id = c.person_id
+    )
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY person_id ORDER BY person_uuid) = 1
+),
+
+{%- if round < collision_rounds %}
+
+unassigned_{{ round + 1 }} AS (
+    SELECT person_uuid
+    FROM unassigned_{{ round }}
+    WHERE person_uuid NOT IN (SELECT person_uuid FROM assigned_{{ round }})
+),
+
+taken_{{ round + 1 }} AS (
+    SELECT person_id FROM taken_{{ round }}
+    UNION ALL
+    SELECT person_id FROM assigned_{{ round }}
+),
+{%- endif %}
+{%- endfor %}
+
+assigned AS (
+    {%- for round in range(collision_rounds + 1) %}
+    SELECT person_uuid, person_id, hash_round FROM assigned_{{ round }}
+    {%- if not loop.last %}
+    UNION ALL
+    {%- endif %}
+    {%- endfor %}
+)
+
+SELECT
+    person_uuid,
+    person_id,
+    hash_round,
+    CURRENT_TIMESTAMP AS registered_at
+FROM assigned
@@ -90,10 +90,10 @@ enriched_existing AS (
         ON cm.source_code_id = emis_ref.olids_emis_code_concept_id
         AND cm.target_code = '138875005'
     LEFT JOIN {{ source('nhsd_snomed', 'SCT_Concept') }} sct
-        ON TRY_CAST(cm.target_code AS NUMBER(38,0)) = sct."Id"
+        ON TRY_CAST(cm.target_code AS BIGINT) = sct."Id"
         AND sct."Active" = FALSE
     LEFT JOIN sct_history
-        ON TRY_CAST(cm.target_code AS NUMBER(38,0)) = sct_history.old_concept_id
+        ON TRY_CAST(cm.target_code AS BIGINT) = sct_history.old_concept_id
         AND sct."Id" IS NOT NULL
 ),
 
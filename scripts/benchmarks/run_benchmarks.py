@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+OLIDS dbt Benchmark Harness
+
+Runs the dbt project against DuckDB (dbt-duckdb >= 1.10) on synthetic data at
+one or more scale factors, records per-model timings from run_results.json in
+a local history, and reports models that got slower than their rolling median.
+
+For each scale the harness:
+1. Generates synthetic sources with scripts/utils/generate_synthetic_data.py
+2. Registers them as views in one DuckDB file per source database
+   (Data_Store_OLIDS, Dictionary, ...) attached under the Snowflake names
+3. Runs the dbt phases below, each with its own target path
+4. Appends a small delta batch (later lds_start_date_time, overlapping ids)
+   before the incremental phase so the merge path does real work
+
+Phases:
+    build         base_olids_* views and int_* tables (full refresh)
+    full_refresh  stable_* models rebuilt from scratch
+    incremental   stable_* models merging the delta batch
+
+Base models are views, so their query cost is paid by the stable model that
+selects from them: compare stable_X full_refresh against base_X build.
+
+Usage (from repo root):
+    python scripts/benchmarks/run_benchmarks.py
+    python scripts/benchmarks/run_benchmarks.py --scales 0.1 1 10
+    python scripts/benchmarks/run_benchmarks.py --scales 1 --reuse-data --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import yaml
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SOURCES_FILE = REPO_ROOT / 'models' / 'sources.yml'
+GENERATOR = REPO_ROOT / 'scripts' / 'utils' / 'generate_synthetic_data.py'
+
+BENCHMARK_DIR = Path(__file__).parent
+WORK_DIR = BENCHMARK_DIR / '.work'
+HISTORY_FILE = BENCHMARK_DIR / '.cache' / 'history.sqlite'
+REPORT_DIR = BENCHMARK_DIR / 'output'
+
+# dbt_project.yml places every model in env_var('SNOWFLAKE_TARGET_DATABASE');
+# for DuckDB that is the stem of the target database file
+TARGET_DATABASE = 'benchmark'
+
+PHASES = [
+    ('build', ['--select', 'tag:base', 'tag:intermediate', '--full-refresh']),
+    ('full_refresh', ['--select', 'tag:stable', '--full-refresh']),
+    ('incremental', ['--select', 'tag:stable']),
+]
+
+# Tables the models read directly rather than through sources.yml
+EXTRA_TABLES = {
+    ('DATA_LAB_OLIDS_NCL', 'REFERENCE', 'BNF_LATEST'): """
+        SELECT
+            'target_code_' || i AS snomed_code,
+            'Chapter ' || (i % 15) AS bnf_chapter,
+            'Section ' || (i % 40) AS bnf_section,
+            LPAD(i::VARCHAR, 15, '0') AS bnf_code,
+            'BNF product ' || i AS bnf_name
+        FROM range(100) t(i)
+    """,
+}
+
+# Clinical tables that receive new rows in the incremental delta batch
+DELTA_TABLES = [
+    'PATIENT', 'OBSERVATION', 'MEDICATION_ORDER', 'MEDICATION_STATEMENT', 'ENCOUNTER',
+    'APPOINTMENT', 'DIAGNOSTIC_ORDER', 'ALLERGY_INTOLERANCE', 'PROCEDURE_REQUEST', 'REFERRAL_REQUEST',
+]
+
+
+def load_source_databases() -> dict:
+    """Return {database: {schema: [table identifiers]}} for every table in sources.yml."""
+    with open(SOURCES_FILE, 'r') as f:
+        data = yaml.safe_load(f)
+
+    databases = {}
+    for source in data.get('sources', []):
+        database = source['database'].strip('"')
+        schema = source['schema'].strip('"')
+        tables = databases.setdefault(database, {}).setdefault(schema, [])
+        for table in source.get('tables', []):
+            tables.append(table.get('identifier', table['name']).strip('"'))
+    return databases
+
+
+def generate_data(output_dir: Path, scale: float, seed: int, end_date: date, extra_args=None):
+    """Run the synthetic data generator into output_dir."""
+    command = [
+        sys.executable, str(GENERATOR),
+        '--output', str(output_dir),
+        '--scale', str(scale),
+        '--seed', str(seed),
+        '--end-date', end_date.isoformat(),
+    ] + (extra_args or [])
+    subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+
+
+def parquet_paths(data_dirs: list, schema: str, table: str) -> list:
+    """Return read_parquet() globs for a table across the base and delta data directories."""
+    return [
+        str(data_dir / schema / table / '*.parquet')
+        for data_dir in data_dirs
+        if any((data_dir / schema / table).glob('*.parquet'))
+    ]
+
+
+def build_source_databases(scale_dir: Path, data_dirs: list) -> dict:
+    """
+    Create one DuckDB file per source database with a view per source table.
+
+    Returns {database alias: file path} for the dbt profile's attach list.
+    """
+    source_dir = scale_dir / 'sources'
+    source_dir.mkdir(parents=True, exist_ok=True)
+    attachments = {}
+
+    for database, schemas in load_source_databases().items():
+        path = source_dir / f'{database}.duckdb'
+        con = duckdb.connect(str(path))
+        for schema, tables in schemas.items():
+            con.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            for table in tables:
+                paths = parquet_paths(data_dirs, schema, table)
+                if not paths:
+                    print(f"  → WARNING: No data for {database}.{schema}.{table}")
+                    continue
+                path_list = ", ".join(f"'{p}'" for p in paths)
+                con.execute(
+                    f'CREATE OR REPLACE VIEW "{schema}"."{table}" AS '
+                    f'SELECT * FROM read_parquet([{path_list}], union_by_name = true)'
+                )
+        con.close()
+        attachments[database] = path
+
+    for (database, schema, table), select_sql in EXTRA_TABLES.items():
+        path = source_dir / f'{database}.duckdb'
+        con = duckdb.connect(str(path))
+        con.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        con.execute(f'CREATE OR REPLACE TABLE "{schema}"."{table}" AS {select_sql}')
+        con.close()
+        attachments[database] = path
+
+    return attachments
+
+
+def write_profile(scale_dir: Path, attachments: dict, threads: int) -> Path:
+    """Write a profiles.yml pointing the dbt_olids profile at the local DuckDB files."""
+    profile = {
+        'dbt_olids': {
+            'target': 'benchmark',
+            'outputs': {
+                'benchmark': {
+                    'type': 'duckdb',
+                    'path': str(scale_dir / f'{TARGET_DATABASE}.duckdb'),
+                    'threads': threads,
+                    'attach': [
+                        {'path': str(path), 'alias': alias, 'read_only': True}
+                        for alias, path in sorted(attachments.items())
+                    ],
+                }
+            },
+        }
+    }
+    (scale_dir / 'profiles.yml').write_text(yaml.safe_dump(profile, sort_keys=False), encoding='utf-8')
+    return scale_dir
+
+
+def run_dbt_phase(project_dir: Path, profiles_dir: Path, target_path: Path, phase_args: list) -> dict:
+    """Run one dbt phase and return its parsed run_results.json."""
+    env = dict(os.environ, SNOWFLAKE_TARGET_DATABASE=TARGET_DATABASE)
+    command = [
+        'dbt', 'run',
+        '--profiles-dir', str(profiles_dir),
+        '--target-path', str(target_path),
+        '--log-path', str(target_path / 'logs'),
+    ] + phase_args
+
+    results_file = target_path / 'run_results.json'
+    results_file.unlink(missing_ok=True)
+    completed = subprocess.run(command, cwd=project_dir, env=env, capture_output=True, text=True)
+    if not results_file.exists():
+        print(completed.stdout[-2000:])
+        raise RuntimeError(f"dbt did not produce run_results.json (exit code {completed.returncode})")
+    return json.loads(results_file.read_text(encoding='utf-8'))
+
+
+def extract_timings(run_results: dict, target_file: Path) -> list:
+    """
+    Return [{model, status, execution_time, rows_affected}] for the models in a dbt run.
+
+    dbt-duckdb does not report rows affected, so row counts are read from the
+    target database for models materialised as tables (views are left empty).
+    """
+    con = duckdb.connect(str(target_file), read_only=True)
+    try:
+        table_types = {
+            (schema.lower(), name.lower()): table_type
+            for schema, name, table_type in con.execute(
+                "SELECT table_schema, table_name, table_type FROM information_schema.tables"
+            ).fetchall()
+        }
+
+        timings = []
+        for result in run_results.get('results', []):
+            if not result['unique_id'].startswith('model.'):
+                continue
+            rows_affected = None
+            relation = result.get('relation_name')
+            if result['status'] == 'success' and relation:
+                schema, name = [part.strip('"') for part in relation.split('.')[-2:]]
+                if table_types.get((schema.lower(), name.lower())) == 'BASE TABLE':
+                    rows_affected = con.execute(f"SELECT COUNT(*) FROM {relation}").fetchone()[0]
+            timings.append({
+                'model': result['unique_id'].split('.')[-1],
+                'status': result['status'],
+                'execution_time': round(result['execution_time'], 3),
+                'rows_affected': rows_affected,
+            })
+        return timings
+    finally:
+        con.close()
+
+
+def benchmark_scale(scale: float, args) -> list:
+    """Generate data, run every phase at one scale and return timing rows."""
+    scale_dir = args.work_dir / f'scale_{scale:g}'
+    data_dir = scale_dir / 'data'
+    delta_dir = scale_dir / 'delta'
+
+    if not (args.reuse_data and data_dir.is_dir()):
+        print(f"  Generating data at scale {scale:g}...")
+        shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(delta_dir, ignore_errors=True)
+        generate_data(data_dir, scale, args.seed, args.end_date)
+        generate_data(
+            delta_dir, scale * args.delta_fraction, args.seed + 1, args.end_date + timedelta(days=1),
+            ['--days', '1', '--tables'] + DELTA_TABLES
+        )
+
+    # Fresh target database so full-refresh timings never depend on a previous run
+    (scale_dir / f'{TARGET_DATABASE}.duckdb').unlink(missing_ok=True)
+
+    rows = []
+    for phase, phase_args in PHASES:
+        data_dirs = [data_dir, delta_dir] if phase == 'incremental' else [data_dir]
+        attachments = build_source_databases(scale_dir, data_dirs)
+        profiles_dir = write_profile(scale_dir, attachments, args.threads)
+
+        started = time.time()
+        run_results = run_dbt_phase(args.project_dir, profiles_dir, scale_dir / 'target' / phase, phase_args)
+        elapsed = time.time() - started
+
+        timings = extract_timings(run_results, scale_dir / f'{TARGET_DATABASE}.duckdb')
+        errors = [t['model'] for t in timings if t['status'] != 'success']
+        status = "✓" if not errors else "✗"
+        print(f"  {status} {phase}: {len(timings)} models in {elapsed:.1f}s"
+              + (f" ({len(errors)} failed: {', '.join(errors[:5])})" if errors else ""))
+
+        for t in timings:
+            rows.append({'scale': scale, 'phase': phase, **t})
+        rows.append({
+            'scale': scale, 'phase': phase, 'model': 'TOTAL', 'status': 'success' if not errors else 'error',
+            'execution_time': round(run_results.get('elapsed_time', elapsed), 3), 'rows_affected': None,
+        })
+    return rows
+
+
+def open_history(history_file: Path = HISTORY_FILE) -> sqlite3.Connection:
+    """Open (creating if needed) the benchmark history store."""
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(history_file)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS benchmark_runs (
+            run_id TEXT NOT NULL,
+            run_at TEXT NOT NULL,
+            git_commit TEXT,
+            scale REAL NOT NULL,
+            phase TEXT NOT NULL,
+            model TEXT NOT NULL,
+            status TEXT NOT NULL,
+            execution_time REAL,
+            rows_affected INTEGER
+        )
+    """)
+    db.commit()
+    return db
+
+
+def get_rolling_medians(db: sqlite3.Connection, rows: list, window: int) -> dict:
+    """Return {(scale, phase, model): median execution_time} over the last `window` successful runs."""
+    medians = {}
+    for row in rows:
+        key = (row['scale'], row['phase'], row['model'])
+        history = db.execute(
+            """
+            SELECT execution_time FROM benchmark_runs
+            WHERE scale = ? AND phase = ? AND model = ? AND status = 'success'
+            ORDER BY run_at DESC
+            LIMIT ?
+            """,
+            (*key, window)
+        ).fetchall()
+        if history:
+            medians[key] = statistics.median(r[0] for r in history)
+    return medians
+
+
+def record_run(db: sqlite3.Connection, run_id: str, run_at: str, git_commit: str, rows: list):
+    """Append this run's timings to the history store."""
+    db.executemany(
+        """
+        INSERT INTO benchmark_runs (
+            run_id, run_at, git_commit, scale, phase, model, status, execution_time, rows_affected
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (run_id, run_at, git_commit, r['scale'], r['phase'], r['model'],
+             r['status'], r['execution_time'], r['rows_affected'])
+            for r in rows
+        ]
+    )
+    db.commit()
+
+
+def find_regressions(rows: list, medians: dict, threshold_pct: float, min_seconds: float) -> list:
+    """Return rows slower than their rolling median by more than threshold_pct and min_seconds."""
+    regressions = []
+    for row in rows:
+        median = medians.get((row['scale'], row['phase'], row['model']))
+        if row['status'] != 'success' or not median:
+            continue
+        growth_pct = 100.0 * (row['execution_time'] - median) / median
+        if growth_pct > threshold_pct and row['execution_time'] - median > min_seconds:
+            regressions.append({**row, 'median': median, 'growth_pct': growth_pct})
+    return sorted(regressions, key=lambda r: -r['growth_pct'])
+
+
+def get_git_commit() -> str:
+    """Short commit hash of the benchmarked tree, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(path: Path, run_at: str, git_commit: str, rows: list, medians: dict, regressions: list) -> Path:
+    """Write a Markdown report with per-model timings against the rolling median."""
+    lines = [
+        "# dbt Benchmark Report",
+        "",
+        f"Run at: {run_at}  ",
+        f"Commit: {git_commit or 'unknown'}",
+        "",
+    ]
+
+    if regressions:
+        lines += ["## Regressions", "", "| Scale | Phase | Model | Time (s) | Median (s) | Change |", "|---|---|---|---|---|---|"]
+        lines += [
+            f"| {r['scale']:g} | {r['phase']} | {r['model']} | {r['execution_time']:.2f} | {r['median']:.2f} | +{r['growth_pct']:.1f}% |"
+            for r in regressions
+        ]
+        lines.append("")
+
+    for scale in sorted({r['scale'] for r in rows}):
+        lines += [f"## Scale {scale:g}", "", "| Phase | Model | Status | Time (s) | Median (s) | Rows |", "|---|---|---|---|---|---|"]
+        scale_rows = [r for r in rows if r['scale'] == scale]
+        for r in sorted(scale_rows, key=lambda r: (r['phase'], -r['execution_time'])):
+            median = medians.get((r['scale'], r['phase'], r['model']))
+            median_text = f"{median:.2f}" if median else "-"
+            rows_text = f"{r['rows_affected']:,}" if r['rows_affected'] is not None else "-"
+            lines.append(f"| {r['phase']} | {r['model']} | {r['status']} | {r['execution_time']:.2f} | {median_text} | {rows_text} |")
+        lines.append("")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines), encoding='utf-8')
+    return path
+
+
+def print_summary(rows: list, regressions: list, threshold_pct: float, top: int):
+    """Print the slowest models per scale and phase, then any regressions."""
+    print("\n" + "=" * 80)
+    print("BENCHMARK RESULTS")
+    print("=" * 80)
+
+    for scale in sorted({r['scale'] for r in rows}):
+        print(f"\nScale {scale:g}")
+        for phase, _ in PHASES:
+            phase_rows = [r for r in rows if r['scale'] == scale and r['phase'] == phase]
+            total = next((r for r in phase_rows if r['model'] == 'TOTAL'), None)
+            if total:
+                print(f"  {phase}: {total['execution_time']:.2f}s total")
+            models = sorted((r for r in phase_rows if r['model'] != 'TOTAL'), key=lambda r: -r['execution_time'])
+            for r in models[:top]:
+                print(f"    {r['execution_time']:8.2f}s  {r['model']}")
+
+    if regressions:
+        print(f"\n⚠️  REGRESSIONS (> {threshold_pct:.0f}% above rolling median):")
+        for r in regressions:
+            print(f"   - scale {r['scale']:g} {r['phase']} {r['model']}: "
+                  f"{r['execution_time']:.2f}s vs {r['median']:.2f}s (+{r['growth_pct']:.1f}%)")
+    else:
+        print(f"\n✓ No regressions above {threshold_pct:.0f}%")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dbt project on synthetic data with dbt-duckdb')
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.1, 1.0],
+                        help='Synthetic data scale factors (1 = ~1M observations)')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=date(2026, 1, 1),
+                        help='Latest generated timestamp; fixed so data is identical between runs')
+    parser.add_argument('--delta-fraction', type=float, default=0.01,
+                        help='Size of the incremental batch relative to the base data')
+    parser.add_argument('--threads', type=int, default=4, help='dbt threads')
+    parser.add_argument('--project-dir', type=Path, default=REPO_ROOT, help='dbt project directory')
+    parser.add_argument('--work-dir', type=Path, default=WORK_DIR, help='Where data and DuckDB files are kept')
+    parser.add_argument('--reuse-data', action='store_true', help='Reuse previously generated data for a scale')
+    parser.add_argument('--regression-threshold', type=float, default=25.0,
+                        help='Flag models this %% slower than their rolling median (default: 25)')
+    parser.add_argument('--min-seconds', type=float, default=0.5,
+                        help='Ignore slowdowns smaller than this many seconds (default: 0.5)')
+    parser.add_argument('--history-window', type=int, default=10,
+                        help='Number of previous runs used for the rolling median (default: 10)')
+    parser.add_argument('--top', type=int, default=5, help='Slowest models shown per phase')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 if any regression is found')
+    args = parser.parse_args()
+
+    if duckdb is None:
+        print("✗ duckdb is not installed (pip install duckdb dbt-duckdb)")
+        sys.exit(1)
+    if shutil.which('dbt') is None:
+        print("✗ dbt is not on PATH (pip install dbt-duckdb)")
+        sys.exit(1)
+
+    args.work_dir = args.work_dir.resolve()
+    args.project_dir = args.project_dir.resolve()
+    run_id = uuid.uuid4().hex
+    run_at = datetime.now().isoformat(timespec='seconds')
+    git_commit = get_git_commit()
+
+    print(f"Benchmarking {args.project_dir} at scales {', '.join(f'{s:g}' for s in args.scales)}")
+    rows = []
+    for scale in args.scales:
+        print(f"\nScale {scale:g}")
+        rows.extend(benchmark_scale(scale, args))
+
+    db = open_history()
+    try:
+        # Medians come from earlier runs only, so read them before recording this one
+        medians = get_rolling_medians(db, rows, args.history_window)
+        record_run(db, run_id, run_at, git_commit, rows)
+    finally:
+        db.close()
+
+    regressions = find_regressions(rows, medians, args.regression_threshold, args.min_seconds)
+    report_path = REPORT_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    write_report(report_path, run_at, git_commit, rows, medians, regressions)
+
+    print_summary(rows, regressions, args.regression_threshold, args.top)
+    print(f"\nReport written: {report_path}")
+
+    failed = any(r['status'] != 'success' for r in rows)
+    sys.exit(1 if failed or (regressions and args.fail_on_regression) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Shared helpers for the scripts in this directory.
+
+Scripts are run directly rather than installed, so each one puts scripts/ on
+sys.path before importing from here:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from common import fetch
+"""
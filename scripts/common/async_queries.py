@@ -0,0 +1,116 @@
+"""
+Concurrent asynchronous queries for the test scripts.
+
+Queries are submitted with execute_async, up to `jobs` at a time, and polled
+until complete, so the total run time approaches that of the slowest query
+rather than the sum:
+
+    raw_conn = connection.raw_connection(session)
+    rows = async_queries.run_queries(raw_conn, queries, jobs)
+
+If a query fails and the caller passes no on_error handler, or the run is
+interrupted, every query still in flight is cancelled before the error is
+raised, so an aborted run does not leave warehouse queries running.
+"""
+
+import time
+
+from common import fetch
+
+# Seconds between status polls
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def submit_query(raw_conn, query: str) -> str:
+    """Submit a query with execute_async and return its query ID."""
+    cursor = raw_conn.cursor()
+    try:
+        cursor.execute_async(query)
+        return cursor.sfqid
+    finally:
+        cursor.close()
+
+
+def fetch_rows(raw_conn, query_id: str) -> list:
+    """Fetch the result rows of a completed asynchronous query as dicts with upper-case keys."""
+    cursor = raw_conn.cursor()
+    try:
+        cursor.get_results_from_sfqid(query_id)
+        records, _ = fetch.fetch_records(fetch.stream_cursor(cursor))
+        return [{column.upper(): value for column, value in row.items()} for row in records]
+    finally:
+        cursor.close()
+
+
+def cancel_queries(raw_conn, query_ids):
+    """Cancel the given queries, ignoring any that have already finished."""
+    for query_id in query_ids:
+        cursor = raw_conn.cursor()
+        try:
+            cursor.execute(f"SELECT SYSTEM$CANCEL_QUERY('{query_id}')")
+        except Exception:
+            pass
+        finally:
+            cursor.close()
+
+
+def run_queries(raw_conn, queries: dict, jobs: int, submit=submit_query, collect=fetch_rows,
+                on_submit=None, on_complete=None, on_error=None) -> dict:
+    """
+    Run queries with up to `jobs` in flight at once and return their results by key.
+
+    `queries` maps each key to whatever submit(raw_conn, query) accepts; submit
+    returns the query ID, and collect(raw_conn, query_id) the result once the
+    query completes. Results are returned in the order of `queries`.
+
+    on_submit(key, query_id) and on_complete(key, query_id, result) report
+    progress. A failed submission, poll or fetch calls
+    on_error(key, query_id, error), with query_id None if submission failed,
+    and its return value becomes that key's result. Without on_error the error
+    is raised once the queries still in flight are cancelled.
+    """
+    pending = list(queries.items())
+    running = {}  # query_id -> key
+    results = {}
+
+    try:
+        while pending or running:
+            # Top up the pool of in-flight queries
+            while pending and len(running) < jobs:
+                key, query = pending.pop(0)
+                try:
+                    query_id = submit(raw_conn, query)
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    results[key] = on_error(key, None, e)
+                    continue
+                running[query_id] = key
+                if on_submit:
+                    on_submit(key, query_id)
+
+            # Collect any queries that have finished
+            for query_id, key in list(running.items()):
+                try:
+                    status = raw_conn.get_query_status_throw_if_error(query_id)
+                    if raw_conn.is_still_running(status):
+                        continue
+                    result = collect(raw_conn, query_id)
+                except Exception as e:
+                    del running[query_id]
+                    if on_error is None:
+                        raise
+                    results[key] = on_error(key, query_id, e)
+                    continue
+                del running[query_id]
+                results[key] = result
+                if on_complete:
+                    on_complete(key, query_id, result)
+
+            if running:
+                time.sleep(POLL_INTERVAL_SECONDS)
+    except BaseException:
+        cancel_queries(raw_conn, list(running))
+        raise
+
+    return {key: results[key] for key in queries}
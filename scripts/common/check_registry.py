@@ -0,0 +1,567 @@
+"""
+Declarative registry of data quality checks (checks.yml) and its compilers.
+
+Each source table is listed once, with its base model and the checks on its
+columns. The registry is the single source for:
+- the check lists the check_*.py scripts iterate over
+- the generic tests on the base models, and the incremental_window tests on
+  the stable models, in their schema.yml files (compile_schema)
+- one fused source query that scans every table once (plan_scans + compile_sql),
+  run by run_tests.py as test_registry_checks.sql
+
+    from common import check_registry
+    tables = check_registry.load_registry()
+    COMPLETENESS_CHECKS = check_registry.completeness_checks(tables)
+
+Planning: each table gets exactly one scan, selecting the union of the columns
+its checks need. Referential integrity parents and CONCEPT_MAP derive their key
+sets from their own scan, so a new check widens an existing scan instead of
+adding another one.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+
+import yaml
+
+REGISTRY_FILE = Path(__file__).parent / 'checks.yml'
+
+# Registry key -> dbt generic test name
+CHECK_KINDS = OrderedDict([
+    ('completeness', 'column_completeness'),
+    ('concept_mapping', 'concept_mapping_integrity'),
+    ('references', 'referential_integrity'),
+])
+CHECK_OPTIONS = {
+    'completeness': {'tolerance_percent', 'source_tolerance_percent', 'only'},
+    'concept_mapping': {'tolerance_percent', 'source_tolerance_percent', 'only'},
+    'references': {'table', 'field', 'tolerance_percent', 'source_tolerance_percent', 'only'},
+}
+SCOPES = ('source', 'dbt')
+
+# Concept IDs are checked against CONCEPT_MAP.source_code_id
+CONCEPT_MAP_TABLE = 'CONCEPT_MAP'
+CONCEPT_MAP_KEY = 'source_code_id'
+
+# dbt layers the registry compiles tests into. The stable incremental models
+# get the completeness and concept checks of their base model, run in
+# incremental_window mode so each run only tests the rows it added.
+LAYERS = ('base', 'stable')
+STABLE_CHECK_KINDS = ('completeness', 'concept_mapping')
+STABLE_TEST_ARGUMENTS = {'incremental_window': True}
+
+
+def _normalise_check(kind: str, spec, defaults: dict, where: str) -> dict:
+    """Expand a column's check entry (true or a mapping) into a full check dict."""
+    if spec is True or spec is None:
+        spec = {}
+    if not isinstance(spec, dict):
+        raise ValueError(f"{where}: {kind} must be true or a mapping")
+    unknown = set(spec) - CHECK_OPTIONS[kind]
+    if unknown:
+        raise ValueError(f"{where}: unknown {kind} option(s): {', '.join(sorted(unknown))}")
+
+    only = spec.get('only')
+    if only is not None and only not in SCOPES:
+        raise ValueError(f"{where}: only must be one of {', '.join(SCOPES)}")
+
+    tolerance = float(spec.get('tolerance_percent', defaults['tolerance_percent']))
+    source_default = (defaults.get('source_tolerance_percent') or {}).get(kind, tolerance)
+    check = {
+        'kind': kind,
+        'tolerance_percent': tolerance,
+        'source_tolerance_percent': float(spec.get('source_tolerance_percent', source_default)),
+        'scopes': (only,) if only else SCOPES,
+    }
+    if kind == 'references':
+        if 'table' not in spec:
+            raise ValueError(f"{where}: references needs a table")
+        check['table'] = spec['table']
+        check['field'] = spec.get('field', 'id')
+    return check
+
+
+def load_registry(path: Path = REGISTRY_FILE) -> list:
+    """
+    Load and validate the registry.
+
+    Returns table entries in file order:
+        {'schema', 'table', 'model', 'columns': [{'name', 'checks': [check, ...]}]}
+    """
+    with open(path) as f:
+        raw = yaml.safe_load(f)
+    defaults = {'tolerance_percent': 1.0, **(raw.get('defaults') or {})}
+
+    tables = []
+    seen = set()
+    for entry in raw['tables']:
+        if entry['table'] in seen:
+            raise ValueError(f"{path.name}: table {entry['table']} is listed twice")
+        seen.add(entry['table'])
+
+        columns = []
+        for column in entry.get('columns') or []:
+            where = f"{entry['table']}.{column['name']}"
+            checks = []
+            for key, spec in column.items():
+                if key == 'name':
+                    continue
+                if key not in CHECK_KINDS:
+                    raise ValueError(f"{where}: unknown check '{key}'")
+                checks.append(_normalise_check(key, spec, defaults, where))
+            columns.append({'name': column['name'], 'checks': checks})
+
+        tables.append({
+            'schema': entry['schema'],
+            'table': entry['table'],
+            'model': entry['model'],
+            'columns': columns,
+        })
+
+    for entry, column, check in iter_checks(tables, 'references', scope=None):
+        if check['table'] not in seen:
+            raise ValueError(f"{entry['table']}.{column}: references unknown table {check['table']}")
+    return tables
+
+
+def find_table(tables: list, table_name: str) -> dict:
+    """Return the registry entry for a source table."""
+    for entry in tables:
+        if entry['table'] == table_name:
+            return entry
+    raise KeyError(table_name)
+
+
+def iter_checks(tables: list, kind: str, scope: str = 'source'):
+    """Yield (table entry, column name, check) for every check of one kind, optionally limited to a scope."""
+    for entry in tables:
+        for column in entry['columns']:
+            for check in column['checks']:
+                if check['kind'] == kind and (scope is None or scope in check['scopes']):
+                    yield entry, column['name'], check
+
+
+def completeness_checks(tables: list, scope: str = 'source') -> list:
+    """Completeness checks as (schema, table, field) tuples, in registry order."""
+    return [(entry['schema'], entry['table'], column) for entry, column, _ in iter_checks(tables, 'completeness', scope)]
+
+
+def concept_checks(tables: list, scope: str = 'source') -> list:
+    """Concept mapping checks as (schema, table, concept_field) tuples, in registry order."""
+    return [(entry['schema'], entry['table'], column) for entry, column, _ in iter_checks(tables, 'concept_mapping', scope)]
+
+
+def reference_checks(tables: list, scope: str = 'source') -> list:
+    """Referential integrity checks as dicts with child and parent schema, table and column."""
+    checks = []
+    for entry, column, check in iter_checks(tables, 'references', scope):
+        parent = find_table(tables, check['table'])
+        checks.append({
+            'child_schema': entry['schema'],
+            'child_table': entry['table'],
+            'child_column': column,
+            'parent_schema': parent['schema'],
+            'parent_table': parent['table'],
+            'parent_column': check['field'],
+            'tolerance_percent': check['tolerance_percent'],
+        })
+    return checks
+
+
+# ============================================
+# Scan planning and SQL compilation
+# ============================================
+
+def _add_column(scan: dict, column: str):
+    if column not in scan['columns']:
+        scan['columns'].append(column)
+
+
+def plan_scans(tables: list, scope: str = 'source') -> OrderedDict:
+    """
+    Plan one scan per table covering every check in scope.
+
+    Returns {(schema, table): scan} in registry order, where each scan lists the
+    columns to read, its completeness, concept and reference checks, and the
+    key fields other tables join to. Source scans use each check's
+    source_tolerance_percent.
+    """
+    plan = OrderedDict()
+    tolerance_key = 'source_tolerance_percent' if scope == 'source' else 'tolerance_percent'
+
+    def scan_for(entry):
+        key = (entry['schema'], entry['table'])
+        if key not in plan:
+            plan[key] = {
+                'schema': entry['schema'],
+                'table': entry['table'],
+                'columns': [],
+                'completeness': [],
+                'concepts': [],
+                'references': [],
+                'keys': [],
+            }
+        return plan[key]
+
+    for entry in tables:
+        for column in entry['columns']:
+            for check in column['checks']:
+                if scope not in check['scopes']:
+                    continue
+                scan = scan_for(entry)
+                _add_column(scan, column['name'])
+                if check['kind'] == 'completeness':
+                    scan['completeness'].append((column['name'], check[tolerance_key]))
+                elif check['kind'] == 'concept_mapping':
+                    scan['concepts'].append((column['name'], check[tolerance_key]))
+                    parent = scan_for(find_table(tables, CONCEPT_MAP_TABLE))
+                    _add_column(parent, CONCEPT_MAP_KEY)
+                    if CONCEPT_MAP_KEY not in parent['keys']:
+                        parent['keys'].append(CONCEPT_MAP_KEY)
+                else:
+                    scan['references'].append((column['name'], check['table'], check['field'], check[tolerance_key]))
+                    parent = scan_for(find_table(tables, check['table']))
+                    _add_column(parent, check['field'])
+                    if check['field'] not in parent['keys']:
+                        parent['keys'].append(check['field'])
+
+    order = [(entry['schema'], entry['table']) for entry in tables]
+    return OrderedDict((key, plan[key]) for key in order if key in plan)
+
+
+def _scan_name(table: str) -> str:
+    return f"scan_{table.lower()}"
+
+
+def _keys_name(table: str, field: str) -> str:
+    return f"keys_{table.lower()}_{field.lower()}"
+
+
+def _values(rows: list) -> str:
+    return ",\n        ".join(rows)
+
+
+def _union(selects: list) -> str:
+    return "\n    UNION ALL\n    ".join(selects)
+
+
+def compile_sql(plan: OrderedDict, database: str, source_file: str = 'checks.yml') -> str:
+    """
+    Compile a scan plan into one query returning standardised test results.
+
+    Output columns match the other test_*.sql files (test_name, table_name,
+    test_subject, status, metric_value, threshold, details), so run_tests.py
+    can run the compiled file like any hand-written test.
+    """
+    ctes = []
+    completeness_rows = []
+    reference_rows = []
+    concept_rows = []
+    concept_keys = []
+
+    for scan in plan.values():
+        table = scan['table']
+        columns = ",\n        ".join(scan['columns'])
+        ctes.append(f"""{_scan_name(table)} AS (
+    SELECT
+        {columns}
+    FROM {database}.{scan['schema']}.{table}
+)""")
+        for field in scan['keys']:
+            ctes.append(f"""{_keys_name(table, field)} AS (
+    SELECT DISTINCT {field} AS key_value
+    FROM {_scan_name(table)}
+    WHERE {field} IS NOT NULL
+)""")
+
+    for scan in plan.values():
+        table = scan['table']
+        if scan['completeness'] or scan['references']:
+            measures = ["COUNT(*) AS total_rows"]
+            joins = []
+            for i, (column, tolerance) in enumerate(scan['completeness'], 1):
+                measures.append(f"COUNT_IF(s.{column} IS NULL) AS null_count_{i}")
+                completeness_rows.append(
+                    f"SELECT '{table}' AS table_name, '{column}' AS column_name, {tolerance} AS tolerance_percent, "
+                    f"total_rows, null_count_{i} AS null_count FROM stats_{table.lower()}"
+                )
+            for i, (column, parent_table, field, tolerance) in enumerate(scan['references'], 1):
+                measures.append(f"COUNT(DISTINCT s.{column}) AS fk_distinct_{i}")
+                measures.append(f"COUNT(DISTINCT CASE WHEN r{i}.key_value IS NULL THEN s.{column} END) AS orphan_distinct_{i}")
+                measures.append(f"COUNT_IF(s.{column} IS NOT NULL AND r{i}.key_value IS NULL) AS orphan_rows_{i}")
+                joins.append(f"LEFT JOIN {_keys_name(parent_table, field)} r{i} ON s.{column} = r{i}.key_value")
+                reference_rows.append(
+                    f"SELECT '{table}' AS table_name, '{column}' AS column_name, '{parent_table}.{field}' AS parent, "
+                    f"{tolerance} AS tolerance_percent, fk_distinct_{i} AS fk_distinct, "
+                    f"orphan_distinct_{i} AS orphan_distinct, orphan_rows_{i} AS orphan_rows FROM stats_{table.lower()}"
+                )
+            measure_sql = ",\n        ".join(measures)
+            join_sql = "".join(f"\n    {join}" for join in joins)
+            ctes.append(f"""stats_{table.lower()} AS (
+    SELECT
+        {measure_sql}
+    FROM {_scan_name(table)} s{join_sql}
+)""")
+
+        if scan['concepts']:
+            fields = [column for column, _ in scan['concepts']]
+            for column, tolerance in scan['concepts']:
+                concept_rows.append(f"('{table}', '{column}', {tolerance})")
+            field_case = "\n".join(f"            WHEN GROUPING({field}) = 0 THEN '{field}'" for field in fields)
+            id_case = "\n".join(f"            WHEN GROUPING({field}) = 0 THEN {field}" for field in fields)
+            grouping_sets = ", ".join(f"({field})" for field in fields)
+            concept_keys.append(f"""    SELECT *
+    FROM (
+        SELECT
+            '{table}' AS table_name,
+            CASE
+{field_case}
+            END AS concept_field,
+            CASE
+{id_case}
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM {_scan_name(table)}
+        GROUP BY GROUPING SETS ({grouping_sets})
+    ) keys
+    WHERE concept_id IS NOT NULL""")
+
+    results = []
+    if completeness_rows:
+        ctes.append(f"""completeness_results AS (
+    {_union(completeness_rows)}
+)""")
+        results.append("""SELECT
+    'column_completeness' AS test_name,
+    table_name,
+    column_name AS test_subject,
+    CASE WHEN COALESCE(100.0 * null_count / NULLIF(total_rows, 0), 0) <= tolerance_percent THEN 'PASS' ELSE 'FAIL' END AS status,
+    ROUND(100.0 - COALESCE(100.0 * null_count / NULLIF(total_rows, 0), 0), 2) AS metric_value,
+    ROUND(100.0 - tolerance_percent, 2) AS threshold,
+    OBJECT_CONSTRUCT(
+        'total_rows', total_rows,
+        'null_count', null_count,
+        'null_percentage', ROUND(COALESCE(100.0 * null_count / NULLIF(total_rows, 0), 0), 4),
+        'threshold_null_pct', tolerance_percent
+    )::VARCHAR AS details
+FROM completeness_results""")
+
+    if reference_rows:
+        ctes.append(f"""reference_results AS (
+    {_union(reference_rows)}
+)""")
+        results.append("""SELECT
+    'referential_integrity' AS test_name,
+    table_name,
+    column_name AS test_subject,
+    CASE WHEN COALESCE(100.0 * orphan_distinct / NULLIF(fk_distinct, 0), 0) <= tolerance_percent THEN 'PASS' ELSE 'FAIL' END AS status,
+    ROUND(100.0 - COALESCE(100.0 * orphan_distinct / NULLIF(fk_distinct, 0), 0), 2) AS metric_value,
+    ROUND(100.0 - tolerance_percent, 2) AS threshold,
+    OBJECT_CONSTRUCT(
+        'references', parent,
+        'distinct_fk', fk_distinct,
+        'orphaned_distinct_fk', orphan_distinct,
+        'orphaned_rows', orphan_rows,
+        'tolerance_percent', tolerance_percent
+    )::VARCHAR AS details
+FROM reference_results""")
+
+    if concept_rows:
+        union_keys = "\n    UNION ALL\n".join(concept_keys)
+        ctes.append(f"""concept_keys AS (
+{union_keys}
+)""")
+        ctes.append(f"""concept_checks AS (
+    SELECT *
+    FROM (VALUES
+        {_values(concept_rows)}
+    ) AS checks(table_name, concept_field, tolerance_percent)
+)""")
+        ctes.append(f"""concept_results AS (
+    SELECT
+        checks.table_name,
+        checks.concept_field,
+        checks.tolerance_percent,
+        COUNT(keys.concept_id) AS total_distinct,
+        COALESCE(SUM(keys.row_count), 0) AS total_rows,
+        COUNT_IF(keys.concept_id IS NOT NULL AND cm.key_value IS NULL) AS unmapped_concepts,
+        COALESCE(SUM(CASE WHEN cm.key_value IS NULL THEN keys.row_count END), 0) AS unmapped_rows
+    FROM concept_checks checks
+    LEFT JOIN concept_keys keys
+        ON keys.table_name = checks.table_name AND keys.concept_field = checks.concept_field
+    LEFT JOIN {_keys_name(CONCEPT_MAP_TABLE, CONCEPT_MAP_KEY)} cm ON keys.concept_id = cm.key_value
+    GROUP BY checks.table_name, checks.concept_field, checks.tolerance_percent
+)""")
+        results.append("""SELECT
+    'concept_mapping_integrity' AS test_name,
+    table_name,
+    concept_field AS test_subject,
+    CASE WHEN COALESCE(100.0 * unmapped_concepts / NULLIF(total_distinct, 0), 0) <= tolerance_percent THEN 'PASS' ELSE 'FAIL' END AS status,
+    ROUND(100.0 - COALESCE(100.0 * unmapped_concepts / NULLIF(total_distinct, 0), 0), 2) AS metric_value,
+    ROUND(100.0 - tolerance_percent, 2) AS threshold,
+    OBJECT_CONSTRUCT(
+        'total_distinct_concepts', total_distinct,
+        'total_rows', total_rows,
+        'unmapped_concepts', unmapped_concepts,
+        'unmapped_rows', unmapped_rows,
+        'tolerance_percent', tolerance_percent
+    )::VARCHAR AS details
+FROM concept_results""")
+
+    scans = len(plan)
+    checks = len(completeness_rows) + len(reference_rows) + len(concept_rows)
+    header = f"""/*
+    Test: Registry Checks
+
+    GENERATED from scripts/common/{source_file} by scripts/tests/compile_checks.py - do not edit.
+    Regenerate with: python scripts/tests/compile_checks.py sql --write
+
+    {checks} checks from {scans} table scans: every completeness, referential integrity
+    and concept mapping check on a table reads from that table's single scan CTE.
+*/
+"""
+    body = ",\n\n".join(ctes)
+    union = "\n\nUNION ALL\n\n".join(results)
+    return f"""{header}
+WITH {body}
+
+{union}
+
+ORDER BY status DESC, test_name, table_name, test_subject;
+"""
+
+
+# ============================================
+# dbt schema compilation
+# ============================================
+
+class _SchemaDumper(yaml.SafeDumper):
+    """Indent nested lists, as models/olids/base/schema.yml is written."""
+
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+
+def layer_model(entry: dict, layer: str = 'base') -> str:
+    """Name of a registry table's model in a dbt layer."""
+    if layer == 'stable':
+        return entry['model'].replace('base_olids_', 'stable_', 1)
+    return entry['model']
+
+
+def layer_checks(column: dict, layer: str = 'base') -> list:
+    """A column's checks that compile to dbt tests in a layer."""
+    return [
+        check for check in column['checks']
+        if 'dbt' in check['scopes'] and (layer == 'base' or check['kind'] in STABLE_CHECK_KINDS)
+    ]
+
+
+def _dbt_test(check: dict, tables: list, layer: str = 'base') -> dict:
+    arguments = {}
+    if check['kind'] == 'references':
+        arguments['to'] = f"ref('{find_table(tables, check['table'])['model']}')"
+        arguments['field'] = check['field']
+    arguments['tolerance_percent'] = check['tolerance_percent']
+    if layer == 'stable':
+        arguments.update(STABLE_TEST_ARGUMENTS)
+    return {CHECK_KINDS[check['kind']]: {'arguments': arguments}}
+
+
+def _is_registry_test(test) -> bool:
+    name = test if isinstance(test, str) else next(iter(test))
+    return name in CHECK_KINDS.values()
+
+
+def compile_columns(entry: dict, existing: list, tables: list, layer: str = 'base') -> list:
+    """
+    Merge a table's registry checks for a layer into a model's existing column list.
+
+    Registry tests replace any existing tests of the same kinds; other tests and
+    column keys are kept. New columns are placed after their registry predecessor.
+    """
+    registry = OrderedDict(
+        (column['name'], [_dbt_test(check, tables, layer) for check in layer_checks(column, layer)])
+        for column in entry['columns']
+    )
+    registry = OrderedDict((name, tests) for name, tests in registry.items() if tests)
+
+    order = [column['name'] for column in existing]
+    names = list(registry)
+    for i, name in enumerate(names):
+        if name in order:
+            continue
+        previous = [n for n in names[:i] if n in order]
+        order.insert(order.index(previous[-1]) + 1 if previous else len(order), name)
+
+    existing_by_name = {column['name']: column for column in existing}
+    columns = []
+    for name in order:
+        column = dict(existing_by_name.get(name, {'name': name}))
+        tests = registry.get(name, []) + [t for t in column.get('tests', []) if not _is_registry_test(t)]
+        column.pop('tests', None)
+        if tests:
+            column['tests'] = tests
+        if len(column) > 1:
+            columns.append(column)
+    return columns
+
+
+def _dump_columns(columns: list) -> list:
+    text = yaml.dump({'columns': columns}, Dumper=_SchemaDumper, sort_keys=False, width=120, default_flow_style=False)
+    return [f"  {line}" if line else line for line in text.splitlines()]
+
+
+def compile_schema(tables: list, schema_text: str, layer: str = 'base') -> str:
+    """
+    Rewrite the columns blocks of a layer's dbt schema.yml from the registry.
+
+    Only each model's `columns:` block is regenerated; names, descriptions and
+    formatting elsewhere are left exactly as written.
+    """
+    lines = schema_text.splitlines()
+    models = yaml.safe_load(schema_text)['models']
+    existing = {model['name']: model.get('columns') or [] for model in models}
+
+    tested = [
+        entry for entry in tables
+        if any(layer_checks(column, layer) for column in entry['columns'])
+    ]
+    missing = [layer_model(entry, layer) for entry in tested if layer_model(entry, layer) not in existing]
+    if missing:
+        raise ValueError(f"models not in schema: {', '.join(missing)}")
+    by_model = {layer_model(entry, layer): entry for entry in tables}
+
+    starts = [i for i, line in enumerate(lines) if line.startswith('- name: ')]
+    output = lines[:starts[0]] if starts else lines
+    for n, start in enumerate(starts):
+        end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+        block = lines[start:end]
+        model = block[0][len('- name: '):].strip()
+        if model not in by_model:
+            output.extend(block)
+            continue
+
+        columns = compile_columns(by_model[model], existing[model], tables, layer)
+        try:
+            col_start = block.index('  columns:')
+        except ValueError:
+            col_start = None
+        if col_start is None:
+            # Keep trailing blank lines after the new block
+            tail = len(block)
+            while tail > 1 and not block[tail - 1].strip():
+                tail -= 1
+            head, rest = block[:tail], block[tail:]
+        else:
+            col_end = col_start + 1
+            while col_end < len(block) and (not block[col_end].strip() or block[col_end].startswith('   ')):
+                col_end += 1
+            while col_end > col_start + 1 and not block[col_end - 1].strip():
+                col_end -= 1
+            head, rest = block[:col_start], block[col_end:]
+        output.extend(head)
+        if columns:
+            output.extend(_dump_columns(columns))
+        output.extend(rest)
+    return "\n".join(output) + ("\n" if schema_text.endswith("\n") else "")
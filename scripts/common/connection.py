@@ -0,0 +1,137 @@
+"""
+Shared Snowflake sessions for all scripts.
+
+Replaces the per-script connection_parameters dicts. Sessions are pooled per
+(engine, role, warehouse) so repeated get_session() calls within a script
+reuse one login, and SSO ID tokens are cached with
+client_store_temporary_credential so later scripts in the same run (and for
+the token's lifetime, typically 4 hours) skip the browser round trip.
+
+Environment (.env):
+    SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, SNOWFLAKE_ROLE, SNOWFLAKE_WAREHOUSE
+    SNOWFLAKE_AUTHENTICATOR   default: externalbrowser
+    SNOWFLAKE_PASSWORD        used when the authenticator is not externalbrowser
+    OLIDS_SCRIPTS_ENGINE      default: snowpark (falls back to connector)
+
+Engines are pluggable: register_engine('duckdb', factory) lets a local
+stand-in replace Snowflake, e.g. in tests or the duckdb test backend. A
+factory takes the connection parameters as keyword arguments.
+
+Token caching on Linux needs the keyring extra:
+    pip install "snowflake-connector-python[secure-local-storage]"
+"""
+
+import atexit
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENGINE_ENV_VAR = 'OLIDS_SCRIPTS_ENGINE'
+
+_engines = {}
+_pool = {}  # (engine, role, warehouse) -> session
+
+
+def connection_parameters(role: str = None, warehouse: str = None, use_env_warehouse: bool = True) -> dict:
+    """
+    Build connection parameters from the environment, with SSO token caching enabled.
+
+    With use_env_warehouse=False and no warehouse, the role's default warehouse is used.
+    """
+    authenticator = os.getenv('SNOWFLAKE_AUTHENTICATOR', 'externalbrowser')
+    if warehouse is None and use_env_warehouse:
+        warehouse = os.getenv('SNOWFLAKE_WAREHOUSE')
+    params = {
+        'account': os.getenv('SNOWFLAKE_ACCOUNT'),
+        'user': os.getenv('SNOWFLAKE_USER'),
+        'authenticator': authenticator,
+        'role': role or os.getenv('SNOWFLAKE_ROLE'),
+        'warehouse': warehouse,
+        # Cache the SSO ID token so later logins skip the browser
+        'client_store_temporary_credential': True,
+        'client_session_keep_alive': True,
+    }
+    if authenticator != 'externalbrowser' and os.getenv('SNOWFLAKE_PASSWORD'):
+        params['password'] = os.getenv('SNOWFLAKE_PASSWORD')
+    # Omit unset values so the user's defaults (e.g. default warehouse) apply
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def _create_snowpark_session(**params):
+    from snowflake.snowpark import Session
+    return Session.builder.configs(params).create()
+
+
+def _create_connector_connection(**params):
+    import snowflake.connector
+    return snowflake.connector.connect(**params)
+
+
+def register_engine(name: str, factory):
+    """Register a session factory under an engine name (overrides any existing one)."""
+    _engines[name] = factory
+
+
+register_engine('snowpark', _create_snowpark_session)
+register_engine('connector', _create_connector_connection)
+
+
+def default_engine() -> str:
+    """Engine from OLIDS_SCRIPTS_ENGINE, else Snowpark if installed, else the plain connector."""
+    configured = os.getenv(ENGINE_ENV_VAR)
+    if configured:
+        return configured
+    try:
+        import snowflake.snowpark  # noqa: F401
+        return 'snowpark'
+    except ImportError:
+        return 'connector'
+
+
+def _is_open(session) -> bool:
+    """Whether a pooled session can still be used."""
+    raw = raw_connection(session)
+    is_closed = getattr(raw, 'is_closed', None)
+    return not is_closed() if callable(is_closed) else True
+
+
+def get_session(role: str = None, warehouse: str = None, engine: str = None, use_env_warehouse: bool = True):
+    """
+    Return a pooled session, creating (and logging in) only on first use.
+
+    Sessions are keyed by engine, role and warehouse, so scripts that need two
+    roles get two sessions and everything else shares one.
+    """
+    engine = engine or default_engine()
+    if engine not in _engines:
+        raise ValueError(f"Unknown engine '{engine}'. Registered: {', '.join(sorted(_engines))}")
+
+    params = connection_parameters(role, warehouse, use_env_warehouse)
+    key = (engine, params.get('role'), params.get('warehouse'))
+    session = _pool.get(key)
+    if session is None or not _is_open(session):
+        session = _engines[engine](**params)
+        _pool[key] = session
+    return session
+
+
+def raw_connection(session):
+    """Return the connector connection behind a Snowpark session (other sessions are returned as is)."""
+    if hasattr(session, 'connection') and hasattr(session, 'sql'):
+        return session.connection
+    return session
+
+
+def close_all():
+    """Close every pooled session. Registered to run at exit."""
+    while _pool:
+        _, session = _pool.popitem()
+        try:
+            session.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_all)
@@ -0,0 +1,301 @@
+"""
+Memory-bounded streaming fetch for query results.
+
+Results are read as Arrow record batches and handed to a sink one batch at a
+time, so peak memory is roughly one batch regardless of result size:
+
+    batches = fetch.stream_query(session, query)
+    rows_written = fetch.write_csv(batches, OUTPUT_DIR / 'failures.csv')
+
+Sources (anything with a cursor):
+- Snowpark sessions: the wrapped connector connection is used directly
+- snowflake.connector connections and cursors, via fetch_arrow_batches()
+- DuckDB connections, via fetch_record_batch()
+
+Sinks are plain functions that consume an iterator of batches:
+write_csv, write_parquet, write_partitioned (one file per column value, hive
+layout), fetch_records (bounded list of dicts), iter_records, iter_pandas and
+aggregate.
+"""
+
+import csv
+import gzip
+import io
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from common import connection
+
+# Rows per batch handed to sinks. Snowflake returns result chunks of varying
+# size, so batches are re-cut to this size before reaching the sink.
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def get_cursor(conn):
+    """Return a new cursor for a Snowpark session, connector connection or DuckDB connection."""
+    return connection.raw_connection(conn).cursor()
+
+
+def _normalise_types(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """
+    Widen integer and decimal columns to a fixed width.
+
+    Snowflake picks the narrowest Arrow type per result chunk, so the same
+    column can arrive as int8 in one chunk and int64 in the next.
+    """
+    fields = []
+    for field in batch.schema:
+        if pa.types.is_integer(field.type):
+            fields.append(field.with_type(pa.int64()))
+        elif pa.types.is_decimal(field.type):
+            fields.append(field.with_type(pa.decimal128(38, field.type.scale)))
+        else:
+            fields.append(field)
+    schema = pa.schema(fields)
+    if schema.equals(batch.schema):
+        return batch
+    return pa.Table.from_batches([batch]).cast(schema).combine_chunks().to_batches()[0]
+
+
+def rebatch(batches, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Re-cut an iterator of record batches/tables into batches of exactly batch_size rows (last may be short)."""
+    pending = []
+    pending_rows = 0
+    schema = None
+    produced = False
+
+    for batch in batches:
+        parts = batch.to_batches() if isinstance(batch, pa.Table) else [batch]
+        for part in parts:
+            part = _normalise_types(part)
+            schema = schema or part.schema
+            offset = 0
+            while offset < part.num_rows:
+                take = min(batch_size - pending_rows, part.num_rows - offset)
+                pending.append(part.slice(offset, take))
+                pending_rows += take
+                offset += take
+                if pending_rows == batch_size:
+                    yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+                    pending, pending_rows, produced = [], 0, True
+
+    if pending:
+        yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+    elif not produced and schema is not None:
+        # Empty result: keep the real schema for sinks that write headers
+        yield pa.RecordBatch.from_pylist([], schema=schema)
+
+
+def _empty_batch(cursor, schema: pa.Schema = None) -> pa.RecordBatch:
+    """An empty batch with the result's columns, so sinks still see a schema."""
+    if schema is None:
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        schema = pa.schema([(name, pa.string()) for name in columns])
+    return pa.RecordBatch.from_pylist([], schema=schema)
+
+
+def _fetchmany_batches(cursor, batch_size: int):
+    """Fallback for results that are not in Arrow format (e.g. SHOW/DESCRIBE)."""
+    columns = [desc[0] for desc in cursor.description] if cursor.description else []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield pa.RecordBatch.from_pylist([dict(zip(columns, row)) for row in rows])
+
+
+def stream_cursor(cursor, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Yield the cursor's current result set as record batches of at most batch_size rows.
+
+    Always yields at least one (possibly empty) batch so the schema is known.
+    """
+    schema = None
+    if hasattr(cursor, 'fetch_record_batch'):
+        raw_batches = cursor.fetch_record_batch(batch_size)
+        schema = raw_batches.schema
+    else:
+        try:
+            raw_batches = cursor.fetch_arrow_batches()
+        except Exception:
+            # NotSupportedError for non-Arrow result formats
+            raw_batches = _fetchmany_batches(cursor, batch_size)
+
+    produced = False
+    for batch in rebatch(raw_batches, batch_size):
+        produced = True
+        yield batch
+    if not produced:
+        yield _empty_batch(cursor, schema)
+
+
+def stream_query(conn, sql: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Execute one statement and yield its result as record batches. The cursor closes when exhausted."""
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute(sql)
+        yield from stream_cursor(cursor, batch_size)
+    finally:
+        cursor.close()
+
+
+def iter_records(batches):
+    """Yield result rows as dicts, one batch in memory at a time."""
+    for batch in batches:
+        yield from batch.to_pylist()
+
+
+def iter_pandas(batches):
+    """Yield one pandas DataFrame per batch, for callers that aggregate in pandas."""
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def fetch_records(batches, max_rows: int = None) -> tuple:
+    """
+    Collect rows as dicts, keeping at most max_rows.
+
+    Returns (records, total_rows); rows beyond max_rows are counted but dropped.
+    """
+    records = []
+    total_rows = 0
+    for batch in batches:
+        if max_rows is None or len(records) < max_rows:
+            keep = batch if max_rows is None else batch.slice(0, max_rows - len(records))
+            records.extend(keep.to_pylist())
+        total_rows += batch.num_rows
+    return records, total_rows
+
+
+def aggregate(batches, reducer, initial):
+    """Fold batches into a value: reducer(accumulator, batch) -> accumulator."""
+    accumulator = initial
+    for batch in batches:
+        accumulator = reducer(accumulator, batch)
+    return accumulator
+
+
+def _csv_writer(handle, schema: pa.Schema):
+    """Write an unquoted header line and return a CSV writer that quotes values only where needed."""
+    header = io.StringIO()
+    csv.writer(header, lineterminator='\n').writerow(schema.names)
+    handle.write(header.getvalue().encode('utf-8'))
+    return pa_csv.CSVWriter(handle, schema, write_options=pa_csv.WriteOptions(include_header=False, quoting_style='needed'))
+
+
+def write_csv(batches, path: Path, compress: bool = None) -> int:
+    """
+    Stream batches to a CSV file and return the number of rows written.
+
+    The header is written unquoted and string values are quoted. Files ending
+    in .gz are gzip-compressed unless compress is given explicitly.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress is None:
+        compress = path.suffix == '.gz'
+
+    rows_written = 0
+    writer = None
+    handle = gzip.open(path, 'wb') if compress else open(path, 'wb')
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = _csv_writer(handle, batch.schema)
+            writer.write_batch(batch)
+            rows_written += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+        handle.close()
+    return rows_written
+
+
+def write_parquet(batches, path: Path, compression: str = 'zstd') -> int:
+    """Stream batches to a Parquet file and return the number of rows written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows_written = 0
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema, compression=compression)
+            writer.write_batch(batch)
+            rows_written += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_written
+
+
+# File formats accepted by write_partitioned: suffix -> compressed CSV?
+PARTITION_FORMATS = {'parquet': None, 'csv': False, 'csv.gz': True}
+
+
+def _partition_path(directory: Path, names: list, values: tuple) -> Path:
+    """Hive-style directory for one partition, e.g. table_name=OBSERVATION/concept_field=x."""
+    parts = []
+    for name, value in zip(names, values):
+        text = '__NULL__' if value is None else str(value).replace('/', '_').replace('\\', '_')
+        parts.append(f"{name}={text}")
+    return directory.joinpath(*parts)
+
+
+def write_partitioned(batches, directory: Path, partition_by: list, file_format: str = 'parquet') -> dict:
+    """
+    Stream batches into one file per distinct value of the partition columns.
+
+    Files are laid out hive-style (<directory>/<col>=<value>/.../part-0.<format>)
+    with the partition columns dropped from the file contents, so pyarrow,
+    DuckDB and Spark read the directory back as one dataset. One writer stays
+    open per partition, so input need not be sorted by partition. Returns {partition directory: rows written}.
+    """
+    if file_format not in PARTITION_FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Expected one of: {', '.join(PARTITION_FORMATS)}")
+    directory = Path(directory)
+    writers = {}  # partition values -> (writer, handle)
+    rows = {}
+
+    def open_writer(path: Path, schema: pa.Schema):
+        path.mkdir(parents=True, exist_ok=True)
+        if file_format == 'parquet':
+            return pq.ParquetWriter(path / 'part-0.parquet', schema, compression='zstd'), None
+        file = path / f'part-0.{file_format}'
+        handle = gzip.open(file, 'wb') if PARTITION_FORMATS[file_format] else open(file, 'wb')
+        return _csv_writer(handle, schema), handle
+
+    try:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            table = pa.Table.from_batches([batch])
+            # Match partition columns case-insensitively (Snowflake upper-cases names)
+            by_lower = {name.lower(): name for name in table.column_names}
+            columns = [by_lower[name.lower()] for name in partition_by]
+            data_columns = [name for name in table.column_names if name not in columns]
+            keys = table.select(columns).group_by(columns).aggregate([]).to_pylist()
+            for key in keys:
+                values = tuple(key[name] for name in columns)
+                mask = None
+                for name, value in zip(columns, values):
+                    column = table[name]
+                    condition = pc.is_null(column) if value is None else pc.equal(column, value)
+                    mask = condition if mask is None else pc.and_(mask, condition)
+                part = table.filter(mask).select(data_columns)
+                if values not in writers:
+                    writers[values] = open_writer(_partition_path(directory, partition_by, values), part.schema)
+                    rows[values] = 0
+                writers[values][0].write_table(part)
+                rows[values] += part.num_rows
+    finally:
+        for writer, handle in writers.values():
+            writer.close()
+            if handle is not None:
+                handle.close()
+    return {_partition_path(directory, partition_by, values): count for values, count in rows.items()}
@@ -4,12 +4,14 @@ Generates a detailed markdown report focusing on where and why differences occur
 EMIS is the source of truth.
 """
 
-import os
+import sys
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection
 import pandas as pd
 
 # Load environment variables
@@ -22,10 +24,6 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 PDS_EMIS_QUERY_FILE = SCRIPT_DIR / "registrations_comparison_of_methods/registration_comparison_native_query.sql"
 OLIDS_EMIS_QUERY_FILE = SCRIPT_DIR / "registrations_comparison_of_methods/olids_emis_comparison_native_query.sql"
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
 
 def parse_sql_file(file_path):
@@ -819,15 +817,7 @@ def main():
     
     # Connect to Snowflake
     print("\nConnecting to Snowflake...")
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-    
-    session = Session.builder.configs(connection_parameters).create()
+    session = connection.get_session()
     print("✓ Connected")
     
     try:
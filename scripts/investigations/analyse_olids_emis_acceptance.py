@@ -7,12 +7,14 @@ Acceptance Criteria:
 2. <2% variance OR fewer than five persons difference per practice (whichever is greater)
 """
 
-import os
+import sys
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection
 import pandas as pd
 
 # Load environment variables
@@ -24,10 +26,6 @@ OUTPUT_DIR = SCRIPT_DIR / "output"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 OLIDS_EMIS_QUERY_FILE = SCRIPT_DIR / "registrations_comparison_of_methods/olids_emis_comparison_native_query.sql"
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
 
 def parse_sql_file(file_path):
@@ -411,15 +409,7 @@ def main():
     
     # Connect to Snowflake
     print("\nConnecting to Snowflake...")
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-    
-    session = Session.builder.configs(connection_parameters).create()
+    session = connection.get_session()
     print("✓ Connected")
     
     try:
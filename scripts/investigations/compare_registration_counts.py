@@ -4,9 +4,12 @@ Validates that OLIDS episode of care data aligns with PDS registration records.
 Uses sk_patient_id for counting as person_id is incomplete in source.
 """
 
-import os
+import sys
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection
 
 # Load environment variables
 load_dotenv()
@@ -16,10 +19,6 @@ OLIDS_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
 PDS_DATABASE = '"Data_Store_Registries"'
 DICTIONARY_DATABASE = '"Dictionary"'
 TARGET_DATE = '2025-11-20'
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
 
 def get_pds_registrations(session):
@@ -168,16 +167,7 @@ def main():
 
     print(f"\nConnecting to Snowflake...")
 
-    # Create Snowpark session with SSO authentication
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-
-    session = Session.builder.configs(connection_parameters).create()
+    session = connection.get_session()
     print("✓ Connected successfully")
 
     try:
@@ -2,65 +2,42 @@
 Export detailed concept mapping failures for investigation.
 Exports CSV files containing failed mappings grouped by failure type.
 Complements check_concept_mapping_integrity.py by providing actionable lists for remediation.
+
+By default the four failure queries run one after another, each streamed to
+a single CSV. For large (observation-level) exports:
+    python export_concept_mapping_failures.py --parallel --format parquet --partition
+        submits the four queries at once and streams each into files split by
+        table and concept field (hive layout: table_name=.../concept_field=...)
+    python export_concept_mapping_failures.py --unload-stage @MY_STAGE/exports --partition --download
+        unloads server-side with COPY INTO (no rows pass through Python), then
+        optionally GETs the files into the output directory
+
+Formats: csv (default), csv.gz, parquet. Row counts are reported as batches arrive.
 """
 
-import os
+import argparse
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import check_registry, connection, fetch
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 SOURCE_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
 # Output directory
 OUTPUT_DIR = Path(__file__).parent / 'output'
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-# Reuse same configuration as integrity check
-CONCEPT_CHECKS = [
-    ('OLIDS_COMMON', 'OBSERVATION', 'observation_source_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'result_value_units_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'episodicity_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'medication_statement_source_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'authorisation_type_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'medication_order_source_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'diagnostic_order_source_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'result_value_units_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'episodicity_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'procedure_request_source_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'status_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_source_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_priority_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_type_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_specialty_concept_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'allergy_intolerance_source_concept_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'encounter_source_concept_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_type_source_concept_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_status_source_concept_id'),
-    ('OLIDS_COMMON', 'LOCATION_CONTACT', 'contact_type_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'appointment_status_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'booking_method_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'contact_mode_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT', 'gender_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT_ADDRESS', 'address_type_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT_CONTACT', 'contact_type_concept_id'),
-]
+# Same concept fields as the integrity check, from the check registry
+CONCEPT_CHECKS = check_registry.concept_checks(check_registry.load_registry())
 
 
 def build_missing_concept_map_query():
@@ -160,22 +137,166 @@ def build_null_code_query():
     return "\nUNION ALL\n".join(queries)
 
 
-def export_to_csv(df, filename, columns):
-    """Export dataframe to CSV with specific columns, sorted by table then row_count descending."""
-    if df.empty:
-        return None
+# (name, query builder, description, message when there are no rows)
+EXPORTS = [
+    ('missing_concept_map', build_missing_concept_map_query,
+     "concepts missing in CONCEPT_MAP", "No missing CONCEPT_MAP entries found"),
+    ('null_display', build_null_display_query,
+     "concepts with NULL display", "No NULL display warnings found"),
+    ('missing_target_concept', build_missing_target_concept_query,
+     "concepts with missing target in CONCEPT", "No missing target CONCEPT entries found"),
+    ('null_code', build_null_code_query,
+     "concepts with NULL code", "No NULL code failures found"),
+]
+
+PARTITION_COLUMNS = ['table_name', 'concept_field']
+
+# Snowflake FILE_FORMAT options for --unload-stage
+UNLOAD_FILE_FORMATS = {
+    'csv': "TYPE = CSV COMPRESSION = NONE FIELD_OPTIONALLY_ENCLOSED_BY = '\"'",
+    'csv.gz': "TYPE = CSV COMPRESSION = GZIP FIELD_OPTIONALLY_ENCLOSED_BY = '\"'",
+    'parquet': "TYPE = PARQUET",
+}
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    """Print from worker threads without interleaving lines."""
+    with _print_lock:
+        print(message, flush=True)
+
+
+def sorted_query(query, partition=False):
+    """Order by table then row_count descending (and by concept field when partitioning)."""
+    order = "table_name, concept_field, row_count DESC" if partition else "table_name, row_count DESC"
+    return f"SELECT * FROM ({query}) ORDER BY {order}"
+
+
+def report_progress(batches, label):
+    """Pass batches through, logging the running row count as each one arrives."""
+    total = 0
+    for batch in batches:
+        total += batch.num_rows
+        if batch.num_rows:
+            log(f"  → {label}: {total:,} rows received")
+        yield batch
+
+
+def export_to_csv(session, query, filename):
+    """
+    Stream query results to CSV, sorted by table then row_count descending.
 
+    Rows are written batch by batch so exports of any size use bounded memory.
+    Returns (output_file, rows_written); the file is removed if there were no rows.
+    """
     output_file = OUTPUT_DIR / filename
-    # Select only the columns we want and sort by table name, then row_count descending
-    df_export = df[columns].copy()
-    df_export = df_export.sort_values(['TABLE_NAME', 'ROW_COUNT'], ascending=[True, False])
-    df_export.to_csv(output_file, index=False)
-    return output_file
+    rows_written = fetch.write_csv(fetch.stream_query(session, sorted_query(query)), output_file)
+    if rows_written == 0:
+        output_file.unlink()
+        return None, 0
+    return output_file, rows_written
+
+
+def export_streamed(session, name, query, timestamp, file_format, partition):
+    """
+    Stream one failure query to a file, or to one file per table and concept field.
+
+    Returns (output path, rows written); nothing is left behind when there are no rows.
+    """
+    batches = report_progress(fetch.stream_query(session, sorted_query(query, partition)), name)
+    if partition:
+        output_dir = OUTPUT_DIR / f"{name}_{timestamp}"
+        partitions = fetch.write_partitioned(batches, output_dir, PARTITION_COLUMNS, file_format)
+        rows_written = sum(partitions.values())
+        return (output_dir, rows_written) if rows_written else (None, 0)
+
+    output_file = OUTPUT_DIR / f"{name}_{timestamp}.{file_format}"
+    if file_format == 'parquet':
+        rows_written = fetch.write_parquet(batches, output_file)
+    else:
+        rows_written = fetch.write_csv(batches, output_file)
+    if rows_written == 0:
+        output_file.unlink()
+        return None, 0
+    return output_file, rows_written
+
+
+def unload_to_stage(session, name, query, timestamp, stage, file_format, partition, download):
+    """
+    Unload one failure query server-side with COPY INTO a stage, optionally downloading the files.
+
+    Returns (location, rows unloaded).
+    """
+    prefix = f"{stage.rstrip('/')}/{name}_{timestamp}/"
+    partition_clause = ""
+    if partition:
+        partition_clause = "PARTITION BY ('table_name=' || table_name || '/concept_field=' || concept_field)"
+    copy = f"""
+    COPY INTO {prefix}
+    FROM ({sorted_query(query, partition)})
+    {partition_clause}
+    FILE_FORMAT = ({UNLOAD_FILE_FORMATS[file_format]})
+    HEADER = TRUE
+    """
+    log(f"  → {name}: unloading to {prefix}")
+    records, _ = fetch.fetch_records(fetch.stream_query(session, copy))
+    rows_unloaded = sum(int({k.upper(): v for k, v in r.items()}.get('ROWS_UNLOADED') or 0) for r in records)
+    if not download or rows_unloaded == 0:
+        return (prefix, rows_unloaded) if rows_unloaded else (None, 0)
+
+    local_dir = OUTPUT_DIR / f"{name}_{timestamp}"
+    local_dir.mkdir(parents=True, exist_ok=True)
+    log(f"  → {name}: downloading {rows_unloaded:,} rows to {local_dir}")
+    fetch.fetch_records(fetch.stream_query(session, f"GET {prefix} 'file://{local_dir.as_posix()}/'"))
+    return local_dir, rows_unloaded
+
+
+def run_exports(session, timestamp, args):
+    """Run every failure export, up to args.jobs at once. Returns {name: (path, rows)} in EXPORTS order."""
+    def run(export):
+        name, build_query, description, _ = export
+        log(f"Querying for {description}...")
+        if args.unload_stage:
+            return unload_to_stage(session, name, build_query(), timestamp, args.unload_stage,
+                                   args.format, args.partition, args.download)
+        return export_streamed(session, name, build_query(), timestamp, args.format, args.partition)
+
+    jobs = args.jobs if args.parallel or args.unload_stage else 1
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(run, EXPORTS))
+    return {export[0]: result for export, result in zip(EXPORTS, results)}
 
 
 def main():
     """Execute concept mapping failure export."""
+    parser = argparse.ArgumentParser(description='Export detailed concept mapping failures for investigation')
+    parser.add_argument('--parallel', action='store_true',
+                        help='Submit the failure queries at the same time instead of one after another')
+    parser.add_argument('--jobs', '-j', type=int, default=len(EXPORTS),
+                        help=f'With --parallel or --unload-stage, exports running at once (default: {len(EXPORTS)})')
+    parser.add_argument('--format', choices=list(fetch.PARTITION_FORMATS), default='csv',
+                        help='Output file format (default: csv)')
+    parser.add_argument('--partition', action='store_true',
+                        help='Write one file per table and concept field instead of one file per failure type')
+    parser.add_argument('--unload-stage',
+                        help='Unload server-side with COPY INTO this stage location (e.g. @MY_STAGE/exports)')
+    parser.add_argument('--download', action='store_true',
+                        help='With --unload-stage, GET the unloaded files into the output directory')
+    args = parser.parse_args()
+
+    if args.unload_stage and not args.unload_stage.startswith('@'):
+        print("ERROR: --unload-stage must be a stage location starting with @")
+        sys.exit(1)
+    if args.download and not args.unload_stage:
+        print("ERROR: --download requires --unload-stage")
+        sys.exit(1)
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1")
+        sys.exit(1)
+
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    default_mode = not (args.parallel or args.unload_stage or args.partition or args.format != 'csv')
 
     print(f"\n{'='*100}")
     print(f"CONCEPT MAPPING FAILURE EXPORT")
@@ -183,83 +304,43 @@ def main():
     print(f"Database: {SOURCE_DATABASE}")
     print(f"Total fields checked: {len(CONCEPT_CHECKS)}")
     print(f"Output directory: {OUTPUT_DIR}")
+    if not default_mode:
+        destination = f"COPY INTO {args.unload_stage}" if args.unload_stage else "streamed locally"
+        layout = "partitioned by table and concept field" if args.partition else "one file per failure type"
+        print(f"Mode: {destination}, {args.format}, {layout}"
+              f"{f', up to {args.jobs} at once' if args.parallel or args.unload_stage else ''}")
 
     print(f"\nConnecting to Snowflake...")
 
-    # Create Snowpark session with SSO authentication
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-
-    session = Session.builder.configs(connection_parameters).create()
+    session = connection.get_session()
     print("✓ Connected successfully\n")
 
     exported_files = []
 
     try:
-        # ========================================
-        # MISSING IN CONCEPT_MAP
-        # ========================================
-        print("Querying for concepts missing in CONCEPT_MAP...")
-        query = build_missing_concept_map_query()
-        df = session.sql(query).to_pandas()
-
-        if not df.empty:
-            filename = f"missing_concept_map_{timestamp}.csv"
-            output_file = export_to_csv(df, filename, ['TABLE_NAME', 'CONCEPT_FIELD', 'CONCEPT_ID', 'ROW_COUNT'])
-            print(f"✓ Exported {len(df):,} records to {filename}")
-            exported_files.append(output_file)
-        else:
-            print("✓ No missing CONCEPT_MAP entries found")
-
-        # ========================================
-        # NULL DISPLAY WARNINGS
-        # ========================================
-        print("\nQuerying for concepts with NULL display...")
-        query = build_null_display_query()
-        df = session.sql(query).to_pandas()
-
-        if not df.empty:
-            filename = f"null_display_{timestamp}.csv"
-            output_file = export_to_csv(df, filename, ['TABLE_NAME', 'CONCEPT_FIELD', 'CONCEPT_ID', 'CODE', 'SYSTEM', 'ROW_COUNT'])
-            print(f"✓ Exported {len(df):,} records to {filename}")
-            exported_files.append(output_file)
-        else:
-            print("✓ No NULL display warnings found")
-
-        # ========================================
-        # MISSING TARGET IN CONCEPT
-        # ========================================
-        print("\nQuerying for concepts with missing target in CONCEPT...")
-        query = build_missing_target_concept_query()
-        df = session.sql(query).to_pandas()
-
-        if not df.empty:
-            filename = f"missing_target_concept_{timestamp}.csv"
-            output_file = export_to_csv(df, filename, ['TABLE_NAME', 'CONCEPT_FIELD', 'CONCEPT_ID', 'ROW_COUNT'])
-            print(f"✓ Exported {len(df):,} records to {filename}")
-            exported_files.append(output_file)
-        else:
-            print("✓ No missing target CONCEPT entries found")
-
-        # ========================================
-        # NULL CODE FAILURES
-        # ========================================
-        print("\nQuerying for concepts with NULL code...")
-        query = build_null_code_query()
-        df = session.sql(query).to_pandas()
-
-        if not df.empty:
-            filename = f"null_code_{timestamp}.csv"
-            output_file = export_to_csv(df, filename, ['TABLE_NAME', 'CONCEPT_FIELD', 'CONCEPT_ID', 'SYSTEM', 'ROW_COUNT'])
-            print(f"✓ Exported {len(df):,} records to {filename}")
-            exported_files.append(output_file)
+        if default_mode:
+            for i, (name, build_query, description, empty_message) in enumerate(EXPORTS):
+                if i:
+                    print()
+                print(f"Querying for {description}...")
+                filename = f"{name}_{timestamp}.csv"
+                output_file, rows_written = export_to_csv(session, build_query(), filename)
+
+                if output_file:
+                    print(f"✓ Exported {rows_written:,} records to {filename}")
+                    exported_files.append(output_file)
+                else:
+                    print(f"✓ {empty_message}")
         else:
-            print("✓ No NULL code failures found")
+            results = run_exports(session, timestamp, args)
+            print()
+            for name, _, _, empty_message in EXPORTS:
+                output, rows_written = results[name]
+                if output:
+                    print(f"✓ Exported {rows_written:,} records to {output}")
+                    exported_files.append(output)
+                else:
+                    print(f"✓ {empty_message}")
 
         # ========================================
         # SUMMARY
@@ -5,13 +5,16 @@ PMCT is the source of truth for monthly practice counts.
 """
 
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common import connection
+
 # Load environment variables
 load_dotenv()
 
@@ -22,9 +25,6 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 PMCT_QUERY_FILE = SCRIPT_DIR / "pmct_monthly_counts_native_query.sql"
 OLIDS_QUERY_FILE = SCRIPT_DIR / "olids_monthly_counts_native_query.sql"
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
 ROLE = os.getenv('SNOWFLAKE_ROLE')
 
 
@@ -625,38 +625,18 @@ def main():
         # Don't specify warehouse - ENGINEER role may have a different default warehouse
         if pmct_role:
             print(f"Creating PMCT session with {pmct_role} role...")
-            pmct_connection_params = {
-                "account": ACCOUNT,
-                "user": USER,
-                "authenticator": "externalbrowser",
-                "role": pmct_role
-                # Note: Not specifying warehouse - will use ENGINEER role's default warehouse
-            }
-            pmct_session = Session.builder.configs(pmct_connection_params).create()
+            # Note: Not specifying warehouse - will use ENGINEER role's default warehouse
+            pmct_session = connection.get_session(role=pmct_role, use_env_warehouse=False)
             print("✓ PMCT session connected")
         else:
             # Fallback: use env role and try to switch
             print("Creating PMCT session with env role (will switch to ENGINEER)...")
-            pmct_connection_params = {
-                "account": ACCOUNT,
-                "user": USER,
-                "authenticator": "externalbrowser",
-                "warehouse": WAREHOUSE,
-                "role": ROLE
-            }
-            pmct_session = Session.builder.configs(pmct_connection_params).create()
+            pmct_session = connection.get_session()
             print("✓ PMCT session connected")
         
         # Create OLIDS session with env role
         print("Creating OLIDS session with env role...")
-        olids_connection_params = {
-            "account": ACCOUNT,
-            "user": USER,
-            "authenticator": "externalbrowser",
-            "warehouse": WAREHOUSE,
-            "role": ROLE
-        }
-        olids_session = Session.builder.configs(olids_connection_params).create()
+        olids_session = connection.get_session()
         print("✓ OLIDS session connected")
         
         # Execute queries with appropriate session roles
@@ -2,11 +2,20 @@
 Check concept mapping integrity across all OLIDS tables.
 Tests both source concept mappings (via CONCEPT_MAP) and direct concept lookups.
 Reports failure rates, counts, and distinct concept IDs.
+
+Each source table is scanned once for all of its concept fields, and the
+distinct concept IDs across every field are joined to CONCEPT_MAP and CONCEPT
+once; per-row impact counts are fanned back out from (concept_id, row_count)
+pairs rather than row-level joins.
 """
 
-import os
+import sys
+from collections import OrderedDict
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import check_registry, connection, fetch
 
 # Load environment variables
 load_dotenv()
@@ -14,92 +23,142 @@ load_dotenv()
 # Configuration
 SOURCE_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'  # Database containing OLIDS_COMMON and OLIDS_MASKED schemas
 TERMINOLOGY_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'  # Database containing OLIDS_TERMINOLOGY schema (using old concept map as current one is broken)
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
-# Define tables, schemas, and their concept fields
+# Concept fields, declared in the check registry (scripts/common/checks.yml)
 # All concept fields use the same pattern: concept_id → CONCEPT_MAP.source_code_id → CONCEPT_MAP.target_code_id → CONCEPT.id
 # Format: (schema, table_name, concept_field)
-CONCEPT_CHECKS = [
-    # OLIDS_COMMON tables
-    ('OLIDS_COMMON', 'OBSERVATION', 'observation_source_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'result_value_units_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'episodicity_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'medication_statement_source_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'authorisation_type_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'medication_order_source_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'diagnostic_order_source_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'result_value_units_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'episodicity_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'procedure_request_source_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'status_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_source_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_priority_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_type_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_specialty_concept_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'allergy_intolerance_source_concept_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'encounter_source_concept_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_type_source_concept_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_status_source_concept_id'),
-    ('OLIDS_COMMON', 'LOCATION_CONTACT', 'contact_type_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'appointment_status_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'booking_method_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'contact_mode_concept_id'),
-
-    # OLIDS_MASKED tables
-    ('OLIDS_MASKED', 'PATIENT', 'gender_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT_ADDRESS', 'address_type_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT_CONTACT', 'contact_type_concept_id'),
-]
-
-
-def generate_concept_check_query(schema_name, table_name, concept_field):
-    """Generate SQL for concept mapping check (concept_id → CONCEPT_MAP → CONCEPT)."""
-    return f"""
+CONCEPT_CHECKS = check_registry.concept_checks(check_registry.load_registry())
+
+
+def group_checks_by_table(checks):
+    """Group (schema, table, field) checks by table, keeping the order tables first appear in."""
+    tables = OrderedDict()
+    for schema_name, table_name, concept_field in checks:
+        tables.setdefault((schema_name, table_name), []).append(concept_field)
+    return tables
+
+
+def generate_table_keys_query(schema_name, table_name, concept_fields):
+    """
+    Generate SQL collecting (concept_field, concept_id, row_count) for every concept field of a table.
+
+    One scan of the table with GROUPING SETS aggregates each field separately,
+    unpivoting all of the table's concept columns into one compact key set.
+    """
+    if len(concept_fields) == 1:
+        field = concept_fields[0]
+        return f"""
     SELECT
         '{table_name}' AS table_name,
-        '{concept_field}' AS concept_field,
-        COUNT(DISTINCT base.{concept_field}) AS total_distinct_concepts,
-        SUM(CASE WHEN base.{concept_field} IS NOT NULL THEN 1 ELSE 0 END) AS total_rows_with_concept,
-        COUNT(DISTINCT CASE WHEN cm.source_code_id IS NULL THEN base.{concept_field} END) AS failed_concept_map_lookup,
-        SUM(CASE WHEN cm.source_code_id IS NULL THEN 1 ELSE 0 END) AS affected_rows_concept_map,
-        COUNT(DISTINCT CASE WHEN cm.source_code_id IS NOT NULL AND c.id IS NULL THEN base.{concept_field} END) AS failed_target_concept_lookup,
-        SUM(CASE WHEN cm.source_code_id IS NOT NULL AND c.id IS NULL THEN 1 ELSE 0 END) AS affected_rows_target_concept,
-        COUNT(DISTINCT CASE WHEN cm.source_code_id IS NOT NULL AND c.id IS NOT NULL AND c.code IS NULL THEN base.{concept_field} END) AS null_code,
-        SUM(CASE WHEN cm.source_code_id IS NOT NULL AND c.id IS NOT NULL AND c.code IS NULL THEN 1 ELSE 0 END) AS affected_rows_null_code,
-        COUNT(DISTINCT CASE WHEN cm.source_code_id IS NOT NULL AND c.id IS NOT NULL AND c.display IS NULL THEN base.{concept_field} END) AS null_display,
-        SUM(CASE WHEN cm.source_code_id IS NOT NULL AND c.id IS NOT NULL AND c.display IS NULL THEN 1 ELSE 0 END) AS affected_rows_null_display
+        '{field}' AS concept_field,
+        base.{field} AS concept_id,
+        COUNT(*) AS row_count
     FROM {SOURCE_DATABASE}.{schema_name}.{table_name} base
-    LEFT JOIN {TERMINOLOGY_DATABASE}.OLIDS_TERMINOLOGY.CONCEPT_MAP cm
-        ON base.{concept_field} = cm.source_code_id
-    LEFT JOIN {TERMINOLOGY_DATABASE}.OLIDS_TERMINOLOGY.CONCEPT c
-        ON cm.target_code_id = c.id
-    WHERE base.{concept_field} IS NOT NULL
+    WHERE base.{field} IS NOT NULL
+    GROUP BY base.{field}
+    """
+
+    field_case = "\n".join(f"            WHEN GROUPING(base.{field}) = 0 THEN '{field}'" for field in concept_fields)
+    id_case = "\n".join(f"            WHEN GROUPING(base.{field}) = 0 THEN base.{field}" for field in concept_fields)
+    grouping_sets = ", ".join(f"(base.{field})" for field in concept_fields)
+    return f"""
+    SELECT *
+    FROM (
+        SELECT
+            '{table_name}' AS table_name,
+            CASE
+{field_case}
+            END AS concept_field,
+            CASE
+{id_case}
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM {SOURCE_DATABASE}.{schema_name}.{table_name} base
+        GROUP BY GROUPING SETS ({grouping_sets})
+    ) keys
+    WHERE concept_id IS NOT NULL
     """
 
 
 def build_full_query():
-    """Build complete UNION ALL query for all concept checks."""
-    queries = []
-
-    for schema_name, table_name, concept_field in CONCEPT_CHECKS:
-        queries.append(generate_concept_check_query(schema_name, table_name, concept_field))
+    """
+    Build the concept check query: collect concept keys once, look them up once, fan the counts back out.
 
-    union_query = "\nUNION ALL\n".join(queries)
+    1. concept_keys: one scan per source table yields (table, field, concept_id, row_count)
+    2. concept_lookups: the distinct concept IDs across all fields are joined to
+       CONCEPT_MAP and CONCEPT once, recording per concept how many joined rows
+       fail each lookup (a concept with several CONCEPT_MAP rows counts each one)
+    3. per (table, field), distinct counts come from the keys and row counts
+       from row_count * joined rows, matching a row-level LEFT JOIN exactly
+    """
+    tables = group_checks_by_table(CONCEPT_CHECKS)
+    keys_query = "\n    UNION ALL\n".join(
+        generate_table_keys_query(schema_name, table_name, concept_fields)
+        for (schema_name, table_name), concept_fields in tables.items()
+    )
+    check_rows = ",\n        ".join(
+        f"('{table_name}', '{concept_field}')" for _, table_name, concept_field in CONCEPT_CHECKS
+    )
 
     return f"""
-    WITH all_checks AS (
-        {union_query}
+    WITH concept_keys AS (
+        {keys_query}
+    ),
+    concept_lookups AS (
+        SELECT
+            k.concept_id,
+            COUNT(*) AS joined_rows,
+            COUNT_IF(cm.source_code_id IS NULL) AS concept_map_misses,
+            COUNT_IF(cm.source_code_id IS NOT NULL AND c.id IS NULL) AS target_concept_misses,
+            COUNT_IF(cm.source_code_id IS NOT NULL AND c.id IS NOT NULL AND c.code IS NULL) AS null_codes,
+            COUNT_IF(cm.source_code_id IS NOT NULL AND c.id IS NOT NULL AND c.display IS NULL) AS null_displays
+        FROM (SELECT DISTINCT concept_id FROM concept_keys) k
+        LEFT JOIN {TERMINOLOGY_DATABASE}.OLIDS_TERMINOLOGY.CONCEPT_MAP cm
+            ON k.concept_id = cm.source_code_id
+        LEFT JOIN {TERMINOLOGY_DATABASE}.OLIDS_TERMINOLOGY.CONCEPT c
+            ON cm.target_code_id = c.id
+        GROUP BY k.concept_id
+    ),
+    field_counts AS (
+        SELECT
+            k.table_name,
+            k.concept_field,
+            COUNT(*) AS total_distinct_concepts,
+            SUM(k.row_count * l.joined_rows) AS total_rows_with_concept,
+            COUNT_IF(l.concept_map_misses > 0) AS failed_concept_map_lookup,
+            SUM(k.row_count * l.concept_map_misses) AS affected_rows_concept_map,
+            COUNT_IF(l.target_concept_misses > 0) AS failed_target_concept_lookup,
+            SUM(k.row_count * l.target_concept_misses) AS affected_rows_target_concept,
+            COUNT_IF(l.null_codes > 0) AS null_code,
+            SUM(k.row_count * l.null_codes) AS affected_rows_null_code,
+            COUNT_IF(l.null_displays > 0) AS null_display,
+            SUM(k.row_count * l.null_displays) AS affected_rows_null_display
+        FROM concept_keys k
+        JOIN concept_lookups l
+            ON k.concept_id = l.concept_id
+        GROUP BY k.table_name, k.concept_field
+    ),
+    all_checks AS (
+        -- Every configured check gets a row, including fields with no values
+        SELECT
+            checks.table_name,
+            checks.concept_field,
+            COALESCE(f.total_distinct_concepts, 0) AS total_distinct_concepts,
+            COALESCE(f.total_rows_with_concept, 0) AS total_rows_with_concept,
+            COALESCE(f.failed_concept_map_lookup, 0) AS failed_concept_map_lookup,
+            COALESCE(f.affected_rows_concept_map, 0) AS affected_rows_concept_map,
+            COALESCE(f.failed_target_concept_lookup, 0) AS failed_target_concept_lookup,
+            COALESCE(f.affected_rows_target_concept, 0) AS affected_rows_target_concept,
+            COALESCE(f.null_code, 0) AS null_code,
+            COALESCE(f.affected_rows_null_code, 0) AS affected_rows_null_code,
+            COALESCE(f.null_display, 0) AS null_display,
+            COALESCE(f.affected_rows_null_display, 0) AS affected_rows_null_display
+        FROM (VALUES
+        {check_rows}
+        ) AS checks (table_name, concept_field)
+        LEFT JOIN field_counts f
+            ON f.table_name = checks.table_name
+            AND f.concept_field = checks.concept_field
     )
     SELECT
         table_name,
@@ -127,6 +186,26 @@ def build_full_query():
     """
 
 
+def read_results(session, query):
+    """
+    Run the check query and return one dict per field, with upper-case keys.
+
+    Rows are streamed through common.fetch, so any engine connection.get_session
+    returns works. Counts come back as ints and FAILURE_PERCENTAGE as a float
+    (0.0 for a field with no values).
+    """
+    results = []
+    for row in fetch.iter_records(fetch.stream_query(session, query)):
+        row = {column.upper(): value for column, value in row.items()}
+        for column, value in row.items():
+            if column == 'FAILURE_PERCENTAGE':
+                row[column] = float(value) if value is not None else 0.0
+            elif column not in ('TABLE_NAME', 'CONCEPT_FIELD'):
+                row[column] = int(value or 0)
+        results.append(row)
+    return results
+
+
 def main():
     """Execute concept mapping integrity checks."""
     print(f"\n{'='*100}")
@@ -138,16 +217,7 @@ def main():
 
     print(f"\nConnecting to Snowflake...")
 
-    # Create Snowpark session with SSO authentication
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-
-    session = Session.builder.configs(connection_parameters).create()
+    session = connection.get_session()
     print("✓ Connected successfully")
 
     try:
@@ -156,7 +226,7 @@ def main():
         print("✓ Query built")
 
         print("\nExecuting integrity checks (this may take a few minutes)...")
-        df = session.sql(query).to_pandas()
+        results = read_results(session, query)
         print("✓ Checks completed\n")
 
         # Display results
@@ -165,10 +235,10 @@ def main():
         print("="*100)
 
         # Show failed mappings (including NULL codes as hard failures)
-        failed = df[df['TOTAL_FAILURES'] > 0]
-        if not failed.empty:
+        failed = [row for row in results if row['TOTAL_FAILURES'] > 0]
+        if failed:
             print(f"\n⚠️  FAILED MAPPINGS ({len(failed)} fields):\n")
-            for _, row in failed.iterrows():
+            for row in failed:
                 mapped_concepts_percentage = 100.0 - row['FAILURE_PERCENTAGE']
                 total_rows = row['TOTAL_ROWS_WITH_CONCEPT']
                 affected_rows = row['TOTAL_AFFECTED_ROWS']
@@ -193,10 +263,10 @@ def main():
             print("\n✓ No failed mappings detected!")
 
         # Show warnings for fields with null displays but no hard failures
-        warnings = df[(df['TOTAL_FAILURES'] == 0) & (df['NULL_DISPLAY'] > 0)]
-        if not warnings.empty:
+        warnings = [row for row in results if row['TOTAL_FAILURES'] == 0 and row['NULL_DISPLAY'] > 0]
+        if warnings:
             print(f"\n⚠️  DATA QUALITY WARNINGS ({len(warnings)} fields with null displays):\n")
-            for _, row in warnings.iterrows():
+            for row in warnings:
                 print(f"  {row['TABLE_NAME']}.{row['CONCEPT_FIELD']}")
                 print(f"    Total distinct concepts: {int(row['TOTAL_DISTINCT_CONCEPTS']):,}")
                 print(f"    Total rows with concept: {int(row['TOTAL_ROWS_WITH_CONCEPT']):,}")
@@ -204,10 +274,10 @@ def main():
                 print()
 
         # Show successful mappings summary (no failures and no warnings)
-        successful = df[(df['TOTAL_FAILURES'] == 0) & (df['NULL_DISPLAY'] == 0)]
-        if not successful.empty:
+        successful = [row for row in results if row['TOTAL_FAILURES'] == 0 and row['NULL_DISPLAY'] == 0]
+        if successful:
             print(f"\n✓ SUCCESSFUL MAPPINGS ({len(successful)} fields - no failures or warnings):\n")
-            for _, row in successful.iterrows():
+            for row in successful:
                 # Skip if no distinct concepts (table has no data for this field)
                 if row['TOTAL_DISTINCT_CONCEPTS'] == 0:
                     continue
@@ -219,11 +289,11 @@ def main():
         print("\n" + "="*100)
         print("SUMMARY")
         print("="*100)
-        total_concepts = int(df['TOTAL_DISTINCT_CONCEPTS'].sum())
-        total_rows = int(df['TOTAL_ROWS_WITH_CONCEPT'].sum())
-        total_failures = int(df['TOTAL_FAILURES'].sum())
-        total_affected_rows = int(df['TOTAL_AFFECTED_ROWS'].sum())
-        total_null_display = int(df['NULL_DISPLAY'].sum())
+        total_concepts = sum(row['TOTAL_DISTINCT_CONCEPTS'] for row in results)
+        total_rows = sum(row['TOTAL_ROWS_WITH_CONCEPT'] for row in results)
+        total_failures = sum(row['TOTAL_FAILURES'] for row in results)
+        total_affected_rows = sum(row['TOTAL_AFFECTED_ROWS'] for row in results)
+        total_null_display = sum(row['NULL_DISPLAY'] for row in results)
         overall_failure_rate = (total_failures / total_concepts * 100) if total_concepts > 0 else 0
 
         print(f"Total distinct concepts checked: {total_concepts:,}")
@@ -231,9 +301,9 @@ def main():
         print(f"Total hard failures: {total_failures:,} ({overall_failure_rate:.4f}%)")
         print(f"Total affected rows: {total_affected_rows:,}")
         print(f"Total NULL displays (warning): {total_null_display:,}")
-        print(f"\nFields with hard failures: {len(failed)}/{len(df)}")
-        print(f"Fields with warnings only: {len(warnings)}/{len(df)}")
-        print(f"Fields fully successful: {len(successful)}/{len(df)}")
+        print(f"\nFields with hard failures: {len(failed)}/{len(results)}")
+        print(f"Fields with warnings only: {len(warnings)}/{len(results)}")
+        print(f"Fields fully successful: {len(successful)}/{len(results)}")
 
     finally:
         session.close()
@@ -2,209 +2,102 @@
 Check data completeness for core fields in source OLIDS tables.
 Validates NULL rates for critical fields in the raw source data.
 Does not check base views - focuses on underlying data quality.
+
+Checks are grouped by table: each table is scanned once, with one COUNT_IF
+per field, and the per-table queries are submitted asynchronously so up to
+--jobs of them run at the same time:
+    python check_data_completeness.py --jobs 4
+
+Output is unchanged from checking field by field: the per-field progress
+lines are printed in check order as each table's results come back.
 """
 
-import os
+import argparse
+import itertools
+import sys
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import async_queries, check_registry, connection
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 SOURCE_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
-# Field completeness checks
+# Table queries in flight at once
+DEFAULT_JOBS = 8
+
+# Field completeness checks, declared in the check registry (scripts/common/checks.yml)
 # Format: (schema, table, field_name)
-COMPLETENESS_CHECKS = [
-    # Patient table
-    ('OLIDS_MASKED', 'PATIENT', 'id'),
-    ('OLIDS_MASKED', 'PATIENT', 'sk_patient_id'),
-    ('OLIDS_MASKED', 'PATIENT', 'birth_year'),
-    ('OLIDS_MASKED', 'PATIENT', 'birth_month'),
-    ('OLIDS_MASKED', 'PATIENT', 'gender_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT', 'lds_start_date_time'),
-
-    # Episode of care
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'patient_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'person_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_of_care_start_date'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_type_source_concept_id'),
-    ('OLIDS_COMMON', 'EPISODE_OF_CARE', 'episode_status_source_concept_id'),
-
-    # Observation
-    ('OLIDS_COMMON', 'OBSERVATION', 'id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'patient_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'person_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'observation_source_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'result_value_units_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'OBSERVATION', 'episodicity_concept_id'),
-
-    # Medication Statement
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'patient_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'person_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'medication_statement_source_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'authorisation_type_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_STATEMENT', 'date_precision_concept_id'),
-
-    # Medication Order
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'patient_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'person_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'medication_order_source_concept_id'),
-    ('OLIDS_COMMON', 'MEDICATION_ORDER', 'date_precision_concept_id'),
-
-    # Diagnostic Order
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'patient_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'person_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'diagnostic_order_source_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'result_value_units_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'DIAGNOSTIC_ORDER', 'episodicity_concept_id'),
-
-    # Encounter
-    ('OLIDS_COMMON', 'ENCOUNTER', 'id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'patient_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'person_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'encounter_source_concept_id'),
-    ('OLIDS_COMMON', 'ENCOUNTER', 'date_precision_concept_id'),
-
-    # Allergy Intolerance
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'patient_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'person_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'allergy_intolerance_source_concept_id'),
-    ('OLIDS_COMMON', 'ALLERGY_INTOLERANCE', 'date_precision_concept_id'),
-
-    # Procedure Request
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'procedure_request_source_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'PROCEDURE_REQUEST', 'status_concept_id'),
-
-    # Referral Request
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'lds_start_date_time'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'clinical_effective_date'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_source_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'date_precision_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_priority_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_type_concept_id'),
-    ('OLIDS_COMMON', 'REFERRAL_REQUEST', 'referral_request_specialty_concept_id'),
-
-    # Location Contact
-    ('OLIDS_COMMON', 'LOCATION_CONTACT', 'id'),
-    ('OLIDS_COMMON', 'LOCATION_CONTACT', 'contact_type_concept_id'),
-    ('OLIDS_COMMON', 'LOCATION_CONTACT', 'lds_start_date_time'),
-
-    # Appointment
-    ('OLIDS_COMMON', 'APPOINTMENT', 'id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'appointment_status_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'booking_method_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'contact_mode_concept_id'),
-    ('OLIDS_COMMON', 'APPOINTMENT', 'lds_start_date_time'),
-
-    # Appointment Practitioner
-    ('OLIDS_COMMON', 'APPOINTMENT_PRACTITIONER', 'id'),
-    ('OLIDS_COMMON', 'APPOINTMENT_PRACTITIONER', 'lds_start_date_time'),
-
-    # Patient Registered Practitioner In Role
-    ('OLIDS_COMMON', 'PATIENT_REGISTERED_PRACTITIONER_IN_ROLE', 'id'),
-    ('OLIDS_COMMON', 'PATIENT_REGISTERED_PRACTITIONER_IN_ROLE', 'lds_start_date_time'),
-
-    # Location
-    ('OLIDS_COMMON', 'LOCATION', 'id'),
-    ('OLIDS_COMMON', 'LOCATION', 'lds_start_date_time'),
-
-    # Flag
-    ('OLIDS_COMMON', 'FLAG', 'id'),
-    ('OLIDS_COMMON', 'FLAG', 'lds_start_date_time'),
-
-    # Patient Address
-    ('OLIDS_MASKED', 'PATIENT_ADDRESS', 'id'),
-    ('OLIDS_MASKED', 'PATIENT_ADDRESS', 'address_type_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT_ADDRESS', 'lds_start_date_time'),
-
-    # Patient Contact
-    ('OLIDS_MASKED', 'PATIENT_CONTACT', 'id'),
-    ('OLIDS_MASKED', 'PATIENT_CONTACT', 'contact_type_concept_id'),
-    ('OLIDS_MASKED', 'PATIENT_CONTACT', 'lds_start_date_time'),
-
-    # Patient UPRN
-    ('OLIDS_MASKED', 'PATIENT_UPRN', 'id'),
-    ('OLIDS_MASKED', 'PATIENT_UPRN', 'lds_start_date_time'),
-
-    # Organisation
-    ('OLIDS_COMMON', 'ORGANISATION', 'id'),
-    ('OLIDS_COMMON', 'ORGANISATION', 'lds_start_date_time'),
-
-    # Practitioner
-    ('OLIDS_COMMON', 'PRACTITIONER', 'id'),
-    ('OLIDS_COMMON', 'PRACTITIONER', 'lds_start_date_time'),
-
-    # Practitioner In Role
-    ('OLIDS_COMMON', 'PRACTITIONER_IN_ROLE', 'id'),
-    ('OLIDS_COMMON', 'PRACTITIONER_IN_ROLE', 'lds_start_date_time'),
-
-    # Schedule
-    ('OLIDS_COMMON', 'SCHEDULE', 'id'),
-    ('OLIDS_COMMON', 'SCHEDULE', 'lds_start_date_time'),
-
-    # Schedule Practitioner
-    ('OLIDS_COMMON', 'SCHEDULE_PRACTITIONER', 'id'),
-    ('OLIDS_COMMON', 'SCHEDULE_PRACTITIONER', 'lds_start_date_time'),
-
-    # Concept
-    ('OLIDS_TERMINOLOGY', 'CONCEPT', 'id'),
-    ('OLIDS_TERMINOLOGY', 'CONCEPT', 'lds_start_date_time'),
-
-    # Concept Map
-    ('OLIDS_TERMINOLOGY', 'CONCEPT_MAP', 'id'),
-    ('OLIDS_TERMINOLOGY', 'CONCEPT_MAP', 'lds_start_date_time'),
-]
-
-
-def check_field_completeness(session, schema, table, field):
-    """Check completeness for a single field."""
-    query = f"""
-    SELECT
-        '{table}' AS table_name,
-        '{field}' AS field_name,
-        COUNT(*) AS total_records,
-        COALESCE(SUM(CASE WHEN {field} IS NULL THEN 1 ELSE 0 END), 0) AS null_count,
-        ROUND(100.0 * COALESCE(SUM(CASE WHEN {field} IS NULL THEN 1 ELSE 0 END), 0) / NULLIF(COUNT(*), 0), 4) AS null_percentage
-    FROM {SOURCE_DATABASE}.{schema}.{table}
+COMPLETENESS_CHECKS = check_registry.completeness_checks(check_registry.load_registry())
+
+
+def group_checks_by_table(checks):
+    """Group (schema, table, field) checks by table, keeping the order tables first appear in."""
+    tables = OrderedDict()
+    for schema, table, field in checks:
+        tables.setdefault((schema, table), []).append(field)
+    return tables
+
+
+def build_table_query(schema, table, fields):
+    """One scan of a table returning the row count and every field's NULL count and percentage."""
+    columns = ["    COUNT(*) AS total_records"]
+    for i, field in enumerate(fields):
+        columns.append(f"    COUNT_IF({field} IS NULL) AS null_count_{i}")
+        columns.append(f"    ROUND(100.0 * COUNT_IF({field} IS NULL) / NULLIF(COUNT(*), 0), 4) AS null_percentage_{i}")
+    return "SELECT\n" + ",\n".join(columns) + f"\nFROM {SOURCE_DATABASE}.{schema}.{table}"
+
+
+def run_table_queries(session, queries, jobs, on_complete=None):
+    """
+    Run the per-table queries with up to `jobs` in flight at once.
+
+    Queries are keyed by (schema, table); returns the result rows for each key.
+    on_complete(key, query_id, rows) reports progress, by default one line per table.
     """
+    if on_complete is None:
+        completed = itertools.count(1)
 
-    result = session.sql(query).collect()
-    return result[0] if result else None
+        def on_complete(key, query_id, rows):
+            print(f"  Checked table {next(completed)}/{len(queries)}: {key[1]}")
+
+    return async_queries.run_queries(connection.raw_connection(session), queries, jobs, on_complete=on_complete)
+
+
+def field_progress(checks):
+    """
+    Progress callback for run_table_queries printing one line per field check.
+
+    Lines are printed in check order, each once its table's results are back,
+    so the output matches a field-by-field run whatever order tables finish in.
+    """
+    waiting = deque(enumerate(checks, 1))
+    done = set()
+
+    def report(key, query_id, rows):
+        done.add(key)
+        while waiting and waiting[0][1][:2] in done:
+            i, (schema, table, field) = waiting.popleft()
+            print(f"  Checking {i}/{len(checks)}: {table}.{field}")
+
+    return report
 
 
 def main():
     """Execute data completeness checks."""
+    parser = argparse.ArgumentParser(description='Check data completeness for core fields in source OLIDS tables')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Number of table queries to run concurrently (default: {DEFAULT_JOBS})')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1")
+        sys.exit(1)
+
     print(f"\n{'='*100}")
     print(f"DATA COMPLETENESS CHECK")
     print(f"{'='*100}")
@@ -212,16 +105,7 @@ def main():
 
     print(f"\nConnecting to Snowflake...")
 
-    # Create Snowpark session with SSO authentication
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-
-    session = Session.builder.configs(connection_parameters).create()
+    session = connection.get_session()
     print("✓ Connected successfully")
 
     try:
@@ -231,20 +115,29 @@ def main():
         print(f"\n{'='*100}")
         print("FIELD COMPLETENESS CHECKS")
         print(f"{'='*100}")
+        tables = group_checks_by_table(COMPLETENESS_CHECKS)
         print(f"\nChecking {len(COMPLETENESS_CHECKS)} fields...")
 
+        queries = OrderedDict(
+            (key, build_table_query(key[0], key[1], fields)) for key, fields in tables.items()
+        )
+        rows = run_table_queries(session, queries, args.jobs, on_complete=field_progress(COMPLETENESS_CHECKS))
+
+        # Unpack per-field results in the original check order
+        field_index = {(schema, table, field): i for (schema, table), fields in tables.items()
+                       for i, field in enumerate(fields)}
         results = []
-        for i, (schema, table, field) in enumerate(COMPLETENESS_CHECKS, 1):
-            print(f"  Checking {i}/{len(COMPLETENESS_CHECKS)}: {table}.{field}")
-            result = check_field_completeness(session, schema, table, field)
-            if result:
-                results.append({
-                    'table': result['TABLE_NAME'],
-                    'field': result['FIELD_NAME'],
-                    'total_records': int(result['TOTAL_RECORDS']),
-                    'null_count': int(result['NULL_COUNT']),
-                    'null_percentage': float(result['NULL_PERCENTAGE']) if result['NULL_PERCENTAGE'] else 0.0
-                })
+        for schema, table, field in COMPLETENESS_CHECKS:
+            row = rows[(schema, table)][0]
+            i = field_index[(schema, table, field)]
+            null_percentage = row[f'NULL_PERCENTAGE_{i}']
+            results.append({
+                'table': table,
+                'field': field,
+                'total_records': int(row['TOTAL_RECORDS']),
+                'null_count': int(row[f'NULL_COUNT_{i}']),
+                'null_percentage': float(null_percentage) if null_percentage else 0.0
+            })
 
         print("✓ Completeness checks completed\n")
 
@@ -3,75 +3,159 @@ Check referential integrity across OLIDS tables.
 Identifies foreign key relationships (table_name + '_id' pattern) and validates that:
 - All foreign key values exist in the referenced table's id column
 - Reports orphaned records and broken references
+
+All relationships are checked in one query that scans each child table once
+(see ri_engine.py).
+
+--approx estimates orphan rates instead: HyperLogLog distinct counts plus
+exact membership tests on a hash sample of the key space, reported with 95%
+confidence intervals. Every mode uses one rule: a relationship is broken when
+it has any orphaned FK value. A sampled orphan is therefore broken outright;
+a clean sample passes when its interval rules out more than --threshold %
+orphaned FK values, and is re-checked exactly otherwise, so --threshold bounds
+the orphan rate that --approx can miss. The duckdb backend uses the pure-Python sketches in
+sketches.py (HyperLogLog and a Bloom filter of sampled parent ids):
+    python check_referential_integrity.py --approx --sample-percent 5 --threshold 0.5
+    python check_referential_integrity.py --backend duckdb --data ./fixtures --approx
+
+--incremental checks only child rows loaded since the last run (by
+lds_start_date_time), keeping a watermark per relationship and the known
+orphan keys in a SQLite state file (see ri_incremental.py). Known orphans are
+re-validated against new parent rows, parent deletions trigger a full
+re-check of the affected relationships, and every relationship gets a full
+sweep at least every --full-every-days days. Parent tables are not read
+incrementally: each run still groups every parent key column in full, so
+the saving is in the child scans only:
+    python check_referential_integrity.py --incremental
+    python check_referential_integrity.py --incremental --full-refresh
+
+Table and column discovery is a single INFORMATION_SCHEMA query. Pass
+--catalog-snapshot to save it and reuse it on later runs:
+    python check_referential_integrity.py --catalog-snapshot .cache/ri_catalog.json
+    python check_referential_integrity.py --catalog-snapshot .cache/ri_catalog.json --refresh-catalog
 """
 
-import os
+import argparse
+import json
+import sys
+from datetime import datetime
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection, fetch
+import duckdb_backend
+import ri_engine
+import ri_incremental
+import sketches
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 SOURCE_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
 
 # Schemas to check
 SCHEMAS = ['OLIDS_COMMON', 'OLIDS_MASKED']
 
+# --approx defaults: share of the key space sampled, and the orphaned % of
+# distinct FK values a clean sample must rule out to pass without an exact check
+DEFAULT_SAMPLE_PERCENT = 10.0
+DEFAULT_THRESHOLD_PCT = 1.0
+
+# Pure-Python sketch settings for --approx on the duckdb backend
+HLL_PRECISION = 14
+BLOOM_ERROR_RATE = 0.001
+
+# --incremental: days between full sweeps of each relationship
+DEFAULT_FULL_EVERY_DAYS = 7.0
+
+
+def run_query(session, query):
+    """Run a query on Snowflake or DuckDB and return rows as dicts with upper-case keys."""
+    records, _ = fetch.fetch_records(fetch.stream_query(session, query))
+    return [{column.upper(): value for column, value in row.items()} for row in records]
+
+
+def get_catalog(session, local=False):
+    """
+    Get every table and its columns across all OLIDS schemas in one query.
 
-def get_all_tables(session):
-    """Get all tables from OLIDS schemas."""
-    print("\nDiscovering tables...")
+    Returns {(schema, table): [{'name': ..., 'type': ...}, ...]} with columns in
+    ordinal order. One bulk query replaces a round trip per schema and per table.
+    DuckDB fixtures are views in a single shared INFORMATION_SCHEMA.
+    """
+    print("\nDiscovering tables and columns...")
 
-    tables = []
-    for schema in SCHEMAS:
+    schema_list = ", ".join(f"'{schema}'" for schema in SCHEMAS)
+    if local:
         query = f"""
-        SELECT table_schema, table_name
-        FROM {SOURCE_DATABASE}.INFORMATION_SCHEMA.TABLES
-        WHERE table_schema = '{schema}'
-            AND table_type = 'BASE TABLE'
-        ORDER BY table_name
+        SELECT c.table_schema, c.table_name, UPPER(c.column_name) AS column_name, c.data_type
+        FROM information_schema.columns c
+        WHERE c.table_catalog = '{SOURCE_DATABASE.strip('"')}'
+            AND c.table_schema IN ({schema_list})
+        ORDER BY c.table_schema, c.table_name, c.ordinal_position
         """
-        result = session.sql(query).collect()
-        for row in result:
-            tables.append({
-                'schema': row['TABLE_SCHEMA'],
-                'name': row['TABLE_NAME']
-            })
-
-    print(f"✓ Found {len(tables)} tables across {len(SCHEMAS)} schemas")
-    return tables
-
-
-def get_table_columns(session, schema, table):
-    """Get all columns for a specific table."""
-    query = f"""
-    SELECT column_name, data_type
-    FROM {SOURCE_DATABASE}.INFORMATION_SCHEMA.COLUMNS
-    WHERE table_schema = '{schema}'
-        AND table_name = '{table}'
-    ORDER BY ordinal_position
-    """
-    result = session.sql(query).collect()
-    return [{'name': row['COLUMN_NAME'], 'type': row['DATA_TYPE']} for row in result]
+    else:
+        query = f"""
+        SELECT c.table_schema, c.table_name, c.column_name, c.data_type
+        FROM {SOURCE_DATABASE}.INFORMATION_SCHEMA.COLUMNS c
+        JOIN {SOURCE_DATABASE}.INFORMATION_SCHEMA.TABLES t
+            ON t.table_schema = c.table_schema
+            AND t.table_name = c.table_name
+        WHERE c.table_schema IN ({schema_list})
+            AND t.table_type = 'BASE TABLE'
+        ORDER BY c.table_schema, c.table_name, c.ordinal_position
+        """
+    catalog = {}
+    for row in run_query(session, query):
+        catalog.setdefault((row['TABLE_SCHEMA'], row['TABLE_NAME']), []).append({
+            'name': row['COLUMN_NAME'],
+            'type': row['DATA_TYPE']
+        })
+
+    print(f"✓ Found {len(catalog)} tables across {len(SCHEMAS)} schemas")
+    return catalog
+
+
+def load_catalog_snapshot(path):
+    """Load a catalog saved by save_catalog_snapshot, or None if missing or for other schemas."""
+    if not path.exists():
+        return None
+    snapshot = json.loads(path.read_text(encoding='utf-8'))
+    if snapshot.get('database') != SOURCE_DATABASE or snapshot.get('schemas') != SCHEMAS:
+        print(f"  → Snapshot {path} is for a different database/schemas, ignoring it")
+        return None
+    print(f"\n✓ Loaded catalog snapshot from {path} (captured {snapshot['captured_at']})")
+    return {(t['schema'], t['name']): t['columns'] for t in snapshot['tables']}
+
+
+def save_catalog_snapshot(path, catalog):
+    """Persist the catalog as JSON so later runs can skip discovery."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = {
+        'database': SOURCE_DATABASE,
+        'schemas': SCHEMAS,
+        'captured_at': datetime.now().isoformat(timespec='seconds'),
+        'tables': [
+            {'schema': schema, 'name': name, 'columns': columns}
+            for (schema, name), columns in sorted(catalog.items())
+        ]
+    }
+    path.write_text(json.dumps(snapshot, indent=2), encoding='utf-8')
+    print(f"✓ Catalog snapshot saved to {path}")
 
 
-def find_foreign_key_relationships(tables, session):
+def find_foreign_key_relationships(catalog):
     """Identify foreign key relationships based on naming convention (table_name + '_id')."""
     print("\nIdentifying foreign key relationships...")
 
     relationships = []
 
     # Create lookup dict for tables by lowercase name
-    table_lookup = {t['name'].lower(): t for t in tables}
-
-    for table in tables:
-        columns = get_table_columns(session, table['schema'], table['name'])
+    table_lookup = {name.lower(): (schema, name) for schema, name in catalog}
 
+    for (schema, table_name), columns in sorted(catalog.items()):
         for col in columns:
             col_name = col['name']
 
@@ -86,13 +170,13 @@ def find_foreign_key_relationships(tables, session):
 
                 # Check if this table exists
                 if potential_ref_table in table_lookup:
-                    ref_table = table_lookup[potential_ref_table]
+                    ref_schema, ref_table = table_lookup[potential_ref_table]
                     relationships.append({
-                        'child_schema': table['schema'],
-                        'child_table': table['name'],
+                        'child_schema': schema,
+                        'child_table': table_name,
                         'fk_column': col_name,
-                        'parent_schema': ref_table['schema'],
-                        'parent_table': ref_table['name'],
+                        'parent_schema': ref_schema,
+                        'parent_table': ref_table,
                         'pk_column': 'ID'
                     })
 
@@ -100,87 +184,200 @@ def find_foreign_key_relationships(tables, session):
     return relationships
 
 
-def check_referential_integrity(session, relationship):
-    """Check referential integrity for a single foreign key relationship."""
-    child_schema = relationship['child_schema']
-    child_table = relationship['child_table']
-    fk_column = relationship['fk_column']
-    parent_schema = relationship['parent_schema']
-    parent_table = relationship['parent_table']
-    pk_column = relationship['pk_column']
-
-    query = f"""
-    SELECT
-        '{child_table}' AS child_table,
-        '{fk_column}' AS fk_column,
-        '{parent_table}' AS parent_table,
-        COUNT(DISTINCT child.{fk_column}) AS total_distinct_fk_values,
-        COALESCE(SUM(CASE WHEN child.{fk_column} IS NOT NULL THEN 1 ELSE 0 END), 0) AS total_rows_with_fk,
-        COUNT(DISTINCT CASE WHEN child.{fk_column} IS NOT NULL AND parent.{pk_column} IS NULL THEN child.{fk_column} END) AS orphaned_fk_values,
-        COALESCE(SUM(CASE WHEN child.{fk_column} IS NOT NULL AND parent.{pk_column} IS NULL THEN 1 ELSE 0 END), 0) AS orphaned_rows
-    FROM {SOURCE_DATABASE}.{child_schema}.{child_table} child
-    LEFT JOIN {SOURCE_DATABASE}.{parent_schema}.{parent_table} parent
-        ON child.{fk_column} = parent.{pk_column}
+def check_referential_integrity(session, relationships):
     """
+    Check every relationship in one fused query.
 
-    result = session.sql(query).collect()
-    return result[0] if result else None
+    Each child table is scanned once for all of its foreign keys and each
+    parent table's id column is read once, however many relationships use it.
+    """
+    results = []
+    for row in run_query(session, ri_engine.build_fused_query(relationships, SOURCE_DATABASE)):
+        total_distinct_fk = int(row['TOTAL_DISTINCT_FK_VALUES'])
+        orphaned_fk = int(row['ORPHANED_FK_VALUES'])
+        results.append({
+            'child_table': row['CHILD_TABLE'],
+            'fk_column': row['FK_COLUMN'],
+            'parent_table': row['PARENT_TABLE'],
+            'total_distinct_fk': total_distinct_fk,
+            'total_rows_with_fk': int(row['TOTAL_ROWS_WITH_FK']),
+            'orphaned_fk': orphaned_fk,
+            'orphaned_rows': int(row['ORPHANED_ROWS']),
+            'failure_pct': (orphaned_fk / total_distinct_fk * 100) if total_distinct_fk > 0 else 0,
+            'estimate': None
+        })
+    return results
+
+
+def check_referential_integrity_approx(session, relationships, sample_fraction, threshold_pct, local=False):
+    """
+    Estimate orphan rates from a hash sample of the key space, with 95% confidence intervals.
+
+    Any sampled orphan breaks a relationship; a clean sample passes when its
+    interval is within threshold_pct (see ri_engine.classify), and the rest
+    are re-checked exactly.
+    """
+    if local:
+        rows = ri_engine.approx_local(session, relationships, SOURCE_DATABASE, sample_fraction,
+                                      precision=HLL_PRECISION, error_rate=BLOOM_ERROR_RATE)
+        hll_error, false_positive_rate = sketches.hll_relative_error(HLL_PRECISION), BLOOM_ERROR_RATE
+    else:
+        rows = run_query(session, ri_engine.build_approx_query(relationships, SOURCE_DATABASE, sample_fraction))
+        hll_error, false_positive_rate = ri_engine.SNOWFLAKE_HLL_ERROR, 0.0
+
+    results = []
+    needs_exact = []
+    for row in rows:
+        estimate = ri_engine.estimate_orphans(row, hll_error, false_positive_rate)
+        decision = ri_engine.classify(estimate, threshold_pct)
+        key = (row['CHILD_TABLE'], row['FK_COLUMN'])
+        if decision == 'EXACT':
+            needs_exact.append(key)
+            continue
+        results.append({
+            'child_table': row['CHILD_TABLE'],
+            'fk_column': row['FK_COLUMN'],
+            'parent_table': row['PARENT_TABLE'],
+            'total_distinct_fk': int(row['APPROX_DISTINCT_FK_VALUES']),
+            'total_rows_with_fk': int(row['TOTAL_ROWS_WITH_FK']),
+            'orphaned_fk': estimate['est_orphaned_fk'],
+            'orphaned_rows': estimate['est_orphaned_rows'],
+            'failure_pct': estimate['orphan_pct'],
+            'estimate': estimate,
+            'broken': decision == 'FAIL'
+        })
+
+    print(f"  → {len(results)} decided from estimates, {len(needs_exact)} too uncertain need exact checks")
+    if needs_exact:
+        exact = [r for r in relationships if (r['child_table'], r['fk_column']) in set(needs_exact)]
+        for result in check_referential_integrity(session, exact):
+            result['broken'] = result['orphaned_fk'] > 0
+            results.append(result)
+    return results
+
+
+def check_referential_integrity_incremental(session, relationships, catalog, state_file, full_every_days,
+                                           full_refresh=False):
+    """
+    Check child rows loaded since the last run against the saved orphan state.
+
+    A relationship is broken while it has any known orphan keys, as in the exact check.
+    """
+    columns_by_table = {key: {col['name'].upper() for col in columns} for key, columns in catalog.items()}
+    db = ri_incremental.open_state(state_file)
+    try:
+        results = ri_incremental.run_incremental(
+            session, relationships, SOURCE_DATABASE, columns_by_table, db, full_every_days, full_refresh)
+    finally:
+        db.close()
+
+    full = len([r for r in results if r['mode'] == 'full'])
+    print(f"  → {full} full checks, {len(results) - full} incremental, "
+          f"{rows_scanned(results):,} child rows scanned")
+    for r in results:
+        r['estimate'] = None
+        r['broken'] = r['orphaned_fk'] > 0
+    return results
+
+
+def rows_scanned(results):
+    """Child rows scanned by an incremental run; relationships on one child table share a scan."""
+    return sum({(r['child_table'], r['mode']): r['rows_scanned'] for r in results}.values())
 
 
 def main():
     """Execute referential integrity checks."""
+    parser = argparse.ArgumentParser(description='Check referential integrity across OLIDS tables')
+    parser.add_argument('--catalog-snapshot', type=Path,
+                        help='JSON file to reuse table/column discovery from (written if missing)')
+    parser.add_argument('--refresh-catalog', action='store_true',
+                        help='Re-discover tables and columns and overwrite the snapshot')
+    parser.add_argument('--backend', choices=['snowflake', 'duckdb'], default='snowflake',
+                        help='Execution backend (default: snowflake)')
+    parser.add_argument('--data', type=Path,
+                        help='Parquet fixture directory for the duckdb backend')
+    parser.add_argument('--approx', action='store_true',
+                        help='Estimate orphan rates from sketches and a key sample instead of exact counts')
+    parser.add_argument('--sample-percent', type=float, default=DEFAULT_SAMPLE_PERCENT,
+                        help=f'With --approx, percentage of the key space sampled (default: {DEFAULT_SAMPLE_PERCENT})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD_PCT,
+                        help=f'With --approx, orphaned %% of distinct FK values a clean key sample must rule '
+                             f'out to pass without an exact check (default: {DEFAULT_THRESHOLD_PCT})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Check only child rows loaded since the last run, using saved orphan state '
+                             '(parent key columns are still read in full every run)')
+    parser.add_argument('--state-file', type=Path, default=ri_incremental.STATE_FILE,
+                        help=f'With --incremental, SQLite state file (default: {ri_incremental.STATE_FILE})')
+    parser.add_argument('--full-every-days', type=float, default=DEFAULT_FULL_EVERY_DAYS,
+                        help=f'With --incremental, days between full sweeps (default: {DEFAULT_FULL_EVERY_DAYS})')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='With --incremental, re-check every relationship in full and rebuild the state')
+    args = parser.parse_args()
+
+    local = args.backend == 'duckdb'
+    if local and not args.data:
+        print("ERROR: --data is required with --backend duckdb")
+        sys.exit(1)
+    if args.approx and args.incremental:
+        print("ERROR: --approx and --incremental cannot be combined")
+        sys.exit(1)
+    if not 0 < args.sample_percent <= 100:
+        print("ERROR: --sample-percent must be in (0, 100]")
+        sys.exit(1)
+
     print(f"\n{'='*100}")
-    print(f"REFERENTIAL INTEGRITY CHECK")
+    mode = ' (APPROXIMATE)' if args.approx else ' (INCREMENTAL)' if args.incremental else ''
+    print(f"REFERENTIAL INTEGRITY CHECK{mode}")
     print(f"{'='*100}")
     print(f"Database: {SOURCE_DATABASE}")
     print(f"Schemas: {', '.join(SCHEMAS)}")
-
-    print(f"\nConnecting to Snowflake...")
-
-    # Create Snowpark session with SSO authentication
-    connection_parameters = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-
-    session = Session.builder.configs(connection_parameters).create()
+    if args.approx:
+        print(f"Key sample: {args.sample_percent}%, threshold: {args.threshold}% orphaned FK values")
+    print(f"Broken: {broken_rule(args)}")
+    if args.incremental:
+        print(f"State: {args.state_file} (full sweep every {args.full_every_days:g} days)")
+
+    if local:
+        print(f"\nLoading DuckDB fixtures from {args.data}...")
+        connection.register_engine('duckdb', lambda **_: duckdb_backend.connect(args.data))
+    else:
+        print(f"\nConnecting to Snowflake...")
+
+    session = connection.get_session(engine='duckdb' if local else None)
     print("✓ Connected successfully")
 
     try:
-        # Get all tables
-        tables = get_all_tables(session)
+        # Get all tables and columns, from the snapshot when there is one
+        catalog = None
+        if args.catalog_snapshot and not args.refresh_catalog:
+            catalog = load_catalog_snapshot(args.catalog_snapshot)
+        if catalog is None:
+            catalog = get_catalog(session, local)
+            if args.catalog_snapshot:
+                save_catalog_snapshot(args.catalog_snapshot, catalog)
 
         # Find foreign key relationships
-        relationships = find_foreign_key_relationships(tables, session)
+        relationships = find_foreign_key_relationships(catalog)
 
         if not relationships:
             print("\n✓ No foreign key relationships found")
             return
 
-        print(f"\nExecuting referential integrity checks (this may take several minutes)...")
-
-        # Check each relationship
-        results = []
-        for i, rel in enumerate(relationships, 1):
-            print(f"  Checking {i}/{len(relationships)}: {rel['child_table']}.{rel['fk_column']} → {rel['parent_table']}.{rel['pk_column']}")
-            result = check_referential_integrity(session, rel)
-            if result:
-                total_distinct_fk = int(result['TOTAL_DISTINCT_FK_VALUES'])
-                orphaned_fk = int(result['ORPHANED_FK_VALUES'])
-                failure_pct = (orphaned_fk / total_distinct_fk * 100) if total_distinct_fk > 0 else 0
-                results.append({
-                    'child_table': result['CHILD_TABLE'],
-                    'fk_column': result['FK_COLUMN'],
-                    'parent_table': result['PARENT_TABLE'],
-                    'total_distinct_fk': total_distinct_fk,
-                    'total_rows_with_fk': int(result['TOTAL_ROWS_WITH_FK']),
-                    'orphaned_fk': orphaned_fk,
-                    'orphaned_rows': int(result['ORPHANED_ROWS']),
-                    'failure_pct': failure_pct
-                })
+        child_tables = ri_engine.group_by_child(relationships)
+        parent_tables = {(r['parent_schema'], r['parent_table']) for r in relationships}
+        print(f"\nExecuting referential integrity checks: {len(relationships)} relationships, "
+              f"{len(child_tables)} child table scans, {len(parent_tables)} parent key sets...")
+
+        if args.approx:
+            results = check_referential_integrity_approx(
+                session, relationships, args.sample_percent / 100, args.threshold, local)
+        elif args.incremental:
+            results = check_referential_integrity_incremental(
+                session, relationships, catalog, args.state_file, args.full_every_days, args.full_refresh)
+        else:
+            results = check_referential_integrity(session, relationships)
+            for r in results:
+                r['broken'] = r['orphaned_fk'] > 0
 
         print("✓ Checks completed\n")
 
@@ -190,27 +387,27 @@ def main():
         print("="*100)
 
         # Show broken relationships (orphaned records)
-        broken = [r for r in results if r['orphaned_fk'] > 0]
+        broken = [r for r in results if r['broken']]
         if broken:
             print(f"\n⚠️  BROKEN REFERENCES ({len(broken)} relationships):\n")
             for r in broken:
                 print(f"  {r['child_table']}.{r['fk_column']} → {r['parent_table']}.ID")
-                print(f"    Total distinct FK values: {r['total_distinct_fk']:,}")
-                print(f"    Total rows with FK: {r['total_rows_with_fk']:,}")
-                print(f"    Orphaned FK values: {r['orphaned_fk']:,} ({r['failure_pct']:.2f}%)")
-                print(f"    Orphaned rows: {r['orphaned_rows']:,}")
+                print_counts(r)
                 print()
         else:
             print("\n✓ No broken references detected!")
 
         # Show valid relationships
-        valid = [r for r in results if r['orphaned_fk'] == 0]
+        valid = [r for r in results if not r['broken']]
         if valid:
             print(f"\n✓ VALID REFERENCES ({len(valid)} relationships):\n")
             for r in valid:
                 print(f"  {r['child_table']}.{r['fk_column']} → {r['parent_table']}.ID")
-                print(f"    Distinct FK values: {r['total_distinct_fk']:,}")
-                print(f"    Total rows: {r['total_rows_with_fk']:,}")
+                if r['estimate'] or r['orphaned_fk'] or args.incremental:
+                    print_counts(r)
+                else:
+                    print(f"    Distinct FK values: {r['total_distinct_fk']:,}")
+                    print(f"    Total rows: {r['total_rows_with_fk']:,}")
 
         # Summary statistics
         print("\n" + "="*100)
@@ -221,19 +418,61 @@ def main():
         total_valid = len(valid)
         total_orphaned_values = sum(r['orphaned_fk'] for r in results)
         total_orphaned_rows = sum(r['orphaned_rows'] for r in results)
-        low_failure_count = len([r for r in results if r['failure_pct'] < 1.0])
 
         print(f"Total relationships checked: {total_relationships:,}")
-        print(f"Broken references: {total_broken:,}")
+        if args.incremental:
+            full = len([r for r in results if r['mode'] == 'full'])
+            print(f"Full checks: {full:,} (incremental: {total_relationships - full:,})")
+            print(f"Child rows scanned: {rows_scanned(results):,}")
+            print(f"New orphaned FK values: {sum(r['new_orphans'] for r in results):,}")
+            print(f"Resolved orphaned FK values: {sum(r['resolved_orphans'] for r in results):,}")
+        if args.approx:
+            estimated = len([r for r in results if r['estimate']])
+            print(f"Decided from estimates: {estimated:,} (exact re-checks: {total_relationships - estimated:,})")
+        print(f"Broken references: {total_broken:,} ({broken_rule(args)})")
         print(f"Valid references: {total_valid:,}")
-        print(f"Relationships with < 1% failures: {low_failure_count:,}")
-        print(f"Total orphaned FK values: {total_orphaned_values:,}")
-        print(f"Total orphaned rows: {total_orphaned_rows:,}")
+        if not args.incremental:
+            low_failure_count = len([r for r in results if r['failure_pct'] < 1.0])
+            print(f"Relationships with < 1% failures: {low_failure_count:,}")
+        print(f"Total orphaned FK values{' (estimated)' if args.approx else ''}: {total_orphaned_values:,}")
+        print(f"Total orphaned rows{' (estimated)' if args.approx else ''}: {total_orphaned_rows:,}")
 
     finally:
         session.close()
         print("\nConnection closed")
 
 
+def broken_rule(args) -> str:
+    """The rule that marks a relationship broken, as printed in the header and summary."""
+    rule = 'any orphaned FK value'
+    if args.approx:
+        rule += (f'; with no orphan in the key sample, exact check unless the 95% CI '
+                 f'upper bound is <= {args.threshold}%')
+    return rule
+
+
+def print_counts(r):
+    """Print a relationship's counts; estimates show their 95% confidence interval."""
+    if 'mode' in r:
+        print(f"    Checked: {r['mode']} ({r['rows_scanned']:,} rows scanned)")
+        print(f"    Orphaned FK values: {r['orphaned_fk']:,} "
+              f"(new: {r['new_orphans']:,}, resolved: {r['resolved_orphans']:,})")
+        print(f"    Orphaned rows: {r['orphaned_rows']:,}")
+        return
+    estimate = r['estimate']
+    if estimate is None:
+        print(f"    Total distinct FK values: {r['total_distinct_fk']:,}")
+        print(f"    Total rows with FK: {r['total_rows_with_fk']:,}")
+        print(f"    Orphaned FK values: {r['orphaned_fk']:,} ({r['failure_pct']:.2f}%)")
+        print(f"    Orphaned rows: {r['orphaned_rows']:,}")
+        return
+    print(f"    Total distinct FK values: ~{r['total_distinct_fk']:,}")
+    print(f"    Total rows with FK: {r['total_rows_with_fk']:,}")
+    print(f"    Orphaned FK values: ~{r['orphaned_fk']:,} "
+          f"[{estimate['est_orphaned_fk_low']:,} – {estimate['est_orphaned_fk_high']:,}] "
+          f"({estimate['orphan_pct']:.2f}%, 95% CI {estimate['ci_low_pct']:.2f}% – {estimate['ci_high_pct']:.2f}%)")
+    print(f"    Orphaned rows: ~{r['orphaned_rows']:,} ({estimate['orphan_row_pct']:.2f}%)")
+
+
 if __name__ == '__main__':
     main()
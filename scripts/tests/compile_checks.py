@@ -0,0 +1,111 @@
+"""
+Compile the data quality check registry (scripts/common/checks.yml).
+
+The registry declares every completeness, referential integrity and concept
+mapping check once. This script plans the minimum set of table scans that
+covers them and emits both targets:
+
+    python compile_checks.py plan           # one line per table scan and the checks it covers
+    python compile_checks.py sql --write    # regenerate test_registry_checks.sql (run by run_tests.py)
+    python compile_checks.py dbt --write    # regenerate the generic tests in models/olids/{base,stable}/schema.yml
+    python compile_checks.py dbt --check    # exit 1 if either schema.yml is out of date with the registry
+
+The stable models get their base model's completeness and concept mapping
+tests in incremental_window mode (see macros/test_window.sql).
+
+Without --write or --check the compiled output is printed.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import check_registry
+
+# Configuration
+SOURCE_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
+COMPILED_SQL_FILE = Path(__file__).parent / 'test_registry_checks.sql'
+MODELS_DIR = Path(__file__).resolve().parents[2] / 'models' / 'olids'
+SCHEMA_FILES = {layer: MODELS_DIR / layer / 'schema.yml' for layer in check_registry.LAYERS}
+
+
+def print_plan(plan):
+    """Print the planned scans and the checks each one covers."""
+    print("=" * 100)
+    print("CHECK REGISTRY SCAN PLAN")
+    print("=" * 100)
+    totals = {'completeness': 0, 'references': 0, 'concepts': 0}
+    for scan in plan.values():
+        for kind in totals:
+            totals[kind] += len(scan[kind])
+        parts = [
+            f"{len(scan['completeness'])} completeness",
+            f"{len(scan['references'])} references",
+            f"{len(scan['concepts'])} concept",
+        ]
+        if scan['keys']:
+            parts.append(f"keys: {', '.join(scan['keys'])}")
+        table = f"{scan['schema']}.{scan['table']}"
+        print(f"  {table:<60} {len(scan['columns']):>3} columns | {' | '.join(parts)}")
+    print("-" * 100)
+    print(f"{len(plan)} table scans cover {sum(totals.values())} checks "
+          f"({totals['completeness']} completeness, {totals['references']} references, {totals['concepts']} concept mapping)")
+
+
+def write_or_check(path, text, check):
+    """Write compiled output, or with check report whether the file is current. Returns an exit code."""
+    current = path.read_text() if path.exists() else None
+    if check:
+        if current == text:
+            print(f"✓ {path} is up to date with the registry")
+            return 0
+        print(f"❌ {path} is out of date - run: python compile_checks.py {'sql' if path.suffix == '.sql' else 'dbt'} --write")
+        return 1
+    if current == text:
+        print(f"✓ {path} already up to date")
+    else:
+        path.write_text(text)
+        print(f"✓ Wrote {path}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the check registry into scan plans, source SQL and dbt tests')
+    parser.add_argument('target', choices=['plan', 'sql', 'dbt'], help='What to compile')
+    parser.add_argument('--registry', type=Path, default=check_registry.REGISTRY_FILE, help='Registry file')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--write', action='store_true', help='Write the compiled output to its file')
+    output.add_argument('--check', action='store_true', help='Exit 1 if the compiled file is out of date')
+    args = parser.parse_args()
+
+    try:
+        tables = check_registry.load_registry(args.registry)
+    except (ValueError, KeyError) as e:
+        print(f"❌ Invalid registry {args.registry}: {e}")
+        sys.exit(1)
+
+    if args.target == 'plan':
+        print_plan(check_registry.plan_scans(tables))
+        return
+
+    if args.target == 'sql':
+        outputs = {COMPILED_SQL_FILE: check_registry.compile_sql(check_registry.plan_scans(tables), SOURCE_DATABASE, args.registry.name)}
+    else:
+        outputs = {}
+        for layer, path in SCHEMA_FILES.items():
+            try:
+                outputs[path] = check_registry.compile_schema(tables, path.read_text(), layer)
+            except ValueError as e:
+                print(f"❌ {path}: {e}")
+                sys.exit(1)
+
+    if not (args.write or args.check):
+        for text in outputs.values():
+            print(text, end='')
+        return
+    sys.exit(max(write_or_check(path, text, args.check) for path, text in outputs.items()))
+
+
+if __name__ == "__main__":
+    main()
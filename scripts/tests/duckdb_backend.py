@@ -0,0 +1,176 @@
+"""
+Offline DuckDB backend for run_tests.py.
+
+Runs the same test_*.sql files against local Parquet fixtures instead of
+Snowflake, so the suite can be benchmarked and regression-tested in CI or on
+a laptop with no warehouse cost.
+
+Fixture layout (one directory per schema, one file or directory per table):
+    <data_dir>/OLIDS_COMMON/OBSERVATION.parquet
+    <data_dir>/OLIDS_COMMON/OBSERVATION/*.parquet
+    <data_dir>/OLIDS_MASKED/PATIENT/*.parquet
+    <data_dir>/OLIDS_TERMINOLOGY/CONCEPT_MAP/*.parquet
+
+Tables are exposed as views inside an attached database named after the
+Snowflake source database, so three-part names such as
+"NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.OBSERVATION resolve unchanged.
+The Snowflake dialect is translated to DuckDB by translate_sql().
+"""
+
+import re
+from pathlib import Path
+
+from common import fetch
+from sql_splitter import mask_literals, split_statements, unmask_literals
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+DEFAULT_DATABASE = 'NCL_Data_Store_OLIDS_Alpha'
+FIXTURE_SCHEMAS = ['OLIDS_COMMON', 'OLIDS_MASKED', 'OLIDS_TERMINOLOGY']
+
+# Statements with no DuckDB equivalent that can safely be skipped
+IGNORED_STATEMENT_PATTERN = re.compile(r'^\s*USE\s+(ROLE|WAREHOUSE|SECONDARY\s+ROLES)\b', re.IGNORECASE)
+
+# Statements DuckDB cannot run at all
+UNSUPPORTED_STATEMENT_PATTERN = re.compile(r'^\s*EXECUTE\s+IMMEDIATE\b', re.IGNORECASE)
+
+# Simple (pattern, replacement) rewrites applied to SQL code outside literals
+FUNCTION_REWRITES = [
+    (re.compile(r'^\s*SET\s+(?!VARIABLE\b)(\w+)\s*=', re.IGNORECASE), r'SET VARIABLE \1 ='),
+    (re.compile(r'\$([A-Za-z_]\w*)'), r"getvariable('\1')"),
+    (re.compile(r'^\s*USE\s+DATABASE\s+', re.IGNORECASE), 'USE '),
+    (re.compile(r'^\s*USE\s+SCHEMA\s+', re.IGNORECASE), 'USE '),
+    (re.compile(r'\bOBJECT_CONSTRUCT\s*\(', re.IGNORECASE), 'json_object('),
+    (re.compile(r'\bMD5_NUMBER_LOWER64\s*\(', re.IGNORECASE), 'md5_number_lower('),
+    (re.compile(r'\bMD5_NUMBER_UPPER64\s*\(', re.IGNORECASE), 'md5_number_upper('),
+    (re.compile(r'\bIFF\s*\(', re.IGNORECASE), 'if('),
+    (re.compile(r'\bLEN\s*\(', re.IGNORECASE), 'length('),
+    (re.compile(r'\bNVL\s*\(', re.IGNORECASE), 'coalesce('),
+    (re.compile(r'\bSYSDATE\s*\(\s*\)', re.IGNORECASE), 'current_timestamp'),
+    (re.compile(r'\bNUMBER\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)', re.IGNORECASE), r'DECIMAL(\1, \2)'),
+    (re.compile(r'::\s*NUMBER\b', re.IGNORECASE), '::DECIMAL(38, 0)'),
+    (re.compile(r'\bAS\s+NUMBER\s*\)', re.IGNORECASE), 'AS DECIMAL(38, 0))'),
+    (re.compile(r'::\s*VARIANT\b', re.IGNORECASE), '::JSON'),
+]
+
+LISTAGG_PATTERN = re.compile(r'\bLISTAGG\s*\(', re.IGNORECASE)
+WITHIN_GROUP_PATTERN = re.compile(r'\s*WITHIN\s+GROUP\s*\(\s*(ORDER\s+BY\b.*)', re.IGNORECASE | re.DOTALL)
+
+
+def _find_closing_paren(sql: str, open_index: int) -> int:
+    """Return the index of the parenthesis matching the one at open_index."""
+    depth = 0
+    for i in range(open_index, len(sql)):
+        if sql[i] == '(':
+            depth += 1
+        elif sql[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Unbalanced parentheses in SQL")
+
+
+def _rewrite_listagg(sql: str) -> str:
+    """Rewrite LISTAGG(x, sep) WITHIN GROUP (ORDER BY y) as string_agg(x, sep ORDER BY y)."""
+    match = LISTAGG_PATTERN.search(sql)
+    while match:
+        open_index = match.end() - 1
+        close_index = _find_closing_paren(sql, open_index)
+        arguments = sql[open_index + 1:close_index]
+        rest = sql[close_index + 1:]
+
+        within = WITHIN_GROUP_PATTERN.match(rest)
+        if within:
+            group_open = close_index + 1 + rest.index('(')
+            group_close = _find_closing_paren(sql, group_open)
+            order_by = sql[group_open + 1:group_close].strip()
+            replacement = f"string_agg({arguments} {order_by})"
+            sql = sql[:match.start()] + replacement + sql[group_close + 1:]
+        else:
+            replacement = f"string_agg({arguments})"
+            sql = sql[:match.start()] + replacement + sql[close_index + 1:]
+
+        match = LISTAGG_PATTERN.search(sql, match.start() + len(replacement))
+    return sql
+
+
+def translate_sql(statement: str):
+    """
+    Translate one Snowflake statement to DuckDB.
+
+    Returns None for statements that have no local meaning (USE ROLE/WAREHOUSE).
+    QUALIFY, COUNT_IF, DATEDIFF, TRY_CAST and quoted database names are native
+    to DuckDB and pass through unchanged.
+    """
+    masked, literals = mask_literals(statement)
+    if IGNORED_STATEMENT_PATTERN.match(masked):
+        return None
+    if UNSUPPORTED_STATEMENT_PATTERN.match(masked):
+        raise NotImplementedError("EXECUTE IMMEDIATE scripting blocks are not supported by the duckdb backend")
+
+    for pattern, replacement in FUNCTION_REWRITES:
+        masked = pattern.sub(replacement, masked)
+    masked = _rewrite_listagg(masked)
+    return unmask_literals(masked, literals).strip()
+
+
+def find_fixture(table_path: Path) -> str:
+    """Return the read_parquet() path or glob for a table fixture file or directory."""
+    if table_path.is_dir():
+        return str(table_path / '**' / '*.parquet')
+    return str(table_path)
+
+
+def connect(data_dir: Path, database: str = DEFAULT_DATABASE):
+    """Create an in-memory DuckDB connection with fixture tables registered as views."""
+    if duckdb is None:
+        raise ImportError("duckdb is not installed (pip install duckdb)")
+    if not data_dir.is_dir():
+        raise FileNotFoundError(f"Fixture directory not found: {data_dir}")
+
+    con = duckdb.connect()
+    con.execute(f'ATTACH \':memory:\' AS "{database}"')
+
+    table_count = 0
+    for schema in FIXTURE_SCHEMAS:
+        schema_dir = data_dir / schema
+        if not schema_dir.is_dir():
+            continue
+        con.execute(f'CREATE SCHEMA IF NOT EXISTS "{database}".{schema}')
+        for entry in sorted(schema_dir.iterdir()):
+            if not (entry.is_dir() or entry.suffix == '.parquet'):
+                continue
+            table = entry.stem.upper()
+            fixture = find_fixture(entry).replace("'", "''")
+            con.execute(
+                f'CREATE VIEW "{database}".{schema}.{table} AS '
+                f"SELECT * FROM read_parquet('{fixture}', hive_partitioning = true, union_by_name = true)"
+            )
+            table_count += 1
+
+    if table_count == 0:
+        raise FileNotFoundError(f"No Parquet fixtures found under {data_dir} for {', '.join(FIXTURE_SCHEMAS)}")
+
+    con.execute(f'USE "{database}"')
+    return con
+
+
+def execute_test(con, sql_file: Path, max_rows: int = None) -> tuple:
+    """Execute a test SQL file and return (results, query_id) for its final statement."""
+    statements = [translate_sql(s) for s in split_statements(sql_file.read_text(encoding='utf-8'))]
+    statements = [s for s in statements if s]
+    if not statements:
+        raise ValueError("No SQL statements found")
+
+    for statement in statements:
+        con.execute(statement)
+
+    results, total_rows = fetch.fetch_records(fetch.stream_cursor(con), max_rows)
+    if total_rows > len(results):
+        print(f"  → WARNING: Result truncated to {len(results):,} of {total_rows:,} rows")
+
+    # Snowflake upper-cases unquoted identifiers; match it so reports read the same columns
+    return [{column.upper(): value for column, value in row.items()} for row in results], None
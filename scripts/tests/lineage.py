@@ -0,0 +1,300 @@
+"""
+Lineage-aware test selection for run_tests.py --changed-since.
+
+Works out which dbt sources and models changed, follows the manifest's
+child_map to everything downstream, and keeps only the tests that touch an
+affected table:
+
+- SQL tests (test_*.sql) whose fully qualified table references include an
+  affected source table (matched on SCHEMA.TABLE, since the tests query the
+  physical database directly)
+- dbt generic tests from the schema.yml files that depend on an affected node
+
+What counts as "changed" depends on the --changed-since value:
+- A directory containing manifest.json: dbt state comparison against that
+  manifest (node checksums, source definitions and test configs)
+- An ISO date or timestamp: sources whose LAST_ALTERED is later (Snowflake only)
+- Anything else is a git ref: files changed since the ref, working tree
+  included. YAML files are compared entry by entry, so editing one table in
+  sources.yml does not mark every source as changed.
+
+The manifest comes from `dbt parse` (or any dbt command) and lives in target/.
+"""
+
+import json
+import subprocess
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+from result_cache import fetch_last_altered, find_referenced_tables
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MANIFEST_FILE = REPO_ROOT / 'target' / 'manifest.json'
+
+# Changes to these files can affect every node, so everything is selected
+PROJECT_FILES = {'dbt_project.yml', 'packages.yml'}
+
+# Source properties that change what a source resolves to or how it is tested
+SOURCE_STATE_KEYS = ('database', 'schema', 'identifier', 'columns', 'loaded_at_field', 'freshness')
+
+
+def load_manifest(path: Path = MANIFEST_FILE) -> dict:
+    """Load a dbt manifest.json."""
+    if not path.exists():
+        raise FileNotFoundError(f"dbt manifest not found: {path} (run `dbt parse` first)")
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _all_nodes(manifest: dict) -> dict:
+    return {**manifest.get('nodes', {}), **manifest.get('sources', {})}
+
+
+def _test_state(node: dict) -> tuple:
+    """Comparable state of a generic test: its arguments and config."""
+    return json.dumps(node.get('test_metadata'), sort_keys=True), json.dumps(node.get('config'), sort_keys=True)
+
+
+def changed_nodes_from_state(manifest: dict, state_manifest: dict) -> set:
+    """Nodes that are new or modified compared with a previous manifest (dbt's state:modified)."""
+    old_nodes = _all_nodes(state_manifest)
+    changed = set()
+    for unique_id, node in _all_nodes(manifest).items():
+        old = old_nodes.get(unique_id)
+        if old is None:
+            changed.add(unique_id)
+        elif node['resource_type'] == 'source':
+            if any(node.get(key) != old.get(key) for key in SOURCE_STATE_KEYS):
+                changed.add(unique_id)
+        elif node['resource_type'] == 'test' and node.get('test_metadata'):
+            if _test_state(node) != _test_state(old):
+                changed.add(unique_id)
+        elif node.get('checksum') != old.get('checksum'):
+            changed.add(unique_id)
+
+    # Macros feed every node that calls them
+    old_macros = state_manifest.get('macros', {})
+    changed_macros = {
+        unique_id for unique_id, macro in manifest.get('macros', {}).items()
+        if unique_id in old_macros and macro.get('macro_sql') != old_macros[unique_id].get('macro_sql')
+    }
+    return changed | nodes_using_macros(manifest, changed_macros)
+
+
+def nodes_using_macros(manifest: dict, macro_ids: set) -> set:
+    """Nodes whose SQL calls any of the given macros."""
+    if not macro_ids:
+        return set()
+    return {
+        unique_id for unique_id, node in manifest.get('nodes', {}).items()
+        if macro_ids & set(node.get('depends_on', {}).get('macros', []))
+    }
+
+
+def git_changed_files(ref: str, repo_root: Path = REPO_ROOT) -> list:
+    """Files changed between the ref and the working tree (committed or not)."""
+    result = subprocess.run(
+        ['git', 'diff', '--name-only', ref, '--'],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    )
+    untracked = subprocess.run(
+        ['git', 'ls-files', '--others', '--exclude-standard'],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    )
+    return sorted(set(result.stdout.split()) | set(untracked.stdout.split()))
+
+
+def _yaml_at_ref(ref: str, path: str, repo_root: Path) -> dict:
+    """Parse a YAML file as it was at the ref ({} if it did not exist)."""
+    result = subprocess.run(
+        ['git', 'show', f'{ref}:{path}'], cwd=repo_root, capture_output=True, text=True
+    )
+    return (yaml.safe_load(result.stdout) or {}) if result.returncode == 0 else {}
+
+
+def _yaml_entries(document: dict) -> dict:
+    """Index a properties file by entry: ('source', source, table) and (resource type, name)."""
+    entries = {}
+    for source in document.get('sources') or []:
+        for table in source.get('tables') or []:
+            source_level = {key: value for key, value in source.items() if key != 'tables'}
+            entries[('source', source['name'], table['name'])] = (source_level, table)
+    for resource_type in ('models', 'seeds', 'snapshots', 'macros'):
+        for entry in document.get(resource_type) or []:
+            entries[(resource_type, entry['name'])] = entry
+    return entries
+
+
+def _nodes_for_yaml_entry(manifest: dict, key: tuple) -> set:
+    """Manifest nodes described by one properties-file entry."""
+    if key[0] == 'source':
+        return {
+            unique_id for unique_id, source in manifest.get('sources', {}).items()
+            if source['source_name'] == key[1] and source['name'] == key[2]
+        }
+    if key[0] == 'macros':
+        return nodes_using_macros(manifest, {
+            unique_id for unique_id, macro in manifest.get('macros', {}).items() if macro['name'] == key[1]
+        })
+    return {
+        unique_id for unique_id, node in manifest.get('nodes', {}).items()
+        if node['name'] == key[1] and node['resource_type'] != 'test'
+    }
+
+
+def changed_nodes_from_git(manifest: dict, ref: str, repo_root: Path = REPO_ROOT) -> tuple:
+    """
+    Map files changed since a git ref to manifest nodes.
+
+    Returns (changed node ids, changed non-dbt files) so callers can select
+    edited SQL test files directly.
+    """
+    changed_files = git_changed_files(ref, repo_root)
+    nodes = _all_nodes(manifest)
+    nodes_by_file = {}
+    for unique_id, node in nodes.items():
+        if node['resource_type'] != 'test' or not node.get('test_metadata'):
+            nodes_by_file.setdefault(node['original_file_path'], set()).add(unique_id)
+    macros_by_file = {}
+    for unique_id, macro in manifest.get('macros', {}).items():
+        macros_by_file.setdefault(macro['original_file_path'], set()).add(unique_id)
+
+    changed = set()
+    other_files = []
+    for path in changed_files:
+        if path in PROJECT_FILES:
+            return set(nodes), other_files
+        if path.endswith(('.yml', '.yaml')) and (repo_root / path).exists() and path.startswith(('models/', 'macros/')):
+            old_entries = _yaml_entries(_yaml_at_ref(ref, path, repo_root))
+            new_entries = _yaml_entries(yaml.safe_load((repo_root / path).read_text(encoding='utf-8')) or {})
+            for key, entry in new_entries.items():
+                if old_entries.get(key) != entry:
+                    changed |= _nodes_for_yaml_entry(manifest, key)
+        elif path in macros_by_file:
+            changed |= nodes_using_macros(manifest, macros_by_file[path])
+        elif path in nodes_by_file:
+            changed |= nodes_by_file[path]
+        else:
+            other_files.append(path)
+    return changed, other_files
+
+
+def changed_sources_since(manifest: dict, run_query, since: datetime) -> set:
+    """Sources whose tables were altered after `since`, according to INFORMATION_SCHEMA LAST_ALTERED."""
+    tables = {}
+    for unique_id, source in manifest.get('sources', {}).items():
+        key = (source['database'].strip('"'), source['schema'].strip('"').upper(),
+               source['identifier'].strip('"').upper())
+        tables.setdefault(key, set()).add(unique_id)
+
+    changed = set()
+    for key, last_altered in fetch_last_altered(run_query, set(tables)).items():
+        altered_at = datetime.fromisoformat(last_altered)
+        compare_to = since
+        if (altered_at.tzinfo is None) != (since.tzinfo is None):
+            compare_to = since.replace(tzinfo=altered_at.tzinfo)
+        if altered_at > compare_to:
+            changed |= tables[key]
+    return changed
+
+
+def parse_timestamp(value: str):
+    """Return a datetime if the value is an ISO date/timestamp, else None."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def downstream(manifest: dict, node_ids: set) -> set:
+    """The given nodes plus everything downstream of them."""
+    child_map = manifest.get('child_map', {})
+    affected = set(node_ids)
+    queue = deque(node_ids)
+    while queue:
+        for child in child_map.get(queue.popleft(), []):
+            if child not in affected:
+                affected.add(child)
+                queue.append(child)
+    return affected
+
+
+def affected_tables(manifest: dict, node_ids: set) -> set:
+    """(SCHEMA, TABLE) names of the affected sources and models."""
+    nodes = _all_nodes(manifest)
+    tables = set()
+    for unique_id in node_ids:
+        node = nodes.get(unique_id)
+        if not node or node['resource_type'] not in ('source', 'model', 'seed', 'snapshot'):
+            continue
+        table = node.get('identifier') or node.get('alias') or node['name']
+        tables.add((node['schema'].strip('"').upper(), table.strip('"').upper()))
+    return tables
+
+
+def select_sql_tests(tests: list, tables: set, changed_files: list = ()) -> list:
+    """
+    SQL test files that reference an affected table, or were themselves edited.
+
+    Tests with no recognisable table references are always kept.
+    """
+    edited = {Path(path).name for path in changed_files}
+    selected = []
+    for test_file in tests:
+        references = {
+            (schema, table) for _, schema, table in find_referenced_tables(test_file.read_text(encoding='utf-8'))
+        }
+        if test_file.name in edited or not references or references & tables:
+            selected.append(test_file)
+    return selected
+
+
+def select_dbt_tests(manifest: dict, node_ids: set) -> list:
+    """Names of dbt tests that depend on an affected node (or were changed themselves)."""
+    return sorted(
+        node['name'] for unique_id, node in manifest.get('nodes', {}).items()
+        if node['resource_type'] == 'test'
+        and (unique_id in node_ids or node_ids & set(node.get('depends_on', {}).get('nodes', [])))
+    )
+
+
+def dbt_selector(manifest: dict, affected: set, changed: set) -> list:
+    """
+    Compact `dbt test --select` arguments for the affected nodes.
+
+    Selecting a model also selects every test that depends on it (dbt's eager
+    indirect selection), so only affected models and directly changed tests are listed.
+    """
+    nodes = manifest.get('nodes', {})
+    selector = set()
+    for unique_id in affected:
+        node = nodes.get(unique_id)
+        if node and (node['resource_type'] in ('model', 'seed', 'snapshot')
+                     or (node['resource_type'] == 'test' and unique_id in changed)):
+            selector.add(node['name'])
+    return sorted(selector)
+
+
+def count_dbt_tests(manifest: dict) -> int:
+    return sum(1 for node in manifest.get('nodes', {}).values() if node['resource_type'] == 'test')
+
+
+def resolve_changes(manifest: dict, changed_since: str, run_query=None) -> tuple:
+    """
+    Changed node ids and edited non-dbt files for a --changed-since value.
+
+    `run_query` is only needed for timestamps (LAST_ALTERED lookups).
+    """
+    state_manifest = Path(changed_since) / 'manifest.json'
+    if state_manifest.exists():
+        return changed_nodes_from_state(manifest, load_manifest(state_manifest)), []
+
+    since = parse_timestamp(changed_since)
+    if since is not None:
+        if run_query is None:
+            raise ValueError("Timestamps need LAST_ALTERED, which only the Snowflake backend provides")
+        return changed_sources_since(manifest, run_query, since), []
+
+    return changed_nodes_from_git(manifest, changed_since)
@@ -0,0 +1,482 @@
+"""
+Profile OLIDS source columns and flag drift between runs.
+
+Collects, for each profiled column, in a single pass per table:
+- row and NULL counts
+- approximate distinct count (APPROX_COUNT_DISTINCT)
+- min and max
+- approximate top-k values (APPROX_TOP_K), for non-date columns
+- yearly histogram, for date and timestamp columns
+
+Tables with a record_owner_organisation_code are profiled overall and per
+practice in the same scan (GROUPING SETS), so a jump in NULL
+clinical_effective_date at one practice is visible even when the overall rate
+barely moves. Top-k values and histograms are kept for the overall row only,
+so they are computed once per table by a separate non-grouped aggregate
+rather than for every practice.
+
+Each run is appended to a Parquet history partitioned by run date
+(<history-dir>/run_date=YYYY-MM-DD/profile.parquet; re-running on the same day
+replaces that day) and compared with the latest earlier run. Drift flagged:
+- NULL rate moved by at least NULL_DRIFT_POINTS percentage points and is
+  significant by a two-proportion z-test (per practice and overall)
+- row count changed by ROW_COUNT_DRIFT_PCT or more, or a practice disappeared
+- distinct count changed by DISTINCT_DRIFT_PCT or more
+- top-k values overlap less than TOP_K_MIN_OVERLAP (Jaccard)
+- yearly histogram shifted by more than HISTOGRAM_MAX_SHIFT (total variation)
+
+By default the fields in check_data_completeness.COMPLETENESS_CHECKS are
+profiled; --all-columns profiles every column of those tables:
+    python profile_columns.py
+    python profile_columns.py --table OBSERVATION --all-columns
+    python profile_columns.py --backend duckdb --data ./fixtures --no-save
+"""
+
+import argparse
+import json
+import math
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from dotenv import load_dotenv
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection, fetch
+from check_data_completeness import (
+    COMPLETENESS_CHECKS, DEFAULT_JOBS, SOURCE_DATABASE, group_checks_by_table, run_table_queries
+)
+import duckdb_backend
+
+# Load environment variables
+load_dotenv()
+
+HISTORY_DIR = Path(__file__).parent / '.cache' / 'profiles'
+
+# Column used to profile each table per practice, where present
+SEGMENT_COLUMN = 'RECORD_OWNER_ORGANISATION_CODE'
+ALL_ROWS = '(all)'
+
+TOP_K = 5
+HISTOGRAM_YEARS = 10
+
+# Types profiled for NULLs only
+UNPROFILED_TYPES = ('BINARY', 'BLOB', 'VARIANT', 'OBJECT', 'ARRAY', 'GEOGRAPHY', 'GEOMETRY', 'BOOLEAN')
+
+# Drift thresholds
+NULL_DRIFT_POINTS = 5.0
+NULL_DRIFT_Z = 4.0
+MIN_SEGMENT_ROWS = 100
+ROW_COUNT_DRIFT_PCT = 25.0
+DISTINCT_DRIFT_PCT = 25.0
+TOP_K_MIN_OVERLAP = 0.5
+HISTOGRAM_MAX_SHIFT = 0.1
+
+HISTORY_SCHEMA = pa.schema([
+    ('run_at', pa.string()),
+    ('table_schema', pa.string()),
+    ('table_name', pa.string()),
+    ('column_name', pa.string()),
+    ('segment', pa.string()),
+    ('row_count', pa.int64()),
+    ('null_count', pa.int64()),
+    ('null_pct', pa.float64()),
+    ('approx_distinct', pa.int64()),
+    ('min_value', pa.string()),
+    ('max_value', pa.string()),
+    ('top_k', pa.string()),
+    ('histogram', pa.string()),
+])
+
+
+def run_query(session, query):
+    """Run a query on Snowflake or DuckDB and return rows as dicts with upper-case keys."""
+    records, _ = fetch.fetch_records(fetch.stream_query(session, query))
+    return [{column.upper(): value for column, value in row.items()} for row in records]
+
+
+def get_column_types(session, tables, local=False):
+    """Return {(schema, table): OrderedDict(COLUMN -> data type)} for the given tables in one query."""
+    schema_list = ", ".join(sorted({f"'{schema}'" for schema, _ in tables}))
+    table_list = ", ".join(sorted({f"'{table}'" for _, table in tables}))
+    if local:
+        source = f"information_schema.columns WHERE table_catalog = '{SOURCE_DATABASE.strip(chr(34))}' AND"
+    else:
+        source = f"{SOURCE_DATABASE}.INFORMATION_SCHEMA.COLUMNS WHERE"
+    query = f"""
+    SELECT table_schema, table_name, UPPER(column_name) AS column_name, UPPER(data_type) AS data_type
+    FROM {source} table_schema IN ({schema_list}) AND table_name IN ({table_list})
+    ORDER BY table_schema, table_name, ordinal_position
+    """
+    types = {}
+    for row in run_query(session, query):
+        types.setdefault((row['TABLE_SCHEMA'], row['TABLE_NAME']), OrderedDict())[row['COLUMN_NAME']] = row['DATA_TYPE']
+    return types
+
+
+def is_date_type(data_type):
+    return data_type.startswith(('DATE', 'TIMESTAMP'))
+
+
+def histogram_buckets(run_year):
+    """(label, lower bound, upper bound) for each yearly bucket; None means unbounded."""
+    first_year = run_year - HISTOGRAM_YEARS + 1
+    buckets = [(f'<{first_year}', None, first_year)]
+    buckets += [(str(year), year, year + 1) for year in range(first_year, run_year + 1)]
+    buckets.append((f'>{run_year}', run_year + 1, None))
+    return buckets
+
+
+def build_profile_query(schema, table, columns, segmented, run_year):
+    """
+    One scan of a table computing every column's statistics, overall and per practice.
+
+    `columns` maps column name to data type. Output columns are named C<i>_<STAT>.
+    When segmented, the per-practice grouping sets compute only the cheap
+    statistics (counts, distinct, min, max); top-k values and histograms are
+    kept for the overall row alone, so they come from one non-grouped
+    aggregate over the same scan, joined to the overall row.
+    """
+    grouped = []  # per practice and overall
+    overall = []  # overall only
+    for i, (column, data_type) in enumerate(columns.items()):
+        grouped.append(f"    COUNT_IF({column} IS NULL) AS c{i}_nulls")
+        if data_type.startswith(UNPROFILED_TYPES):
+            continue
+        grouped.append(f"    APPROX_COUNT_DISTINCT({column}) AS c{i}_distinct")
+        grouped.append(f"    CAST(MIN({column}) AS VARCHAR) AS c{i}_min")
+        grouped.append(f"    CAST(MAX({column}) AS VARCHAR) AS c{i}_max")
+        if is_date_type(data_type):
+            for j, (_, low, high) in enumerate(histogram_buckets(run_year)):
+                bounds = []
+                if low is not None:
+                    bounds.append(f"{column} >= DATE '{low}-01-01'")
+                if high is not None:
+                    bounds.append(f"{column} < DATE '{high}-01-01'")
+                overall.append(f"    COUNT_IF({' AND '.join(bounds)}) AS c{i}_h{j}")
+        else:
+            overall.append(f"    APPROX_TOP_K({column}, {TOP_K}) AS c{i}_top_k")
+
+    source = f"{SOURCE_DATABASE}.{schema}.{table}"
+    if not segmented:
+        select = ["    1 AS all_rows", "    CAST(NULL AS VARCHAR) AS segment", "    COUNT(*) AS row_count"]
+        return "SELECT\n" + ",\n".join(select + grouped + overall) + f"\nFROM {source}"
+
+    select = [f"    GROUPING({SEGMENT_COLUMN}) AS all_rows", f"    {SEGMENT_COLUMN} AS segment",
+              "    COUNT(*) AS row_count"]
+    query = (
+        f"WITH profiled AS (\nSELECT {', '.join(OrderedDict.fromkeys([SEGMENT_COLUMN, *columns]))}\nFROM {source}\n),\n"
+        "segments AS (\nSELECT\n" + ",\n".join(select + grouped) + "\nFROM profiled"
+        f"\nGROUP BY GROUPING SETS ((), ({SEGMENT_COLUMN}))\n)"
+    )
+    if not overall:
+        return query + "\nSELECT * FROM segments"
+    return (
+        query + ",\noverall AS (\nSELECT\n" + ",\n".join(overall) + "\nFROM profiled\n)"
+        "\nSELECT segments.*, overall.*\nFROM segments\nLEFT JOIN overall ON segments.all_rows = 1"
+    )
+
+
+def _top_k_values(value):
+    """Normalise APPROX_TOP_K output ([[value, count], ...] on Snowflake, [value, ...] on DuckDB)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return [str(item[0] if isinstance(item, list) else item) for item in value]
+
+
+def unpack_profile(schema, table, columns, rows, run_at, run_year):
+    """Turn a table's result rows into one history record per column and segment."""
+    buckets = histogram_buckets(run_year)
+    records = []
+    for row in rows:
+        overall = int(row['ALL_ROWS']) == 1
+        segment = ALL_ROWS if overall else str(row['SEGMENT'] if row['SEGMENT'] is not None else '(none)')
+        row_count = int(row['ROW_COUNT'])
+        for i, (column, data_type) in enumerate(columns.items()):
+            nulls = int(row[f'C{i}_NULLS'])
+            distinct = row.get(f'C{i}_DISTINCT')
+            histogram = None
+            if overall and f'C{i}_H0' in row:
+                histogram = json.dumps({label: int(row[f'C{i}_H{j}']) for j, (label, _, _) in enumerate(buckets)})
+            top_k = _top_k_values(row.get(f'C{i}_TOP_K')) if overall else None
+            records.append({
+                'run_at': run_at,
+                'table_schema': schema,
+                'table_name': table,
+                'column_name': column,
+                'segment': segment,
+                'row_count': row_count,
+                'null_count': nulls,
+                'null_pct': round(100.0 * nulls / row_count, 4) if row_count else 0.0,
+                # HyperLogLog can overshoot on small inputs; never report more than the non-NULL rows
+                'approx_distinct': min(int(distinct), row_count - nulls) if distinct is not None else None,
+                'min_value': row.get(f'C{i}_MIN'),
+                'max_value': row.get(f'C{i}_MAX'),
+                'top_k': json.dumps(top_k) if top_k is not None else None,
+                'histogram': histogram,
+            })
+    return records
+
+
+def history_dates(history_dir):
+    """Run dates with a saved profile, oldest first."""
+    if not history_dir.exists():
+        return []
+    return sorted(
+        path.name.split('=', 1)[1] for path in history_dir.glob('run_date=*')
+        if (path / 'profile.parquet').exists()
+    )
+
+
+def load_profile(history_dir, run_date):
+    return pq.read_table(history_dir / f'run_date={run_date}' / 'profile.parquet').to_pylist()
+
+
+def save_profile(history_dir, run_date, records):
+    """Write a run's profile as one zstd Parquet file, replacing any earlier run on the same date."""
+    path = history_dir / f'run_date={run_date}' / 'profile.parquet'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pylist(records, schema=HISTORY_SCHEMA), path, compression='zstd')
+    return path
+
+
+def _relative_change_pct(previous, current):
+    return abs(current - previous) / previous * 100 if previous else 0.0
+
+
+def _null_rate_z(previous, current):
+    """Two-proportion z statistic for a change in NULL rate."""
+    n0, n1 = previous['row_count'], current['row_count']
+    pooled = (previous['null_count'] + current['null_count']) / (n0 + n1)
+    variance = pooled * (1 - pooled) * (1 / n0 + 1 / n1)
+    if variance == 0:
+        return math.inf if previous['null_count'] * n1 != current['null_count'] * n0 else 0.0
+    return (current['null_count'] / n1 - previous['null_count'] / n0) / math.sqrt(variance)
+
+
+def _histogram_shift(previous, current):
+    """Total variation distance between two bucket histograms (0 = identical, 1 = disjoint)."""
+    previous, current = json.loads(previous), json.loads(current)
+    previous_total, current_total = sum(previous.values()), sum(current.values())
+    if not previous_total or not current_total:
+        return 0.0
+    labels = set(previous) | set(current)
+    return sum(abs(previous.get(label, 0) / previous_total - current.get(label, 0) / current_total)
+               for label in labels) / 2
+
+
+def detect_drift(baseline, current):
+    """Compare two runs' records and return one drift finding per metric that moved."""
+    previous_by_key = {(r['table_name'], r['column_name'], r['segment']): r for r in baseline}
+    current_keys = set()
+    findings = []
+
+    def flag(r, metric, previous, now, detail):
+        findings.append({
+            'table': r['table_name'], 'column': r['column_name'], 'segment': r['segment'],
+            'metric': metric, 'previous': previous, 'current': now, 'detail': detail
+        })
+
+    row_counts_checked = set()
+    for r in current:
+        key = (r['table_name'], r['column_name'], r['segment'])
+        current_keys.add(key)
+        previous = previous_by_key.get(key)
+        if previous is None:
+            continue
+        large_enough = min(previous['row_count'], r['row_count']) >= MIN_SEGMENT_ROWS
+
+        if (r['table_name'], r['segment']) not in row_counts_checked:
+            row_counts_checked.add((r['table_name'], r['segment']))
+            change = _relative_change_pct(previous['row_count'], r['row_count'])
+            if previous['row_count'] >= MIN_SEGMENT_ROWS and change >= ROW_COUNT_DRIFT_PCT:
+                flag(dict(r, column_name='*'), 'row_count', previous['row_count'], r['row_count'], f"{change:.1f}% change")
+
+        if large_enough:
+            delta = r['null_pct'] - previous['null_pct']
+            z = _null_rate_z(previous, r)
+            if abs(delta) >= NULL_DRIFT_POINTS and abs(z) >= NULL_DRIFT_Z:
+                flag(r, 'null_pct', previous['null_pct'], r['null_pct'], f"{delta:+.2f} points, z={z:+.1f}")
+
+        if r['segment'] != ALL_ROWS:
+            continue
+        if previous['approx_distinct'] and r['approx_distinct'] is not None:
+            change = _relative_change_pct(previous['approx_distinct'], r['approx_distinct'])
+            if previous['approx_distinct'] >= MIN_SEGMENT_ROWS and change >= DISTINCT_DRIFT_PCT:
+                flag(r, 'approx_distinct', previous['approx_distinct'], r['approx_distinct'], f"{change:.1f}% change")
+        if previous['top_k'] and r['top_k']:
+            previous_values, values = set(json.loads(previous['top_k'])), set(json.loads(r['top_k']))
+            overlap = len(previous_values & values) / len(previous_values | values) if previous_values | values else 1.0
+            if overlap < TOP_K_MIN_OVERLAP:
+                flag(r, 'top_k', sorted(previous_values), sorted(values), f"overlap {overlap:.2f}")
+        if previous['histogram'] and r['histogram']:
+            shift = _histogram_shift(previous['histogram'], r['histogram'])
+            if shift > HISTOGRAM_MAX_SHIFT:
+                flag(r, 'histogram', None, None, f"distribution shift {shift:.2f}")
+
+    # Practices that were profiled before but have no rows now
+    current_segments = {(table, segment) for table, _, segment in current_keys}
+    current_tables = {table for table, _, _ in current_keys}
+    missing = {}
+    for (table, _, segment), previous in previous_by_key.items():
+        if (segment != ALL_ROWS and table in current_tables and (table, segment) not in current_segments
+                and previous['row_count'] >= MIN_SEGMENT_ROWS):
+            missing[(table, segment)] = previous
+    for previous in missing.values():
+        flag(dict(previous, column_name='*'), 'segment_missing', previous['row_count'], 0, "practice has no rows")
+    return findings
+
+
+def main():
+    """Profile columns, save the run to history and report drift against the previous run."""
+    parser = argparse.ArgumentParser(description='Profile OLIDS source columns and flag drift between runs')
+    parser.add_argument('--table', action='append',
+                        help='Only profile this table (repeatable; default: every table in the completeness checks)')
+    parser.add_argument('--all-columns', action='store_true',
+                        help='Profile every column of each table, not just the completeness check fields')
+    parser.add_argument('--history-dir', type=Path, default=HISTORY_DIR,
+                        help=f'Parquet profile history directory (default: {HISTORY_DIR})')
+    parser.add_argument('--baseline-date',
+                        help='Run date (YYYY-MM-DD) to compare against (default: latest earlier run)')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Do not write this run to the history')
+    parser.add_argument('--backend', choices=['snowflake', 'duckdb'], default='snowflake',
+                        help='Execution backend (default: snowflake)')
+    parser.add_argument('--data', type=Path,
+                        help='Parquet fixture directory for the duckdb backend')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Number of table queries to run concurrently on Snowflake (default: {DEFAULT_JOBS})')
+    args = parser.parse_args()
+
+    local = args.backend == 'duckdb'
+    if local and not args.data:
+        print("ERROR: --data is required with --backend duckdb")
+        sys.exit(1)
+
+    tables = group_checks_by_table(COMPLETENESS_CHECKS)
+    if args.table:
+        wanted = {name.upper() for name in args.table}
+        tables = OrderedDict((key, fields) for key, fields in tables.items() if key[1] in wanted)
+        if not tables:
+            print(f"ERROR: No completeness-checked tables match {', '.join(sorted(wanted))}")
+            sys.exit(1)
+
+    now = datetime.now()
+    run_at = now.isoformat(timespec='seconds')
+    run_date = now.date().isoformat()
+
+    print(f"\n{'='*100}")
+    print("COLUMN PROFILE")
+    print(f"{'='*100}")
+    print(f"Database: {SOURCE_DATABASE}")
+    print(f"Tables: {len(tables)}")
+
+    if local:
+        print(f"\nLoading DuckDB fixtures from {args.data}...")
+        connection.register_engine('duckdb', lambda **_: duckdb_backend.connect(args.data))
+    else:
+        print(f"\nConnecting to Snowflake...")
+
+    session = connection.get_session(engine='duckdb' if local else None)
+    print("✓ Connected successfully")
+
+    try:
+        types = get_column_types(session, list(tables), local)
+        profiled = OrderedDict()
+        for (schema, table), fields in tables.items():
+            table_types = types.get((schema, table))
+            if not table_types:
+                print(f"  → {schema}.{table} not found, skipping")
+                continue
+            names = list(table_types) if args.all_columns else [f.upper() for f in fields if f.upper() in table_types]
+            profiled[(schema, table)] = (
+                OrderedDict((name, table_types[name]) for name in names),
+                SEGMENT_COLUMN in table_types
+            )
+
+        print(f"\nProfiling {sum(len(cols) for cols, _ in profiled.values())} columns "
+              f"across {len(profiled)} tables (one scan each)...")
+        queries = OrderedDict(
+            (key, build_profile_query(key[0], key[1], cols, segmented, now.year))
+            for key, (cols, segmented) in profiled.items()
+        )
+        if local:
+            rows = {}
+            for i, (key, query) in enumerate(queries.items(), 1):
+                rows[key] = run_query(session, query)
+                print(f"  Checked table {i}/{len(queries)}: {key[1]}")
+        else:
+            rows = run_table_queries(session, queries, args.jobs)
+
+        records = []
+        for key, (cols, _) in profiled.items():
+            records.extend(unpack_profile(key[0], key[1], cols, rows[key], run_at, now.year))
+        print("✓ Profiling completed")
+    finally:
+        session.close()
+        print("\nConnection closed")
+
+    # Overall profile
+    print(f"\n{'='*100}")
+    print("PROFILE")
+    print(f"{'='*100}")
+    for key, (cols, segmented) in profiled.items():
+        overall = [r for r in records if r['table_name'] == key[1] and r['segment'] == ALL_ROWS]
+        if not overall:
+            continue
+        heading = f"{overall[0]['row_count']:,} rows"
+        if segmented:
+            practices = len({r['segment'] for r in records if r['table_name'] == key[1]}) - 1
+            heading += f", {practices:,} practices"
+        print(f"\n  {key[1]} ({heading})")
+        for r in overall:
+            line = f"    {r['column_name']}: {r['null_pct']:.2f}% NULL"
+            if r['approx_distinct'] is not None:
+                line += f", ~{r['approx_distinct']:,} distinct, {r['min_value']} → {r['max_value']}"
+            print(line)
+
+    # Drift against the previous run
+    earlier = [d for d in history_dates(args.history_dir) if d < run_date]
+    baseline_date = args.baseline_date or (earlier[-1] if earlier else None)
+
+    print(f"\n{'='*100}")
+    print("DRIFT")
+    print(f"{'='*100}")
+    findings = []
+    if baseline_date is None:
+        print("\nNo earlier run in the history, nothing to compare against")
+    elif baseline_date not in history_dates(args.history_dir):
+        print(f"\nERROR: No saved profile for {baseline_date}")
+    else:
+        print(f"\nBaseline: {baseline_date}")
+        findings = detect_drift(load_profile(args.history_dir, baseline_date), records)
+        if findings:
+            print(f"\n⚠️  DRIFT DETECTED ({len(findings)} findings):\n")
+            for f in findings:
+                where = f"{f['table']}.{f['column']}" + (f" [{f['segment']}]" if f['segment'] != ALL_ROWS else '')
+                values = f": {f['previous']} → {f['current']}" if f['previous'] is not None else ''
+                print(f"  {where} {f['metric']}{values} ({f['detail']})")
+        else:
+            print("\n✓ No drift detected")
+
+    if not args.no_save:
+        path = save_profile(args.history_dir, run_date, records)
+        print(f"\n✓ Profile saved to {path} ({len(records):,} rows)")
+
+    # Summary
+    print(f"\n{'='*100}")
+    print("SUMMARY")
+    print(f"{'='*100}")
+    print(f"Tables profiled: {len(profiled)}")
+    print(f"Column profiles: {len([r for r in records if r['segment'] == ALL_ROWS]):,}")
+    print(f"Practice-level profiles: {len([r for r in records if r['segment'] != ALL_ROWS]):,}")
+    print(f"Drift findings: {len(findings)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Local result cache for run_tests.py.
+
+Stores the PASS/FAIL rows returned by each test in a SQLite file, keyed by a
+hash of the test SQL plus the LAST_ALTERED timestamps of every table the test
+references. Cached rows are reused until the SQL or any of those tables change.
+
+Tests are not cached when:
+- No fully qualified table references can be found in the SQL
+- A referenced table has no LAST_ALTERED (e.g. INFORMATION_SCHEMA views)
+Tests that use CURRENT_DATE/CURRENT_TIMESTAMP are keyed on today's date as well.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / '.cache'
+CACHE_FILE = CACHE_DIR / 'results.sqlite'
+
+# Three-part names such as "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.OBSERVATION
+TABLE_REFERENCE_PATTERN = re.compile(r'("[^"]+"|\b[A-Za-z_]\w*)\.([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b')
+
+# Functions that make a test's result depend on when it runs
+TIME_DEPENDENT_PATTERN = re.compile(
+    r'\b(CURRENT_DATE|CURRENT_TIMESTAMP|SYSDATE|GETDATE|LOCALTIMESTAMP)\b', re.IGNORECASE
+)
+
+
+def open_cache(cache_file: Path = CACHE_FILE) -> sqlite3.Connection:
+    """Open (creating if needed) the SQLite result cache."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(cache_file)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS test_results (
+            test_name TEXT NOT NULL,
+            cache_key TEXT NOT NULL,
+            results_json TEXT NOT NULL,
+            cached_at TEXT NOT NULL,
+            PRIMARY KEY (test_name, cache_key)
+        )
+    """)
+    db.commit()
+    return db
+
+
+def find_referenced_tables(sql: str) -> set:
+    """Return fully qualified (database, schema, table) references found in the SQL."""
+    tables = set()
+    for database, schema, table in TABLE_REFERENCE_PATTERN.findall(sql):
+        tables.add((database.strip('"'), schema.upper(), table.upper()))
+    return tables
+
+
+def fetch_last_altered(run_query, tables: set) -> dict:
+    """
+    Look up LAST_ALTERED for each referenced table, one query per database.
+
+    `run_query` takes a SQL string and returns a list of dicts.
+    Returns {(database, schema, table): last_altered_iso}.
+    """
+    by_database = defaultdict(set)
+    for database, schema, table in tables:
+        if schema != 'INFORMATION_SCHEMA':
+            by_database[database].add(f"{schema}.{table}")
+
+    last_altered = {}
+    for database, qualified_names in sorted(by_database.items()):
+        in_list = ", ".join(f"'{name}'" for name in sorted(qualified_names))
+        query = f"""
+        SELECT table_schema, table_name, last_altered
+        FROM "{database}".INFORMATION_SCHEMA.TABLES
+        WHERE table_schema || '.' || table_name IN ({in_list})
+        """
+        for row in run_query(query):
+            key = (database, row['TABLE_SCHEMA'].upper(), row['TABLE_NAME'].upper())
+            last_altered[key] = str(row['LAST_ALTERED'])
+
+    return last_altered
+
+
+def build_cache_key(sql: str, tables: set, last_altered: dict):
+    """Hash the SQL with its tables' LAST_ALTERED values. Returns None if not cacheable."""
+    if not tables or any(t not in last_altered for t in tables):
+        return None
+
+    hasher = hashlib.sha256(sql.encode('utf-8'))
+    for table in sorted(tables):
+        hasher.update(f"|{'.'.join(table)}={last_altered[table]}".encode('utf-8'))
+    if TIME_DEPENDENT_PATTERN.search(sql):
+        hasher.update(f"|run_date={date.today().isoformat()}".encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def compute_cache_keys(run_query, tests: list) -> dict:
+    """Return {test_name: cache_key or None} for the given test files."""
+    sql_by_test = {t.name: t.read_text(encoding='utf-8') for t in tests}
+    tables_by_test = {name: find_referenced_tables(sql) for name, sql in sql_by_test.items()}
+
+    all_tables = set().union(*tables_by_test.values()) if tables_by_test else set()
+    last_altered = fetch_last_altered(run_query, all_tables)
+
+    return {
+        name: build_cache_key(sql_by_test[name], tables_by_test[name], last_altered)
+        for name in sql_by_test
+    }
+
+
+def get_cached_results(db: sqlite3.Connection, test_name: str, cache_key: str):
+    """Return cached result rows for a test, or None on a cache miss."""
+    row = db.execute(
+        "SELECT results_json FROM test_results WHERE test_name = ? AND cache_key = ?",
+        (test_name, cache_key)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def store_results(db: sqlite3.Connection, test_name: str, cache_key: str, results: list):
+    """Store result rows for a test, replacing any entries for older inputs."""
+    db.execute("DELETE FROM test_results WHERE test_name = ?", (test_name,))
+    db.execute(
+        "INSERT INTO test_results (test_name, cache_key, results_json, cached_at) VALUES (?, ?, ?, ?)",
+        (test_name, cache_key, json.dumps(results, default=str), datetime.now().isoformat())
+    )
+    db.commit()
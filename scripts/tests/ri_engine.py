@@ -0,0 +1,269 @@
+"""
+Fused referential integrity queries.
+
+Builds one statement that checks many foreign keys while scanning each child
+table once and reading each parent table's key column once:
+
+- parent_<table> CTEs hold the DISTINCT parent keys, one per parent table
+  however many foreign keys point at it
+- child_<schema>_<table> CTEs scan a child table once, LEFT JOIN every parent key set
+  it references and aggregate all of its foreign keys in one pass
+- each child aggregate is unpivoted to one row per foreign key with a
+  CROSS JOIN against a VALUES list, so the aggregate is referenced only once
+
+Joining DISTINCT key sets keeps the child row count unchanged, so row counts
+match a plain LEFT JOIN against a unique id column.
+
+Each result row has CHILD_SCHEMA, CHILD_TABLE, FK_COLUMN, PARENT_SCHEMA,
+PARENT_TABLE, TOTAL_DISTINCT_FK_VALUES, TOTAL_ROWS_WITH_FK, ORPHANED_FK_VALUES
+and ORPHANED_ROWS.
+
+Approximate mode (build_approx_query, approx_local) samples the key space by
+hash instead: a key is in the sample on both sides of the join or on neither,
+so parent key sets shrink by the sample fraction and orphan rates estimated
+from sampled keys are unbiased. Distinct totals come from HyperLogLog
+(APPROX_COUNT_DISTINCT on Snowflake, sketches.py locally) and
+estimate_orphans() turns the sampled counts into a confidence interval.
+Approximate rows have APPROX_DISTINCT_FK_VALUES, TOTAL_ROWS_WITH_FK,
+SAMPLED_FK_VALUES, SAMPLED_ORPHAN_FK_VALUES, SAMPLED_ROWS and
+SAMPLED_ORPHAN_ROWS instead of the exact counts.
+"""
+
+import math
+from collections import OrderedDict
+
+from common import fetch
+import sketches
+
+# Aggregates computed per foreign key: (suffix, SQL template)
+FK_METRICS = [
+    ('TOTAL_DISTINCT_FK_VALUES', 'COUNT(DISTINCT c.{fk})'),
+    ('TOTAL_ROWS_WITH_FK', 'COUNT(c.{fk})'),
+    ('ORPHANED_FK_VALUES', 'COUNT(DISTINCT CASE WHEN {parent}.{pk} IS NULL THEN c.{fk} END)'),
+    ('ORPHANED_ROWS', 'COUNT(CASE WHEN c.{fk} IS NOT NULL AND {parent}.{pk} IS NULL THEN 1 END)'),
+]
+
+# Key-space sample: the same HASH bucket test is applied to parent and child keys
+SAMPLE_BUCKETS = 1_000_000
+SAMPLE_PREDICATE = 'MOD(ABS(HASH({column})), ' + str(SAMPLE_BUCKETS) + ') < {buckets}'
+
+APPROX_METRICS = [
+    ('APPROX_DISTINCT_FK_VALUES', 'APPROX_COUNT_DISTINCT(c.{fk})'),
+    ('TOTAL_ROWS_WITH_FK', 'COUNT(c.{fk})'),
+    ('SAMPLED_FK_VALUES', 'COUNT(DISTINCT CASE WHEN {sampled} THEN c.{fk} END)'),
+    ('SAMPLED_ORPHAN_FK_VALUES', 'COUNT(DISTINCT CASE WHEN {sampled} AND {parent}.{pk} IS NULL THEN c.{fk} END)'),
+    ('SAMPLED_ROWS', 'COUNT(CASE WHEN c.{fk} IS NOT NULL AND {sampled} THEN 1 END)'),
+    ('SAMPLED_ORPHAN_ROWS', 'COUNT(CASE WHEN c.{fk} IS NOT NULL AND {sampled} AND {parent}.{pk} IS NULL THEN 1 END)'),
+]
+
+# Average relative error of Snowflake's APPROX_COUNT_DISTINCT (HLL with 4096 registers)
+SNOWFLAKE_HLL_ERROR = 0.0162338
+
+
+def group_by_child(relationships: list) -> OrderedDict:
+    """Group relationships by (child_schema, child_table), keeping discovery order."""
+    groups = OrderedDict()
+    for rel in relationships:
+        groups.setdefault((rel['child_schema'], rel['child_table']), []).append(rel)
+    return groups
+
+
+def parent_key_ctes(relationships: list) -> OrderedDict:
+    """One CTE name per distinct (parent_schema, parent_table, pk_column)."""
+    parents = OrderedDict()
+    for rel in relationships:
+        key = (rel['parent_schema'], rel['parent_table'], rel['pk_column'])
+        if key not in parents:
+            name = f"parent_{rel['parent_table'].lower()}"
+            if name in parents.values():
+                name = f"parent_{rel['parent_schema'].lower()}_{rel['parent_table'].lower()}"
+            parents[key] = name
+    return parents
+
+
+def _metric_column(fk_column: str, metric: str) -> str:
+    return f"{fk_column.upper()}__{metric}"
+
+
+def build_fused_query(relationships: list, database: str, metrics: list = FK_METRICS,
+                      sample_fraction: float = None) -> str:
+    """
+    Build one statement checking every relationship, scanning each child and parent table once.
+
+    With sample_fraction, parent key sets are restricted to the hash sample
+    and `metrics` can refer to {sampled}, the matching predicate on child keys.
+    """
+    parents = parent_key_ctes(relationships)
+    buckets = round((sample_fraction or 1.0) * SAMPLE_BUCKETS)
+    ctes = []
+
+    for (schema, table, pk_column), cte in parents.items():
+        where = f" WHERE {SAMPLE_PREDICATE.format(column=pk_column, buckets=buckets)}" if sample_fraction else ''
+        ctes.append(
+            f"{cte} AS (\n"
+            f"    SELECT DISTINCT {pk_column} FROM {database}.{schema}.{table}{where}\n"
+            f")"
+        )
+
+    selects = []
+    for (child_schema, child_table), rels in group_by_child(relationships).items():
+        child_cte = f"child_{child_schema.lower()}_{child_table.lower()}"
+        columns = []
+        joins = []
+        for i, rel in enumerate(rels, 1):
+            alias = f"p{i}"
+            parent_cte = parents[(rel['parent_schema'], rel['parent_table'], rel['pk_column'])]
+            joins.append(f"    LEFT JOIN {parent_cte} {alias} ON c.{rel['fk_column']} = {alias}.{rel['pk_column']}")
+            sampled = SAMPLE_PREDICATE.format(column=f"c.{rel['fk_column']}", buckets=buckets)
+            for metric, template in metrics:
+                expression = template.format(fk=rel['fk_column'], parent=alias, pk=rel['pk_column'], sampled=sampled)
+                columns.append(f"        {expression} AS {_metric_column(rel['fk_column'], metric)}")
+        ctes.append(
+            f"{child_cte} AS (\n"
+            f"    SELECT\n" + ",\n".join(columns) + "\n"
+            f"    FROM {database}.{child_schema}.{child_table} c\n" + "\n".join(joins) + "\n)"
+        )
+
+        values = ",\n".join(
+            f"        ('{rel['fk_column']}', '{rel['parent_schema']}', '{rel['parent_table']}')" for rel in rels
+        )
+        picks = []
+        for metric, _ in metrics:
+            cases = " ".join(
+                f"WHEN '{rel['fk_column']}' THEN a.{_metric_column(rel['fk_column'], metric)}" for rel in rels
+            )
+            picks.append(f"    CASE fk.fk_column {cases} END AS {metric}")
+        selects.append(
+            f"SELECT\n"
+            f"    '{child_schema}' AS child_schema,\n"
+            f"    '{child_table}' AS child_table,\n"
+            f"    fk.fk_column,\n"
+            f"    fk.parent_schema,\n"
+            f"    fk.parent_table,\n" + ",\n".join(picks) + "\n"
+            f"FROM {child_cte} a\n"
+            f"CROSS JOIN (VALUES\n{values}\n) AS fk (fk_column, parent_schema, parent_table)"
+        )
+
+    return "WITH " + ",\n".join(ctes) + "\n" + "\nUNION ALL\n".join(selects)
+
+
+def build_approx_query(relationships: list, database: str, sample_fraction: float) -> str:
+    """Approximate counterpart of build_fused_query: HLL distinct totals plus exact counts on a key sample."""
+    return build_fused_query(relationships, database, APPROX_METRICS, sample_fraction)
+
+
+def approx_local(conn, relationships: list, database: str, sample_fraction: float,
+                 precision: int = 14, error_rate: float = 0.001) -> list:
+    """
+    Approximate check with pure-Python sketches, for the duckdb backend.
+
+    Each parent key set is streamed once into a Bloom filter (sampled keys
+    only) and each child table is streamed once; every foreign key gets a
+    HyperLogLog of all values and exact counts over its sampled values.
+    Returns rows shaped like build_approx_query results.
+    """
+    blooms = {}
+    for rel in relationships:
+        key = (rel['parent_schema'], rel['parent_table'], rel['pk_column'])
+        if key in blooms:
+            continue
+        table = f"{database}.{rel['parent_schema']}.{rel['parent_table']}"
+        records, _ = fetch.fetch_records(fetch.stream_query(conn, f"SELECT COUNT(*) AS row_count FROM {table}"))
+        capacity = int(next(iter(records[0].values())) * sample_fraction) + 1
+        bloom = sketches.bloom_new(capacity, error_rate)
+        query = f"SELECT {rel['pk_column']} AS k FROM {table} WHERE {rel['pk_column']} IS NOT NULL"
+        for batch in fetch.stream_query(conn, query):
+            for value in batch.column(0).to_pylist():
+                if sketches.in_sample(value, sample_fraction):
+                    sketches.bloom_add(bloom, value)
+        blooms[key] = bloom
+
+    rows = []
+    for (child_schema, child_table), rels in group_by_child(relationships).items():
+        state = {
+            rel['fk_column']: {'hll': sketches.hll_new(precision), 'rows': 0, 'sampled': set(),
+                               'orphans': set(), 'sampled_rows': 0, 'orphan_rows': 0}
+            for rel in rels
+        }
+        columns = ", ".join(rel['fk_column'] for rel in rels)
+        for batch in fetch.stream_query(conn, f"SELECT {columns} FROM {database}.{child_schema}.{child_table}"):
+            for index, rel in enumerate(rels):
+                fk = state[rel['fk_column']]
+                bloom = blooms[(rel['parent_schema'], rel['parent_table'], rel['pk_column'])]
+                for value in batch.column(index).to_pylist():
+                    if value is None:
+                        continue
+                    fk['rows'] += 1
+                    sketches.hll_add(fk['hll'], value)
+                    if sketches.in_sample(value, sample_fraction):
+                        fk['sampled'].add(value)
+                        fk['sampled_rows'] += 1
+                        if not sketches.bloom_contains(bloom, value):
+                            fk['orphans'].add(value)
+                            fk['orphan_rows'] += 1
+
+        for rel in rels:
+            fk = state[rel['fk_column']]
+            rows.append({
+                'CHILD_SCHEMA': child_schema,
+                'CHILD_TABLE': child_table,
+                'FK_COLUMN': rel['fk_column'],
+                'PARENT_SCHEMA': rel['parent_schema'],
+                'PARENT_TABLE': rel['parent_table'],
+                'APPROX_DISTINCT_FK_VALUES': round(sketches.hll_estimate(fk['hll'])),
+                'TOTAL_ROWS_WITH_FK': fk['rows'],
+                'SAMPLED_FK_VALUES': len(fk['sampled']),
+                'SAMPLED_ORPHAN_FK_VALUES': len(fk['orphans']),
+                'SAMPLED_ROWS': fk['sampled_rows'],
+                'SAMPLED_ORPHAN_ROWS': fk['orphan_rows'],
+            })
+    return rows
+
+
+def estimate_orphans(row: dict, hll_error: float, false_positive_rate: float = 0.0, z: float = 1.96) -> dict:
+    """
+    Orphan rate estimates with confidence intervals from an approximate result row.
+
+    Rates (percent of distinct FK values, and of rows) come from the key
+    sample with a Wilson interval. A Bloom filter hides orphans at its false
+    positive rate, so sampled rates are scaled up by 1 / (1 - rate). The
+    orphan count interval also allows for the HyperLogLog error in the total.
+    """
+    correction = 1 / (1 - false_positive_rate)
+    sampled_values = int(row['SAMPLED_FK_VALUES'])
+    sampled_orphans = int(row['SAMPLED_ORPHAN_FK_VALUES'])
+    low, high = sketches.wilson_interval(sampled_orphans, sampled_values, z)
+    rate = sampled_orphans / sampled_values if sampled_values else 0.0
+    rate, low, high = (min(1.0, value * correction) for value in (rate, low, high))
+
+    sampled_rows = int(row['SAMPLED_ROWS'])
+    row_rate = min(1.0, int(row['SAMPLED_ORPHAN_ROWS']) / sampled_rows * correction) if sampled_rows else 0.0
+
+    distinct = int(row['APPROX_DISTINCT_FK_VALUES'])
+    return {
+        'orphan_pct': rate * 100,
+        'ci_low_pct': low * 100,
+        'ci_high_pct': high * 100,
+        'orphan_row_pct': row_rate * 100,
+        'est_orphaned_fk': round(rate * distinct),
+        'est_orphaned_fk_low': int(low * distinct * max(0.0, 1 - z * hll_error)),
+        'est_orphaned_fk_high': math.ceil(high * distinct * (1 + z * hll_error)),
+        'est_orphaned_rows': round(row_rate * int(row['TOTAL_ROWS_WITH_FK'])),
+    }
+
+
+def classify(estimate: dict, threshold_pct: float) -> str:
+    """
+    FAIL, PASS or EXACT (needs an exact check) for an estimate.
+
+    A relationship is broken when it has any orphaned FK value, as in the
+    exact check. Sampled orphans are real (a Bloom filter only hides them), so
+    any sampled orphan is FAIL. With none sampled, PASS needs the interval's
+    upper bound within threshold_pct; otherwise the sample is too small to
+    rule out an orphan rate above it and the relationship is checked exactly.
+    """
+    if estimate['orphan_pct'] > 0:
+        return 'FAIL'
+    if estimate['ci_high_pct'] <= threshold_pct:
+        return 'PASS'
+    return 'EXACT'
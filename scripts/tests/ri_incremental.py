@@ -0,0 +1,325 @@
+"""
+Incremental referential integrity with persisted orphan state.
+
+Only child rows with a new lds_start_date_time can introduce new orphans, so
+after a first full check each run looks at:
+
+1. Parent tables: distinct key count and keys first seen since the parent
+   watermark. If the count is lower than the previous count plus the new
+   keys, parent rows were deleted and every relationship on that parent gets
+   a full re-check (a deletion can orphan any older child row).
+2. Child rows loaded at or after the relationship's watermark, checked
+   against the full parent key set, in one fused scan per child table. The
+   comparison is inclusive so rows loaded in a later batch with the newest
+   timestamp already seen are not missed; rows at the watermark are scanned
+   again, and their orphans are de-duplicated against the stored orphan keys
+   (a known key only adds the rows loaded after the watermark).
+3. Known orphan keys, re-validated against parent rows loaded since the
+   parent watermark, and dropped once their parent appears.
+
+A relationship is also fully re-checked when it has no state yet, its child
+table has no lds_start_date_time, or its last full check is older than
+full_every_days (which also clears out orphans whose child rows were deleted).
+
+Only the child scans are incremental. Every run still reads each parent
+table's key column in full: check_parent groups all its rows by key to count
+distinct keys for the deletion guard, and the orphan scan joins new child rows
+to the full DISTINCT parent key sets. Run time is therefore bounded below by
+one pass over the parent key columns (PATIENT, PERSON, ORGANISATION, ...).
+
+State lives in a local SQLite file:
+    ri_relationships  relationship -> child watermark, last full check
+    ri_parents        parent table -> watermark, distinct key count
+    ri_orphans        relationship, orphan FK value -> rows when found, first seen
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from common import fetch
+import ri_engine
+
+STATE_FILE = Path(__file__).parent / '.cache' / 'ri_state.sqlite'
+
+LOADED_AT_COLUMN = 'LDS_START_DATE_TIME'
+
+# Known orphans are re-validated with IN lists of at most this many keys
+REVALIDATE_CHUNK_SIZE = 5_000
+
+
+def open_state(state_file: Path = STATE_FILE) -> sqlite3.Connection:
+    """Open (creating if needed) the SQLite state store."""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(state_file)
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS ri_relationships (
+            relationship TEXT PRIMARY KEY,
+            child_watermark TEXT,
+            full_checked_at TEXT NOT NULL,
+            checked_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS ri_parents (
+            parent TEXT PRIMARY KEY,
+            watermark TEXT,
+            key_count INTEGER NOT NULL,
+            checked_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS ri_orphans (
+            relationship TEXT NOT NULL,
+            fk_value TEXT NOT NULL,
+            orphan_rows INTEGER NOT NULL,
+            first_seen TEXT NOT NULL,
+            PRIMARY KEY (relationship, fk_value)
+        );
+    """)
+    db.commit()
+    return db
+
+
+def relationship_key(rel: dict) -> str:
+    return (f"{rel['child_schema']}.{rel['child_table']}.{rel['fk_column']}"
+            f"->{rel['parent_schema']}.{rel['parent_table']}.{rel['pk_column']}")
+
+
+def parent_key(rel: dict) -> str:
+    return f"{rel['parent_schema']}.{rel['parent_table']}.{rel['pk_column']}"
+
+
+def _run_query(conn, query: str) -> list:
+    records, _ = fetch.fetch_records(fetch.stream_query(conn, query))
+    return [{column.upper(): value for column, value in row.items()} for row in records]
+
+
+def _literal(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def check_parent(conn, database: str, rel: dict, state, has_loaded_at: bool) -> dict:
+    """
+    Count a parent's distinct keys and the keys first seen since its watermark.
+
+    This is a full GROUP BY over the parent table on every run, not an
+    incremental read (see the module docstring).
+
+    Returns {'key_count', 'new_keys', 'watermark', 'deleted_keys'}; deleted_keys
+    is a lower bound on parent keys removed since the last run.
+    """
+    table = f"{database}.{rel['parent_schema']}.{rel['parent_table']}"
+    pk = rel['pk_column']
+    if has_loaded_at:
+        since = f"first_loaded > {_literal(state[0])}" if state and state[0] else 'TRUE'
+        query = f"""
+        WITH parent_keys AS (
+            SELECT {pk} AS key, MIN({LOADED_AT_COLUMN}) AS first_loaded, MAX({LOADED_AT_COLUMN}) AS last_loaded
+            FROM {table}
+            WHERE {pk} IS NOT NULL
+            GROUP BY {pk}
+        )
+        SELECT COUNT(*) AS key_count, COUNT(CASE WHEN {since} THEN 1 END) AS new_keys, MAX(last_loaded) AS watermark
+        FROM parent_keys
+        """
+    else:
+        query = f"SELECT COUNT(DISTINCT {pk}) AS key_count, 0 AS new_keys, NULL AS watermark FROM {table}"
+    row = _run_query(conn, query)[0]
+
+    key_count, new_keys = int(row['KEY_COUNT']), int(row['NEW_KEYS'])
+    deleted = (state[1] + new_keys - key_count) if state else 0
+    return {
+        'key_count': key_count,
+        'new_keys': new_keys,
+        'watermark': str(row['WATERMARK']) if row['WATERMARK'] is not None else None,
+        'deleted_keys': max(deleted, 0),
+    }
+
+
+def build_orphan_scan(relationships: list, database: str, watermark: str = None, has_loaded_at: bool = True) -> str:
+    """
+    One scan of a child table returning its orphan keys for every relationship.
+
+    Child rows are those loaded at or after watermark (all rows without one).
+    Returns one summary row (FK_COLUMN NULL, ROW_COUNT = rows scanned,
+    WATERMARK = newest lds_start_date_time) plus one row per orphan key, whose
+    NEW_ROW_COUNT counts only the rows loaded after the watermark.
+    """
+    parents = ri_engine.parent_key_ctes(relationships)
+    child_schema, child_table = relationships[0]['child_schema'], relationships[0]['child_table']
+    ctes = [
+        f"{cte} AS (\n    SELECT DISTINCT {pk} FROM {database}.{schema}.{table}\n)"
+        for (schema, table, pk), cte in parents.items()
+    ]
+
+    columns = [f"        {'c.' + LOADED_AT_COLUMN if has_loaded_at else 'CAST(NULL AS TIMESTAMP)'} AS loaded_at"]
+    joins = []
+    for i, rel in enumerate(relationships, 1):
+        parent_cte = parents[(rel['parent_schema'], rel['parent_table'], rel['pk_column'])]
+        columns.append(f"        c.{rel['fk_column']} AS fk{i}, p{i}.{rel['pk_column']} AS pk{i}")
+        joins.append(f"    LEFT JOIN {parent_cte} p{i} ON c.{rel['fk_column']} = p{i}.{rel['pk_column']}")
+    where = f"\n    WHERE c.{LOADED_AT_COLUMN} >= {_literal(watermark)}" if watermark else ''
+    new_rows = f"COUNT_IF(loaded_at > {_literal(watermark)})" if watermark else 'COUNT(*)'
+    ctes.append(
+        "scan AS (\n    SELECT\n" + ",\n".join(columns) + "\n"
+        f"    FROM {database}.{child_schema}.{child_table} c\n" + "\n".join(joins) + where + "\n)"
+    )
+
+    selects = [
+        "SELECT CAST(NULL AS VARCHAR) AS fk_column, CAST(NULL AS VARCHAR) AS fk_value, "
+        "COUNT(*) AS row_count, COUNT(*) AS new_row_count, MAX(loaded_at) AS watermark FROM scan"
+    ]
+    for i, rel in enumerate(relationships, 1):
+        selects.append(
+            f"SELECT '{rel['fk_column']}', CAST(fk{i} AS VARCHAR), COUNT(*), {new_rows}, NULL FROM scan "
+            f"WHERE fk{i} IS NOT NULL AND pk{i} IS NULL GROUP BY fk{i}"
+        )
+    return "WITH " + ",\n".join(ctes) + "\n" + "\nUNION ALL\n".join(selects)
+
+
+def revalidate_orphans(conn, database: str, rel: dict, orphan_keys: list, parent_watermark: str,
+                       has_loaded_at: bool) -> set:
+    """Return the known orphan keys whose parent row has been loaded since the parent watermark."""
+    table = f"{database}.{rel['parent_schema']}.{rel['parent_table']}"
+    pk = rel['pk_column']
+    since = f" AND {LOADED_AT_COLUMN} >= {_literal(parent_watermark)}" if has_loaded_at and parent_watermark else ''
+    resolved = set()
+    for start in range(0, len(orphan_keys), REVALIDATE_CHUNK_SIZE):
+        chunk = orphan_keys[start:start + REVALIDATE_CHUNK_SIZE]
+        in_list = ", ".join(_literal(key) for key in chunk)
+        query = f"SELECT DISTINCT CAST({pk} AS VARCHAR) AS key FROM {table} WHERE {pk} IN ({in_list}){since}"
+        resolved.update(row['KEY'] for row in _run_query(conn, query))
+    return resolved
+
+
+def run_incremental(conn, relationships: list, database: str, columns_by_table: dict,
+                    db: sqlite3.Connection, full_every_days: float = 7.0, full_refresh: bool = False) -> list:
+    """
+    Check relationships incrementally against the saved state and update it.
+
+    columns_by_table maps (schema, table) to upper-case column names, used to
+    tell which tables have lds_start_date_time. Returns one result per
+    relationship with its mode, rows scanned and orphan keys.
+    """
+    now = datetime.now()
+    run_at = now.isoformat(timespec='seconds')
+    full_before = (now - timedelta(days=full_every_days)).isoformat(timespec='seconds')
+
+    def has_loaded_at(schema, table):
+        return LOADED_AT_COLUMN in columns_by_table.get((schema, table), ())
+
+    # 1. Parent deletion guard, one query per parent table
+    parent_checks = {}
+    for rel in relationships:
+        key = parent_key(rel)
+        if key in parent_checks:
+            continue
+        state = db.execute("SELECT watermark, key_count FROM ri_parents WHERE parent = ?", (key,)).fetchone()
+        parent_checks[key] = dict(
+            check_parent(conn, database, rel, state, has_loaded_at(rel['parent_schema'], rel['parent_table'])),
+            previous_watermark=state[0] if state else None
+        )
+        if parent_checks[key]['deleted_keys']:
+            print(f"  → {rel['parent_table']}: at least {parent_checks[key]['deleted_keys']:,} parent keys deleted, "
+                  f"re-checking its relationships in full")
+
+    # 2. Decide the mode per relationship and scan new child rows
+    plans = {}
+    for rel in relationships:
+        state = db.execute(
+            "SELECT child_watermark, full_checked_at FROM ri_relationships WHERE relationship = ?",
+            (relationship_key(rel),)
+        ).fetchone()
+        child_has_loaded_at = has_loaded_at(rel['child_schema'], rel['child_table'])
+        if (full_refresh or state is None or not child_has_loaded_at or state[0] is None
+                or state[1] < full_before or parent_checks[parent_key(rel)]['deleted_keys']):
+            plans[relationship_key(rel)] = ('full', None)
+        else:
+            plans[relationship_key(rel)] = ('incremental', state[0])
+
+    groups = {}
+    for rel in relationships:
+        mode, watermark = plans[relationship_key(rel)]
+        groups.setdefault((rel['child_schema'], rel['child_table'], watermark), []).append(rel)
+
+    scanned = {}
+    for (child_schema, child_table, watermark), rels in groups.items():
+        query = build_orphan_scan(rels, database, watermark, has_loaded_at(child_schema, child_table))
+        rows = _run_query(conn, query)
+        summary = next(row for row in rows if row['FK_COLUMN'] is None)
+        orphans_by_fk = {}
+        for row in rows:
+            if row['FK_COLUMN'] is not None:
+                orphans_by_fk.setdefault(row['FK_COLUMN'], {})[row['FK_VALUE']] = (
+                    int(row['ROW_COUNT']), int(row['NEW_ROW_COUNT']))
+        new_watermark = str(summary['WATERMARK']) if summary['WATERMARK'] is not None else watermark
+        for rel in rels:
+            scanned[relationship_key(rel)] = (int(summary['ROW_COUNT']), new_watermark,
+                                              orphans_by_fk.get(rel['fk_column'], {}))
+
+    # 3. Merge with known orphans, re-validating them against new parent rows
+    results = []
+    for rel in relationships:
+        rel_key = relationship_key(rel)
+        mode, _ = plans[rel_key]
+        rows_scanned, new_watermark, new_orphans = scanned[rel_key]
+        parent_check = parent_checks[parent_key(rel)]
+
+        known = dict(db.execute(
+            "SELECT fk_value, orphan_rows FROM ri_orphans WHERE relationship = ?", (rel_key,)
+        ).fetchall())
+        resolved = set()
+        if mode == 'full':
+            resolved = set(known) - set(new_orphans)
+            db.execute("DELETE FROM ri_orphans WHERE relationship = ?", (rel_key,))
+            known = {}
+        elif known and (parent_check['new_keys'] or parent_check['previous_watermark'] is None):
+            resolved = revalidate_orphans(
+                conn, database, rel, sorted(known), parent_check['previous_watermark'],
+                has_loaded_at(rel['parent_schema'], rel['parent_table'])
+            )
+            for key in resolved:
+                known.pop(key, None)
+            db.executemany("DELETE FROM ri_orphans WHERE relationship = ? AND fk_value = ?",
+                           [(rel_key, key) for key in resolved])
+
+        # Rows at the watermark were scanned last run too, so a known key only adds the later rows
+        added = {key: rows for key, (rows, _) in new_orphans.items() if key not in known}
+        db.executemany(
+            "INSERT OR REPLACE INTO ri_orphans (relationship, fk_value, orphan_rows, first_seen) VALUES (?, ?, ?, ?)",
+            [(rel_key, key, rows, run_at) for key, rows in added.items()]
+        )
+        for key, (_, new_rows) in new_orphans.items():
+            if key in known and new_rows:
+                db.execute("UPDATE ri_orphans SET orphan_rows = orphan_rows + ? WHERE relationship = ? AND fk_value = ?",
+                           (new_rows, rel_key, key))
+        known.update(added)
+
+        full_checked_at = run_at if mode == 'full' else db.execute(
+            "SELECT full_checked_at FROM ri_relationships WHERE relationship = ?", (rel_key,)
+        ).fetchone()[0]
+        db.execute(
+            "INSERT OR REPLACE INTO ri_relationships (relationship, child_watermark, full_checked_at, checked_at) "
+            "VALUES (?, ?, ?, ?)",
+            (rel_key, new_watermark, full_checked_at, run_at)
+        )
+
+        orphan_rows = db.execute(
+            "SELECT COALESCE(SUM(orphan_rows), 0) FROM ri_orphans WHERE relationship = ?", (rel_key,)
+        ).fetchone()[0]
+        results.append({
+            'child_table': rel['child_table'],
+            'fk_column': rel['fk_column'],
+            'parent_table': rel['parent_table'],
+            'mode': mode,
+            'rows_scanned': rows_scanned,
+            'orphaned_fk': len(known),
+            'orphaned_rows': int(orphan_rows),
+            'new_orphans': len(added),
+            'resolved_orphans': len(resolved),
+        })
+
+    for key, check in parent_checks.items():
+        db.execute(
+            "INSERT OR REPLACE INTO ri_parents (parent, watermark, key_count, checked_at) VALUES (?, ?, ?, ?)",
+            (key, check['watermark'], check['key_count'], run_at)
+        )
+    db.commit()
+    return results
@@ -0,0 +1,306 @@
+"""
+Run the base model generic tests fused per model.
+
+dbt runs every column_completeness, referential_integrity and
+concept_mapping_integrity test as its own query, and because the base models
+are secure views each of those queries re-executes the view's joins to
+base_olids_patient, int_wnl_practices and the concept map. This runner reads
+the same tests from the dbt manifest, groups them by model and evaluates all
+of a model's tests from one scan of the view:
+
+- completeness: COUNT_IF(column IS NULL) against the row count
+- referential integrity and concept mapping: distinct and orphaned distinct
+  values from a LEFT JOIN to the DISTINCT parent keys (no fan-out)
+
+Each test is then reported individually with the outcome `dbt test` would give
+it (failure count, severity, warn_if/error_if):
+
+    dbt parse
+    python run_model_tests.py
+    python run_model_tests.py --select base_olids_observation base_olids_patient --jobs 4
+
+Tests of other kinds, and incremental_window tests on the stable models, are left to dbt:
+    dbt test --exclude test_name:column_completeness test_name:referential_integrity test_name:concept_mapping_integrity
+"""
+
+import argparse
+import itertools
+import operator
+import re
+import sys
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import async_queries, connection
+
+import lineage
+from check_data_completeness import DEFAULT_JOBS
+
+# Load environment variables
+load_dotenv()
+
+# Generic tests evaluated by this runner, and the parent key each checks against
+FUSED_TESTS = ('column_completeness', 'referential_integrity', 'concept_mapping_integrity')
+CONCEPT_MAP_MODEL = 'base_olids_concept_map'
+CONCEPT_MAP_KEY = 'source_code_id'
+
+# dbt warn_if / error_if conditions, e.g. "!= 0" or ">10"
+CONDITION_PATTERN = re.compile(r'^\s*(!=|==|>=|<=|>|<)\s*(\d+)\s*$')
+CONDITION_OPERATORS = {
+    '!=': operator.ne, '==': operator.eq, '>=': operator.ge,
+    '<=': operator.le, '>': operator.gt, '<': operator.lt,
+}
+
+
+def model_by_name(manifest, name):
+    """Return the manifest node of a model by name."""
+    for node in manifest['nodes'].values():
+        if node['resource_type'] == 'model' and node['name'] == name:
+            return node
+    raise KeyError(f"model not in manifest: {name}")
+
+
+def collect_tests(manifest, select=None):
+    """
+    Group the fused generic tests in the manifest by (model, where).
+
+    Returns {(model_id, where): [test, ...]} in manifest order, where each test
+    carries its unique_id, name, kind, model, column, tolerance, parent relation and key,
+    severity and warn_if/error_if conditions.
+    """
+    groups = OrderedDict()
+    for node in manifest['nodes'].values():
+        metadata = node.get('test_metadata') or {}
+        if node['resource_type'] != 'test' or metadata.get('name') not in FUSED_TESTS:
+            continue
+        if not node['config'].get('enabled', True):
+            continue
+        if metadata['kwargs'].get('incremental_window'):
+            continue  # windowed tests on the stable models depend on dbt's watermarks
+
+        model_id = node.get('attached_node')
+        model = manifest['nodes'][model_id]
+        if select and model['name'] not in select:
+            continue
+
+        kwargs = metadata['kwargs']
+        kind = metadata['name']
+        test = {
+            'unique_id': node['unique_id'],
+            'name': node['name'],
+            'kind': kind,
+            'model': model['name'],
+            'column': kwargs.get('column_name') or node['column_name'],
+            'tolerance_percent': float(kwargs.get('tolerance_percent', 1.0)),
+            'severity': str(node['config'].get('severity', 'ERROR')).upper(),
+            'warn_if': node['config'].get('warn_if', '!= 0'),
+            'error_if': node['config'].get('error_if', '!= 0'),
+        }
+        if kind == 'referential_integrity':
+            parent_name = re.search(r"ref\(\s*['\"](\w+)['\"]\s*\)", kwargs['to']).group(1)
+            test['parent'] = model_by_name(manifest, parent_name)['relation_name']
+            test['parent_key'] = kwargs.get('field', 'id')
+        elif kind == 'concept_mapping_integrity':
+            test['parent'] = model_by_name(manifest, CONCEPT_MAP_MODEL)['relation_name']
+            test['parent_key'] = CONCEPT_MAP_KEY
+
+        groups.setdefault((model_id, node['config'].get('where')), []).append(test)
+    return groups
+
+
+def build_model_query(relation, tests, where=None):
+    """
+    Build one query evaluating every test on a model from a single scan.
+
+    Returns a single row: TOTAL_ROWS plus, per test i, NULL_COUNT_i for
+    completeness or DISTINCT_i and FAILED_DISTINCT_i for key lookups.
+    """
+    columns = []
+    for test in tests:
+        if test['column'] not in columns:
+            columns.append(test['column'])
+
+    parents = OrderedDict()  # (relation, key) -> CTE name
+    for test in tests:
+        if 'parent' in test:
+            parents.setdefault((test['parent'], test['parent_key']), f"parent_{len(parents) + 1}")
+
+    measures = ["COUNT(*) AS total_rows"]
+    joins = []
+    join_aliases = {}  # (parent CTE, column) -> join alias, so repeated lookups share one join
+    for i, test in enumerate(tests, 1):
+        column = test['column']
+        if test['kind'] == 'column_completeness':
+            measures.append(f"COUNT_IF(s.{column} IS NULL) AS null_count_{i}")
+            continue
+        cte = parents[(test['parent'], test['parent_key'])]
+        alias = join_aliases.get((cte, column))
+        if alias is None:
+            alias = f"p{len(join_aliases) + 1}"
+            join_aliases[(cte, column)] = alias
+            joins.append(f"LEFT JOIN {cte} {alias} ON s.{column} = {alias}.key_value")
+        measures.append(f"COUNT(DISTINCT s.{column}) AS distinct_{i}")
+        measures.append(f"COUNT(DISTINCT CASE WHEN {alias}.key_value IS NULL THEN s.{column} END) AS failed_distinct_{i}")
+
+    where_sql = f"\n    WHERE {where}" if where else ""
+    ctes = [f"""model_scan AS (
+    SELECT {', '.join(columns)}
+    FROM {relation}{where_sql}
+)"""]
+    for (parent, key), cte in parents.items():
+        ctes.append(f"""{cte} AS (
+    SELECT DISTINCT {key} AS key_value
+    FROM {parent}
+    WHERE {key} IS NOT NULL
+)""")
+
+    cte_sql = ",\n".join(ctes)
+    measure_sql = ",\n    ".join(measures)
+    join_sql = "".join(f"\n{join}" for join in joins)
+    return f"""WITH {cte_sql}
+SELECT
+    {measure_sql}
+FROM model_scan s{join_sql}
+"""
+
+
+def condition_met(failures, condition):
+    """Evaluate a dbt warn_if / error_if condition against a failure count."""
+    match = CONDITION_PATTERN.match(str(condition))
+    if not match:
+        raise ValueError(f"unsupported test condition: {condition}")
+    return CONDITION_OPERATORS[match.group(1)](failures, int(match.group(2)))
+
+
+def evaluate_tests(tests, row):
+    """
+    Turn a model's stats row into per-test results.
+
+    Failures match what the generic test would return: the NULL rows for a
+    breached completeness test, the orphaned distinct values for a breached
+    key lookup, and 0 when the failure rate is within tolerance.
+    """
+    results = []
+    for i, test in enumerate(tests, 1):
+        if test['kind'] == 'column_completeness':
+            total = int(row['TOTAL_ROWS'])
+            failed = int(row[f'NULL_COUNT_{i}'])
+        else:
+            total = int(row[f'DISTINCT_{i}'])
+            failed = int(row[f'FAILED_DISTINCT_{i}'])
+        failure_pct = 100.0 * failed / total if total > 0 else 0.0
+        failures = failed if failure_pct > test['tolerance_percent'] else 0
+
+        if test['severity'] == 'ERROR' and condition_met(failures, test['error_if']):
+            status = 'FAIL'
+        elif condition_met(failures, test['warn_if']):
+            status = 'WARN'
+        else:
+            status = 'PASS'
+        results.append({
+            **test,
+            'status': status,
+            'failures': failures,
+            'failure_pct': failure_pct,
+        })
+    return results
+
+
+def print_results(results, elapsed):
+    """Print per-test results the way dbt test does, then a summary line."""
+    total = len(results)
+    width = max(len(r['name']) for r in results) + 2 if results else 0
+    for n, result in enumerate(results, 1):
+        label = result['status'] if result['status'] == 'PASS' else f"{result['status']} {result['failures']}"
+        print(f"  {n} of {total} {label:<8} {result['name']:.<{width}} [{result['failure_pct']:.2f}% vs {result['tolerance_percent']}%]")
+
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('PASS', 'WARN', 'FAIL')}
+    print(f"\n{'='*100}")
+    print(f"Finished running {total} tests in {elapsed:.1f}s")
+    print(f"Done. PASS={counts['PASS']} WARN={counts['WARN']} ERROR={counts['FAIL']} SKIP=0 TOTAL={total}")
+
+    failed = [r for r in results if r['status'] == 'FAIL']
+    if failed:
+        print(f"\n❌ {len(failed)} TESTS FAILED:")
+        for result in failed:
+            print(f"   - {result['model']}.{result['column']} {result['kind']}: "
+                  f"{result['failures']:,} failures, {result['failure_pct']:.2f}% > {result['tolerance_percent']}%")
+    else:
+        print("\n✓ ALL TESTS PASSED")
+    return counts
+
+
+def main():
+    """Run the fused generic tests from the dbt manifest."""
+    parser = argparse.ArgumentParser(description='Run base model generic tests fused into one query per model')
+    parser.add_argument('--manifest', type=Path, default=lineage.MANIFEST_FILE,
+                        help='dbt manifest.json (default: target/manifest.json, from `dbt parse`)')
+    parser.add_argument('--select', '-s', nargs='+', help='Only test these models (by name)')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Number of model queries to run concurrently (default: {DEFAULT_JOBS})')
+    parser.add_argument('--show-sql', action='store_true', help='Print the fused query for each model and exit')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1")
+        sys.exit(1)
+
+    try:
+        manifest = lineage.load_manifest(args.manifest)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    groups = collect_tests(manifest, set(args.select) if args.select else None)
+    if not groups:
+        print("No column_completeness, referential_integrity or concept_mapping_integrity tests selected")
+        sys.exit(0)
+
+    # Keyed like groups, so a model tested under several where clauses gets one query per clause
+    queries = OrderedDict(
+        ((model_id, where), build_model_query(manifest['nodes'][model_id]['relation_name'], tests, where))
+        for (model_id, where), tests in groups.items()
+    )
+
+    def label(key):
+        model_id, where = key
+        name = manifest['nodes'][model_id]['name']
+        return f"{name} (where {where})" if where else name
+
+    if args.show_sql:
+        for key, query in queries.items():
+            print(f"-- {label(key)}\n{query};\n")
+        return
+
+    total_tests = sum(len(tests) for tests in groups.values())
+    print(f"\n{'='*100}")
+    print("FUSED MODEL TESTS")
+    print(f"{'='*100}")
+    print(f"Running {total_tests} tests as {len(queries)} queries (one scan per model and where clause), {args.jobs} at a time")
+
+    print(f"\nConnecting to Snowflake...")
+    session = connection.get_session()
+    print("✓ Connected successfully\n")
+
+    start = time.time()
+    try:
+        completed = itertools.count(1)
+        rows = async_queries.run_queries(
+            connection.raw_connection(session), queries, args.jobs,
+            on_complete=lambda key, query_id, result: print(f"  Tested model {next(completed)}/{len(queries)}: {label(key)}"))
+    finally:
+        session.close()
+
+    results = []
+    for key, tests in groups.items():
+        results.extend(evaluate_tests(tests, rows[key][0]))
+
+    print(f"\n{'='*100}")
+    counts = print_results(results, time.time() - start)
+    sys.exit(1 if counts['FAIL'] else 0)
+
+
+if __name__ == "__main__":
+    main()
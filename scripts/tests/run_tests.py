@@ -9,53 +9,42 @@ Usage:
     python run_tests.py
     python run_tests.py --test test_data_freshness.sql
     python run_tests.py --verbose
+    python run_tests.py --jobs 4
+    python run_tests.py --refresh     # re-run everything and update the cache
+    python run_tests.py --no-cache    # ignore the cache entirely
+    python run_tests.py --profile     # rank tests by cost and flag regressions
+    python run_tests.py --backend duckdb --data ./fixtures   # offline, against Parquet
+    python run_tests.py --changed-since origin/main   # only tests touching changed lineage
 """
 
-import os
 import sys
 import argparse
 import json
+import subprocess
+import time
 from pathlib import Path
 from datetime import datetime
+from functools import partial
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Try to import snowflake connector
-try:
-    from snowflake.snowpark import Session
-    USE_SNOWPARK = True
-except ImportError:
-    try:
-        import snowflake.connector
-        USE_SNOWPARK = False
-    except ImportError:
-        print("ERROR: Neither snowflake-snowpark-python nor snowflake-connector-python installed")
-        sys.exit(1)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+import duckdb_backend
+import lineage
+import result_cache
+from common import async_queries, connection, fetch
+import telemetry
+from sql_splitter import join_statements, split_statements
 
-# Configuration from environment
-WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-USER = os.getenv('SNOWFLAKE_USER')
-ROLE = os.getenv('SNOWFLAKE_ROLE')
+# Load environment variables
+load_dotenv()
 
+# Rows kept per test; anything beyond is counted and dropped so a test that
+# returns a huge result set cannot exhaust memory
+MAX_RESULT_ROWS = 10_000
 
-def get_connection():
-    """Create Snowflake connection using SSO."""
-    connection_params = {
-        "account": ACCOUNT,
-        "user": USER,
-        "authenticator": "externalbrowser",
-        "warehouse": WAREHOUSE,
-        "role": ROLE
-    }
-    
-    if USE_SNOWPARK:
-        return Session.builder.configs(connection_params).create()
-    else:
-        return snowflake.connector.connect(**connection_params)
+# JSON and JUnit XML reports are written here
+REPORT_DIR = Path(__file__).parent / 'output'
 
 
 def discover_tests(test_dir: Path, specific_test: str = None) -> list:
@@ -72,30 +61,156 @@ def discover_tests(test_dir: Path, specific_test: str = None) -> list:
     return tests
 
 
-def execute_test(conn, sql_file: Path) -> list:
-    """Execute a test SQL file and return results."""
-    sql = sql_file.read_text(encoding='utf-8')
-    
-    if USE_SNOWPARK:
-        # Snowpark returns a DataFrame
-        df = conn.sql(sql).to_pandas()
-        return df.to_dict('records')
-    else:
-        # Connector returns cursor
-        cursor = conn.cursor()
-        try:
-            # Execute multi-statement SQL
-            for statement in sql.split(';'):
-                statement = statement.strip()
-                if statement and not statement.startswith('--'):
-                    cursor.execute(statement)
-            
-            # Fetch results from last query
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
-        finally:
-            cursor.close()
+def execute_statements(cursor, statements: list):
+    """
+    Execute statements on a cursor in a single round trip.
+
+    Multiple statements are sent as one multi-statement request and the cursor
+    is advanced to the last result set, which is the only one tests return.
+    """
+    if len(statements) == 1:
+        cursor.execute(statements[0])
+        return
+    cursor.execute(join_statements(statements), num_statements=len(statements))
+    while cursor.nextset():
+        pass
+
+
+def fetch_results(cursor, max_rows: int = MAX_RESULT_ROWS) -> list:
+    """Stream the cursor's current result set into a list of at most max_rows dicts."""
+    results, total_rows = fetch.fetch_records(fetch.stream_cursor(cursor), max_rows)
+    if total_rows > len(results):
+        print(f"  → WARNING: Result truncated to {len(results):,} of {total_rows:,} rows")
+    return results
+
+
+def run_query(conn, sql: str) -> list:
+    """Run a single statement and return its rows as dicts."""
+    cursor = connection.raw_connection(conn).cursor()
+    try:
+        cursor.execute(sql)
+        return fetch_results(cursor)
+    finally:
+        cursor.close()
+
+
+def execute_test(conn, sql_file: Path) -> tuple:
+    """Execute a test SQL file and return (results, query_id) for its final statement."""
+    statements = split_statements(sql_file.read_text(encoding='utf-8'))
+    if not statements:
+        raise ValueError("No SQL statements found")
+
+    # Snowpark sessions wrap a connector connection, so both use the same path
+    cursor = connection.raw_connection(conn).cursor()
+    try:
+        execute_statements(cursor, statements)
+        return fetch_results(cursor), cursor.sfqid
+    finally:
+        cursor.close()
+
+
+def submit_test(raw_conn, sql_file: Path) -> str:
+    """
+    Run a test's setup statements and submit its final query asynchronously.
+
+    Setup statements (USE, SET) run synchronously in one round trip so that
+    session variables are bound when the final query is compiled; only the
+    final query runs in the background. Returns the Snowflake query ID to poll.
+    """
+    statements = split_statements(sql_file.read_text(encoding='utf-8'))
+    if not statements:
+        raise ValueError("No SQL statements found")
+
+    cursor = raw_conn.cursor()
+    try:
+        if len(statements) > 1:
+            execute_statements(cursor, statements[:-1])
+        cursor.execute_async(statements[-1])
+        return cursor.sfqid
+    finally:
+        cursor.close()
+
+
+def fetch_async_results(raw_conn, query_id: str) -> list:
+    """Fetch the result set of a completed asynchronous query."""
+    cursor = raw_conn.cursor()
+    try:
+        cursor.get_results_from_sfqid(query_id)
+        return fetch_results(cursor)
+    finally:
+        cursor.close()
+
+
+def run_tests_concurrently(conn, tests: list, jobs: int, test_telemetry: dict) -> dict:
+    """
+    Execute tests with up to `jobs` queries in flight at once.
+
+    Each test is submitted on its own cursor and polled until complete, so the
+    total run time approaches that of the slowest test rather than the sum.
+    Returns results keyed by test file name, in discovery order, and records
+    per-test telemetry (wall-clock is measured from submission) in test_telemetry.
+    A failed test returns no results; the rest keep running.
+    """
+    started = {}  # test name -> submission time
+
+    def submit(raw_conn, test_file):
+        print(f"\nSubmitting: {test_file.name}...")
+        started[test_file.name] = time.perf_counter()
+        return submit_test(raw_conn, test_file)
+
+    def on_submit(name, query_id):
+        print(f"  → Query ID: {query_id}")
+
+    def on_complete(name, query_id, results):
+        test_telemetry[name] = telemetry.new_test_telemetry(
+            query_id, time.perf_counter() - started[name], len(results))
+        print(f"\nCompleted: {name}")
+        print(f"  → {len(results)} checks completed")
+
+    def on_error(name, query_id, error):
+        if query_id is not None:
+            print(f"\nFailed: {name}")
+        print(f"  → ERROR: {error}")
+        test_telemetry[name] = telemetry.new_test_telemetry(
+            query_id, time.perf_counter() - started[name], error=str(error))
+        return []
+
+    return async_queries.run_queries(
+        connection.raw_connection(conn), {t.name: t for t in tests}, jobs,
+        submit=submit, collect=fetch_async_results,
+        on_submit=on_submit, on_complete=on_complete, on_error=on_error)
+
+
+def select_affected_tests(manifest_file: Path, changed_since: str, tests: list, run_query=None) -> tuple:
+    """
+    Narrow the SQL tests to those touching changed lineage and pick the matching dbt tests.
+
+    Returns (sql_tests, dbt_test_names, dbt_selector).
+    """
+    manifest = lineage.load_manifest(manifest_file)
+    changed, changed_files = lineage.resolve_changes(manifest, changed_since, run_query)
+    affected = lineage.downstream(manifest, changed)
+    tables = lineage.affected_tables(manifest, affected)
+
+    selected = lineage.select_sql_tests(tests, tables, changed_files)
+    dbt_tests = lineage.select_dbt_tests(manifest, affected)
+    selector = lineage.dbt_selector(manifest, affected, changed) if dbt_tests else []
+
+    print(f"  → {len(changed)} changed node(s), {len(affected)} including downstream")
+    for unique_id in sorted(changed):
+        print(f"    • {unique_id}")
+    print(f"  → SQL tests: {len(selected)} of {len(tests)}")
+    for test_file in selected:
+        print(f"    • {test_file.name}")
+    print(f"  → dbt generic tests: {len(dbt_tests)} of {lineage.count_dbt_tests(manifest)}")
+    return selected, dbt_tests, selector
+
+
+def run_dbt_tests(selector: list) -> bool:
+    """Run dbt tests for the selected nodes from the project root. Returns True if they all passed."""
+    print("\nRunning affected dbt generic tests...")
+    result = subprocess.run(['dbt', 'test', '--select', *selector], cwd=lineage.REPO_ROOT)
+    return result.returncode == 0
 
 
 def print_results(all_results: dict, verbose: bool = False):
@@ -183,11 +298,45 @@ def main():
     parser = argparse.ArgumentParser(description='Run OLIDS data quality tests')
     parser.add_argument('--test', '-t', help='Run specific test file only')
     parser.add_argument('--verbose', '-v', action='store_true', help='Show detailed output')
+    parser.add_argument('--backend', choices=['snowflake', 'duckdb'], default='snowflake',
+                        help='Execution backend (default: snowflake)')
+    parser.add_argument('--data', type=Path,
+                        help='Parquet fixture directory for the duckdb backend')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of tests to run concurrently (default: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the local result cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-run all tests and overwrite their cached results')
+    parser.add_argument('--report-dir', type=Path, default=REPORT_DIR,
+                        help=f'Directory for JSON and JUnit XML reports (default: {REPORT_DIR})')
+    parser.add_argument('--profile', action='store_true',
+                        help='Rank tests by cost and flag runtime regressions')
+    parser.add_argument('--regression-threshold', type=float, default=50.0,
+                        help='Flag tests slower than their rolling median by more than this %% (default: 50)')
+    parser.add_argument('--history-window', type=int, default=10,
+                        help='Number of previous runs in the rolling median (default: 10)')
+    parser.add_argument('--changed-since', metavar='REF|STATE_DIR|TIMESTAMP',
+                        help='Only run tests touching sources/models changed since a git ref, '
+                             'a dbt state directory, or (Snowflake only) a LAST_ALTERED timestamp')
+    parser.add_argument('--manifest', type=Path, default=lineage.MANIFEST_FILE,
+                        help=f'dbt manifest used for lineage (default: {lineage.MANIFEST_FILE})')
+    parser.add_argument('--run-dbt-tests', action='store_true',
+                        help='With --changed-since, also run the selected dbt generic tests')
     args = parser.parse_args()
     
     # Find tests
     test_dir = Path(__file__).parent
     tests = discover_tests(test_dir, args.test)
+
+    if args.jobs < 1:
+        print("ERROR: --jobs must be at least 1")
+        sys.exit(1)
+
+    local = args.backend == 'duckdb'
+    if local and not args.data:
+        print("ERROR: --data is required with --backend duckdb")
+        sys.exit(1)
     
     if not tests:
         print("No test files found (test_*.sql)")
@@ -197,36 +346,138 @@ def main():
     for t in tests:
         print(f"  - {t.name}")
     
-    # Connect to Snowflake
-    print("\nConnecting to Snowflake...")
+    # Connect to Snowflake, or load local fixtures
+    if local:
+        print(f"\nLoading DuckDB fixtures from {args.data}...")
+    else:
+        print("\nConnecting to Snowflake...")
     try:
-        conn = get_connection()
+        if local:
+            connection.register_engine('duckdb', lambda **_: duckdb_backend.connect(args.data))
+        conn = connection.get_session(engine='duckdb' if local else None)
         print("✓ Connected successfully")
     except Exception as e:
         print(f"ERROR: Failed to connect: {e}")
         sys.exit(1)
+
+    dbt_tests, dbt_selector = [], []
+    if args.changed_since:
+        print(f"\nSelecting tests affected by changes since {args.changed_since}...")
+        try:
+            tests, dbt_tests, dbt_selector = select_affected_tests(
+                args.manifest, args.changed_since, tests, None if local else lambda q: run_query(conn, q))
+        except Exception as e:
+            print(f"ERROR: Could not work out affected tests: {e}")
+            conn.close()
+            sys.exit(1)
+
+        if not args.run_dbt_tests and dbt_tests:
+            print(f"    (run them with --run-dbt-tests, or: dbt test --select {' '.join(dbt_selector)})")
+        if not tests:
+            conn.close()
+            print("\nNo SQL tests touch the changed lineage")
+            sys.exit(0 if not args.run_dbt_tests or not dbt_tests or run_dbt_tests(dbt_selector) else 1)
+
+    run_test = partial(duckdb_backend.execute_test, max_rows=MAX_RESULT_ROWS) if local else execute_test
+    if local:
+        # Local runs are cheap and fixtures have no LAST_ALTERED to key on
+        args.no_cache = True
+        if args.jobs > 1:
+            print("Note: --jobs is ignored by the duckdb backend (DuckDB parallelises each query)")
+            args.jobs = 1
     
     # Execute tests
+    run_at = datetime.now().isoformat(timespec='seconds')
     all_results = {}
+    test_telemetry = {}
+    cache_db = None
+    cache_keys = {}
     try:
-        for test_file in tests:
-            print(f"\nExecuting: {test_file.name}...")
+        if not args.no_cache:
+            print("\nChecking result cache...")
             try:
-                results = execute_test(conn, test_file)
-                all_results[test_file.name] = results
-                print(f"  → {len(results)} checks completed")
+                cache_db = result_cache.open_cache()
+                cache_keys = result_cache.compute_cache_keys(lambda q: run_query(conn, q), tests)
             except Exception as e:
-                print(f"  → ERROR: {e}")
-                all_results[test_file.name] = []
-    finally:
-        if USE_SNOWPARK:
-            conn.close()
+                print(f"  → WARNING: Cache unavailable, running all tests: {e}")
+                cache_db = None
+
+            if cache_db and not args.refresh:
+                for test_file in tests:
+                    key = cache_keys.get(test_file.name)
+                    cached = result_cache.get_cached_results(cache_db, test_file.name, key) if key else None
+                    if cached is not None:
+                        all_results[test_file.name] = cached
+                        test_telemetry[test_file.name] = telemetry.new_test_telemetry(
+                            rows_returned=len(cached), cached=True)
+                        print(f"  ✓ {test_file.name}: {len(cached)} cached checks (source tables unchanged)")
+
+        to_run = [t for t in tests if t.name not in all_results]
+        if not to_run:
+            print("\nAll results served from cache")
+        elif args.jobs > 1:
+            print(f"\nRunning up to {args.jobs} tests concurrently")
+            all_results.update(run_tests_concurrently(conn, to_run, args.jobs, test_telemetry))
         else:
-            conn.close()
+            for test_file in to_run:
+                print(f"\nExecuting: {test_file.name}...")
+                started = time.perf_counter()
+                try:
+                    results, query_id = run_test(conn, test_file)
+                    all_results[test_file.name] = results
+                    test_telemetry[test_file.name] = telemetry.new_test_telemetry(
+                        query_id, time.perf_counter() - started, len(results))
+                    print(f"  → {len(results)} checks completed")
+                except Exception as e:
+                    print(f"  → ERROR: {e}")
+                    all_results[test_file.name] = []
+                    test_telemetry[test_file.name] = telemetry.new_test_telemetry(
+                        elapsed_seconds=time.perf_counter() - started, error=str(e))
+
+        # Warehouse metrics for the queries run in this session
+        if to_run and not local:
+            telemetry.attach_query_metrics(lambda q: run_query(conn, q), test_telemetry)
+
+        # Cache fresh results (empty results indicate an error and are never cached)
+        if cache_db:
+            for test_file in to_run:
+                key = cache_keys.get(test_file.name)
+                if key and all_results[test_file.name]:
+                    result_cache.store_results(cache_db, test_file.name, key, all_results[test_file.name])
+    finally:
+        if cache_db:
+            cache_db.close()
+        conn.close()
         print("\nConnection closed")
+
+    all_results = {t.name: all_results[t.name] for t in tests}
+    test_telemetry = {t.name: test_telemetry[t.name] for t in tests}
+
+    # Reports and run history
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    json_file = telemetry.write_json_report(
+        args.report_dir / f"test_results_{timestamp}.json", run_at, all_results, test_telemetry)
+    junit_file = telemetry.write_junit_report(
+        args.report_dir / f"test_results_{timestamp}.xml", run_at, all_results, test_telemetry)
+    print(f"\nReports written:\n  • {json_file}\n  • {junit_file}")
+
+    # Keep local timings separate so they never skew warehouse medians
+    history_db = telemetry.open_history(
+        telemetry.HISTORY_FILE.with_name('history_duckdb.sqlite') if local else telemetry.HISTORY_FILE)
+    try:
+        medians = telemetry.get_rolling_medians(history_db, list(test_telemetry), args.history_window)
+        telemetry.record_run(history_db, run_at, test_telemetry)
+    finally:
+        history_db.close()
+
+    if args.profile:
+        telemetry.print_profile(test_telemetry, medians, args.regression_threshold)
     
     # Print results
     all_passed = print_results(all_results, verbose=args.verbose)
+
+    if args.run_dbt_tests and dbt_tests:
+        all_passed = run_dbt_tests(dbt_selector) and all_passed
     
     # Exit code
     sys.exit(0 if all_passed else 1)
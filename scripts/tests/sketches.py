@@ -0,0 +1,121 @@
+"""
+Pure-Python probabilistic sketches for approximate data quality checks.
+
+Used by check_referential_integrity.py --approx on the duckdb backend, where
+there is no APPROX_COUNT_DISTINCT/HLL state to lean on, and by the estimators
+shared with the Snowflake path:
+
+- HyperLogLog: distinct counts in fixed memory (2^precision bytes), relative
+  standard error 1.04 / sqrt(2^precision), about 0.8% at precision 14
+- Bloom filter: set membership with no false negatives and a configurable
+  false positive rate
+- Hash sampling: deterministic value-level sampling, so the same key is in or
+  out of the sample on both sides of a join
+- Wilson score interval: confidence interval for a sampled proportion
+
+Sketches are plain bytearrays/dicts so they can be merged or pickled freely.
+"""
+
+import hashlib
+import math
+
+HASH_SPACE = 1 << 64
+
+
+def hash64(value) -> int:
+    """Stable 64-bit hash of a value's string form (same result across runs and processes)."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def in_sample(value, sample_fraction: float) -> bool:
+    """Whether a value falls in the hash sample. Deterministic for a given value."""
+    return hash64(value) < sample_fraction * HASH_SPACE
+
+
+# HyperLogLog
+
+def hll_new(precision: int = 14) -> bytearray:
+    """An empty HyperLogLog sketch with 2^precision registers."""
+    if not 4 <= precision <= 18:
+        raise ValueError("HyperLogLog precision must be between 4 and 18")
+    return bytearray(1 << precision)
+
+
+def _hll_precision(registers: bytearray) -> int:
+    return len(registers).bit_length() - 1
+
+
+def hll_add(registers: bytearray, value):
+    """Add a value to the sketch."""
+    precision = _hll_precision(registers)
+    hashed = hash64(value)
+    index = hashed >> (64 - precision)
+    remaining = hashed & ((1 << (64 - precision)) - 1)
+    rank = (64 - precision) - remaining.bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def hll_merge(registers: bytearray, other: bytearray) -> bytearray:
+    """Union of two sketches of the same precision."""
+    if len(registers) != len(other):
+        raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+    return bytearray(max(a, b) for a, b in zip(registers, other))
+
+
+def hll_estimate(registers: bytearray) -> float:
+    """Estimated number of distinct values added."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        # Small-range correction (linear counting)
+        estimate = m * math.log(m / zeros)
+    return estimate
+
+
+def hll_relative_error(precision: int = 14) -> float:
+    """Relative standard error of a HyperLogLog estimate."""
+    return 1.04 / math.sqrt(1 << precision)
+
+
+# Bloom filter
+
+def bloom_new(capacity: int, error_rate: float = 0.001) -> dict:
+    """An empty Bloom filter sized for `capacity` values at the given false positive rate."""
+    capacity = max(capacity, 1)
+    size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+    hashes = max(1, round(size / capacity * math.log(2)))
+    return {'bits': bytearray((size + 7) // 8), 'size': size, 'hashes': hashes, 'error_rate': error_rate}
+
+
+def _bloom_positions(bloom: dict, value):
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=16).digest()
+    first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+    for i in range(bloom['hashes']):
+        yield (first + i * second) % bloom['size']
+
+
+def bloom_add(bloom: dict, value):
+    """Add a value to the filter."""
+    for position in _bloom_positions(bloom, value):
+        bloom['bits'][position >> 3] |= 1 << (position & 7)
+
+
+def bloom_contains(bloom: dict, value) -> bool:
+    """False means definitely absent; True means present up to the false positive rate."""
+    return all(bloom['bits'][position >> 3] & (1 << (position & 7)) for position in _bloom_positions(bloom, value))
+
+
+# Interval estimates
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> tuple:
+    """Wilson score interval (low, high) for a proportion; (0, 1) when there are no trials."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
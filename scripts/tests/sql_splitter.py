@@ -0,0 +1,152 @@
+"""
+Tokenizer-aware SQL statement splitter.
+
+Splits a Snowflake SQL script on semicolons that are outside of:
+- Line comments (-- and //)
+- Block comments (/* ... */)
+- Single-quoted string literals ('it''s', 'a\\'b')
+- Double-quoted identifiers ("NCL_Data_Store_OLIDS_Alpha")
+- Dollar-quoted blocks ($$ ... $$), as used by EXECUTE IMMEDIATE
+
+Fragments that contain only whitespace and comments are dropped.
+
+The same tokenizer backs mask_literals(), which lets dialect rewrites operate
+on SQL code without touching the contents of strings or comments.
+"""
+
+LITERAL_PLACEHOLDER = '\x00{}\x00'
+
+
+def _skip_line_comment(sql: str, i: int) -> int:
+    """Return the index just past the end of a line comment starting at i."""
+    end = sql.find('\n', i)
+    return len(sql) if end == -1 else end + 1
+
+
+def _skip_block_comment(sql: str, i: int) -> int:
+    """Return the index just past the end of a block comment starting at i."""
+    end = sql.find('*/', i + 2)
+    return len(sql) if end == -1 else end + 2
+
+
+def _skip_quoted(sql: str, i: int, quote: str) -> int:
+    """Return the index just past a quoted literal/identifier starting at i."""
+    j = i + 1
+    while j < len(sql):
+        char = sql[j]
+        if char == '\\' and quote == "'":
+            j += 2
+            continue
+        if char == quote:
+            # Doubled quote is an escaped quote, not the terminator
+            if j + 1 < len(sql) and sql[j + 1] == quote:
+                j += 2
+                continue
+            return j + 1
+        j += 1
+    return len(sql)
+
+
+def _skip_dollar_block(sql: str, i: int) -> int:
+    """Return the index just past a $$ ... $$ block starting at i."""
+    end = sql.find('$$', i + 2)
+    return len(sql) if end == -1 else end + 2
+
+
+def tokenize(sql: str):
+    """
+    Yield (kind, text) tokens covering the whole script.
+
+    Kinds: 'comment', 'string', 'identifier', 'dollar', 'semicolon', 'code'.
+    'code' tokens are runs of anything else (keywords, operators, whitespace).
+    """
+    i = 0
+    code_start = 0
+
+    while i < len(sql):
+        char = sql[i]
+        pair = sql[i:i + 2]
+
+        if pair in ('--', '//'):
+            kind, end = 'comment', _skip_line_comment(sql, i)
+        elif pair == '/*':
+            kind, end = 'comment', _skip_block_comment(sql, i)
+        elif char == "'":
+            kind, end = 'string', _skip_quoted(sql, i, char)
+        elif char == '"':
+            kind, end = 'identifier', _skip_quoted(sql, i, char)
+        elif pair == '$$':
+            kind, end = 'dollar', _skip_dollar_block(sql, i)
+        elif char == ';':
+            kind, end = 'semicolon', i + 1
+        else:
+            i += 1
+            continue
+
+        if code_start < i:
+            yield 'code', sql[code_start:i]
+        yield kind, sql[i:end]
+        i = code_start = end
+
+    if code_start < len(sql):
+        yield 'code', sql[code_start:]
+
+
+def split_statements(sql: str) -> list:
+    """Split a SQL script into executable statements."""
+    statements = []
+    current = []
+    has_code = False  # Whether the current fragment contains anything but comments
+
+    for kind, text in tokenize(sql):
+        if kind == 'semicolon':
+            if has_code:
+                statements.append(''.join(current).strip())
+            current = []
+            has_code = False
+            continue
+        current.append(text)
+        if kind != 'comment' and text.strip():
+            has_code = True
+
+    if has_code:
+        statements.append(''.join(current).strip())
+
+    return statements
+
+
+def join_statements(statements: list) -> str:
+    """
+    Join statements into one multi-statement script.
+
+    Each separator goes on its own line so a statement ending in a line
+    comment cannot comment out the semicolon that follows it.
+    """
+    return '\n;\n'.join(statements)
+
+
+def mask_literals(sql: str) -> tuple:
+    """
+    Replace string literals and $$ blocks with placeholders and drop comments.
+
+    Returns (masked_sql, literals); pass both to unmask_literals() to restore.
+    Quoted identifiers are left in place.
+    """
+    masked = []
+    literals = []
+    for kind, text in tokenize(sql):
+        if kind == 'comment':
+            masked.append('\n' if text.endswith('\n') else ' ')
+        elif kind in ('string', 'dollar'):
+            masked.append(LITERAL_PLACEHOLDER.format(len(literals)))
+            literals.append(text)
+        else:
+            masked.append(text)
+    return ''.join(masked), literals
+
+
+def unmask_literals(masked_sql: str, literals: list) -> str:
+    """Restore literals replaced by mask_literals()."""
+    for index, literal in enumerate(literals):
+        masked_sql = masked_sql.replace(LITERAL_PLACEHOLDER.format(index), literal, 1)
+    return masked_sql
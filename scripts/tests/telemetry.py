@@ -0,0 +1,259 @@
+"""
+Per-test performance telemetry for run_tests.py.
+
+Collects query ID, wall-clock time, rows returned, bytes scanned and partition
+pruning for each test, writes JSON and JUnit XML reports, and appends every
+run to a local SQLite history so runtime regressions can be spotted against a
+rolling median.
+
+Warehouse metrics come from INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION. When
+that is unavailable (e.g. a local backend) the metrics are left empty.
+"""
+
+import json
+import sqlite3
+import statistics
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+HISTORY_FILE = Path(__file__).parent / '.cache' / 'history.sqlite'
+
+# Any database the role can see works; the table function is session-scoped
+QUERY_HISTORY_DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
+
+METRIC_FIELDS = ['bytes_scanned', 'partitions_scanned', 'partitions_total', 'warehouse_size']
+
+
+def new_test_telemetry(query_id=None, elapsed_seconds=0.0, rows_returned=0, cached=False, error=None) -> dict:
+    """Create a telemetry record for one test execution."""
+    record = {
+        'query_id': query_id,
+        'elapsed_seconds': round(elapsed_seconds, 3),
+        'rows_returned': rows_returned,
+        'cached': cached,
+        'error': error,
+    }
+    record.update({field: None for field in METRIC_FIELDS})
+    return record
+
+
+def fetch_query_metrics(run_query, query_ids: list) -> dict:
+    """
+    Look up warehouse metrics for this session's queries.
+
+    `run_query` takes a SQL string and returns a list of dicts.
+    Returns {query_id: {bytes_scanned, partitions_scanned, partitions_total, warehouse_size}}.
+    """
+    if not query_ids:
+        return {}
+
+    in_list = ", ".join(f"'{qid}'" for qid in query_ids)
+    query = f"""
+    SELECT query_id, bytes_scanned, partitions_scanned, partitions_total, warehouse_size
+    FROM TABLE({QUERY_HISTORY_DATABASE}.INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 10000))
+    WHERE query_id IN ({in_list})
+    """
+    return {
+        row['QUERY_ID']: {field: row[field.upper()] for field in METRIC_FIELDS}
+        for row in run_query(query)
+    }
+
+
+def attach_query_metrics(run_query, telemetry: dict):
+    """Merge warehouse metrics into telemetry records in place (best effort)."""
+    query_ids = [t['query_id'] for t in telemetry.values() if t['query_id']]
+    try:
+        metrics = fetch_query_metrics(run_query, query_ids)
+    except Exception as e:
+        print(f"  → WARNING: Query history unavailable, warehouse metrics omitted: {e}")
+        return
+
+    for record in telemetry.values():
+        record.update(metrics.get(record['query_id'], {}))
+
+
+def summarise_statuses(results: list) -> dict:
+    """Count PASS/FAIL/WARN rows for a test."""
+    return {
+        status.lower(): sum(1 for r in results if r.get('STATUS') == status)
+        for status in ('PASS', 'FAIL', 'WARN')
+    }
+
+
+def write_json_report(path: Path, run_at: str, all_results: dict, telemetry: dict) -> Path:
+    """Write results and telemetry as a single JSON document."""
+    report = {
+        'run_at': run_at,
+        'tests': [
+            {
+                'test_name': test_name,
+                **summarise_statuses(results),
+                **telemetry.get(test_name, {}),
+                'results': results,
+            }
+            for test_name, results in all_results.items()
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+    return path
+
+
+def write_junit_report(path: Path, run_at: str, all_results: dict, telemetry: dict) -> Path:
+    """Write results as JUnit XML: one testsuite per SQL file, one testcase per check."""
+    suites = ET.Element('testsuites', name='olids_data_quality', timestamp=run_at)
+
+    for test_name, results in all_results.items():
+        record = telemetry.get(test_name, {})
+        counts = summarise_statuses(results)
+        suite = ET.SubElement(
+            suites, 'testsuite',
+            name=test_name,
+            tests=str(max(len(results), 1)),
+            failures=str(counts['fail']),
+            errors='0' if results else '1',
+            time=str(record.get('elapsed_seconds', 0)),
+        )
+
+        if not results:
+            case = ET.SubElement(suite, 'testcase', classname=test_name, name=test_name)
+            ET.SubElement(case, 'error', message=record.get('error') or 'No results returned')
+            continue
+
+        for r in results:
+            case = ET.SubElement(
+                suite, 'testcase',
+                classname=test_name,
+                name=f"{r.get('TABLE_NAME', 'N/A')}.{r.get('TEST_SUBJECT', 'N/A')}",
+            )
+            if r.get('STATUS') == 'FAIL':
+                ET.SubElement(
+                    case, 'failure',
+                    message=f"{r.get('METRIC_VALUE', 'N/A')}% (threshold: {r.get('THRESHOLD', 'N/A')}%)",
+                ).text = str(r.get('DETAILS', ''))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(suites).write(path, encoding='utf-8', xml_declaration=True)
+    return path
+
+
+def open_history(history_file: Path = HISTORY_FILE) -> sqlite3.Connection:
+    """Open (creating if needed) the local run history store."""
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(history_file)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS test_runs (
+            run_at TEXT NOT NULL,
+            test_name TEXT NOT NULL,
+            query_id TEXT,
+            elapsed_seconds REAL,
+            rows_returned INTEGER,
+            bytes_scanned INTEGER,
+            partitions_scanned INTEGER,
+            partitions_total INTEGER,
+            warehouse_size TEXT,
+            cached INTEGER NOT NULL,
+            error TEXT
+        )
+    """)
+    db.commit()
+    return db
+
+
+def get_rolling_medians(db: sqlite3.Connection, test_names: list, window: int) -> dict:
+    """Return the median runtime of each test's last `window` executed (non-cached) runs."""
+    medians = {}
+    for test_name in test_names:
+        rows = db.execute(
+            """
+            SELECT elapsed_seconds FROM test_runs
+            WHERE test_name = ? AND cached = 0 AND error IS NULL
+            ORDER BY run_at DESC
+            LIMIT ?
+            """,
+            (test_name, window)
+        ).fetchall()
+        if rows:
+            medians[test_name] = statistics.median(r[0] for r in rows)
+    return medians
+
+
+def record_run(db: sqlite3.Connection, run_at: str, telemetry: dict):
+    """Append this run's telemetry to the history store."""
+    db.executemany(
+        """
+        INSERT INTO test_runs (
+            run_at, test_name, query_id, elapsed_seconds, rows_returned,
+            bytes_scanned, partitions_scanned, partitions_total, warehouse_size, cached, error
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                run_at, test_name, t['query_id'], t['elapsed_seconds'], t['rows_returned'],
+                t['bytes_scanned'], t['partitions_scanned'], t['partitions_total'],
+                t['warehouse_size'], int(t['cached']), t['error'],
+            )
+            for test_name, t in telemetry.items()
+        ]
+    )
+    db.commit()
+
+
+def find_regressions(telemetry: dict, medians: dict, threshold_pct: float) -> dict:
+    """Return {test_name: growth_pct} for tests slower than their median by more than threshold_pct."""
+    regressions = {}
+    for test_name, t in telemetry.items():
+        median = medians.get(test_name)
+        if t['cached'] or t['error'] or not median:
+            continue
+        growth_pct = 100.0 * (t['elapsed_seconds'] - median) / median
+        if growth_pct > threshold_pct:
+            regressions[test_name] = growth_pct
+    return regressions
+
+
+def format_bytes(value) -> str:
+    """Human-readable byte count."""
+    if value is None:
+        return 'N/A'
+    size = float(value)
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def print_profile(telemetry: dict, medians: dict, threshold_pct: float):
+    """Print tests ranked by cost and flag runtime regressions."""
+    regressions = find_regressions(telemetry, medians, threshold_pct)
+
+    # Rank by bytes scanned, falling back to wall-clock time when metrics are missing
+    ranked = sorted(
+        telemetry.items(),
+        key=lambda item: (item[1]['bytes_scanned'] or 0, item[1]['elapsed_seconds']),
+        reverse=True
+    )
+
+    print("\n" + "=" * 80)
+    print("TEST PROFILE (most expensive first)")
+    print("=" * 80)
+    for rank, (test_name, t) in enumerate(ranked, 1):
+        flag = "🐢 " if test_name in regressions else ""
+        print(f"\n{rank}. {flag}{test_name}" + (" (cached)" if t['cached'] else ""))
+        print(f"   Wall-clock: {t['elapsed_seconds']:.2f}s | Rows: {t['rows_returned']:,}"
+              f" | Scanned: {format_bytes(t['bytes_scanned'])}")
+        if t['partitions_total']:
+            pruned = t['partitions_total'] - (t['partitions_scanned'] or 0)
+            print(f"   Partitions: {t['partitions_scanned']:,}/{t['partitions_total']:,} scanned"
+                  f" ({100.0 * pruned / t['partitions_total']:.1f}% pruned)")
+        if test_name in medians:
+            print(f"   Rolling median: {medians[test_name]:.2f}s")
+        if t['query_id']:
+            print(f"   Query ID: {t['query_id']}")
+
+    if regressions:
+        print(f"\n⚠️  RUNTIME REGRESSIONS (> {threshold_pct:.0f}% above rolling median):")
+        for test_name, growth_pct in sorted(regressions.items(), key=lambda item: -item[1]):
+            print(f"   - {test_name}: +{growth_pct:.1f}%")
+    else:
+        print(f"\n✓ No runtime regressions above {threshold_pct:.0f}%")
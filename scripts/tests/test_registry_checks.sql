@@ -0,0 +1,1720 @@
+/*
+    Test: Registry Checks
+
+    GENERATED from scripts/common/checks.yml by scripts/tests/compile_checks.py - do not edit.
+    Regenerate with: python scripts/tests/compile_checks.py sql --write
+
+    217 checks from 28 table scans: every completeness, referential integrity
+    and concept mapping check on a table reads from that table's single scan CTE.
+*/
+
+WITH scan_patient AS (
+    SELECT
+        id,
+        sk_patient_id,
+        birth_year,
+        birth_month,
+        gender_concept_id,
+        lds_start_date_time,
+        registered_practice_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_MASKED.PATIENT
+),
+
+keys_patient_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_patient
+    WHERE id IS NOT NULL
+),
+
+scan_episode_of_care AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        organisation_id_publisher,
+        organisation_id_managing,
+        care_manager_practitioner_id,
+        episode_of_care_start_date,
+        lds_start_date_time,
+        episode_type_source_concept_id,
+        episode_status_source_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.EPISODE_OF_CARE
+),
+
+keys_episode_of_care_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_episode_of_care
+    WHERE id IS NOT NULL
+),
+
+scan_observation AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        encounter_id,
+        practitioner_id,
+        parent_observation_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        observation_source_concept_id,
+        result_value_units_concept_id,
+        date_precision_concept_id,
+        episodicity_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.OBSERVATION
+),
+
+keys_observation_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_observation
+    WHERE id IS NOT NULL
+),
+
+scan_medication_statement AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        organisation_id,
+        encounter_id,
+        practitioner_id,
+        observation_id,
+        allergy_intolerance_id,
+        diagnostic_order_id,
+        referral_request_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        medication_statement_source_concept_id,
+        authorisation_type_concept_id,
+        date_precision_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.MEDICATION_STATEMENT
+),
+
+keys_medication_statement_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_medication_statement
+    WHERE id IS NOT NULL
+),
+
+scan_medication_order AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        organisation_id,
+        medication_statement_id,
+        encounter_id,
+        practitioner_id,
+        observation_id,
+        allergy_intolerance_id,
+        diagnostic_order_id,
+        referral_request_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        medication_order_source_concept_id,
+        date_precision_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.MEDICATION_ORDER
+),
+
+scan_diagnostic_order AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        encounter_id,
+        practitioner_id,
+        parent_observation_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        diagnostic_order_source_concept_id,
+        result_value_units_concept_id,
+        date_precision_concept_id,
+        episodicity_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.DIAGNOSTIC_ORDER
+),
+
+keys_diagnostic_order_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_diagnostic_order
+    WHERE id IS NOT NULL
+),
+
+scan_encounter AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        practitioner_id,
+        episode_of_care_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        encounter_source_concept_id,
+        date_precision_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.ENCOUNTER
+),
+
+keys_encounter_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_encounter
+    WHERE id IS NOT NULL
+),
+
+scan_allergy_intolerance AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        practitioner_id,
+        encounter_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        allergy_intolerance_source_concept_id,
+        date_precision_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.ALLERGY_INTOLERANCE
+),
+
+keys_allergy_intolerance_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_allergy_intolerance
+    WHERE id IS NOT NULL
+),
+
+scan_procedure_request AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        encounter_id,
+        practitioner_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        procedure_request_source_concept_id,
+        date_precision_concept_id,
+        status_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.PROCEDURE_REQUEST
+),
+
+scan_referral_request AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        organisation_id,
+        encounter_id,
+        practitioner_id,
+        requester_organisation_id,
+        recipient_organisation_id,
+        lds_start_date_time,
+        clinical_effective_date,
+        referral_request_source_concept_id,
+        date_precision_concept_id,
+        referral_request_priority_concept_id,
+        referral_request_type_concept_id,
+        referral_request_specialty_concept_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.REFERRAL_REQUEST
+),
+
+keys_referral_request_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_referral_request
+    WHERE id IS NOT NULL
+),
+
+scan_location_contact AS (
+    SELECT
+        id,
+        contact_type_concept_id,
+        lds_start_date_time,
+        location_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.LOCATION_CONTACT
+),
+
+scan_appointment AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        organisation_id,
+        practitioner_in_role_id,
+        schedule_id,
+        appointment_status_concept_id,
+        booking_method_concept_id,
+        contact_mode_concept_id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.APPOINTMENT
+),
+
+keys_appointment_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_appointment
+    WHERE id IS NOT NULL
+),
+
+scan_appointment_practitioner AS (
+    SELECT
+        id,
+        lds_start_date_time,
+        appointment_id,
+        practitioner_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.APPOINTMENT_PRACTITIONER
+),
+
+scan_patient_registered_practitioner_in_role AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.PATIENT_REGISTERED_PRACTITIONER_IN_ROLE
+),
+
+scan_location AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.LOCATION
+),
+
+keys_location_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_location
+    WHERE id IS NOT NULL
+),
+
+scan_flag AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.FLAG
+),
+
+scan_patient_address AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        address_type_concept_id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_MASKED.PATIENT_ADDRESS
+),
+
+scan_patient_contact AS (
+    SELECT
+        id,
+        patient_id,
+        person_id,
+        contact_type_concept_id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_MASKED.PATIENT_CONTACT
+),
+
+scan_patient_uprn AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_MASKED.PATIENT_UPRN
+),
+
+scan_organisation AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.ORGANISATION
+),
+
+keys_organisation_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_organisation
+    WHERE id IS NOT NULL
+),
+
+scan_practitioner AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.PRACTITIONER
+),
+
+keys_practitioner_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_practitioner
+    WHERE id IS NOT NULL
+),
+
+scan_practitioner_in_role AS (
+    SELECT
+        id,
+        lds_start_date_time,
+        practitioner_id,
+        organisation_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.PRACTITIONER_IN_ROLE
+),
+
+keys_practitioner_in_role_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_practitioner_in_role
+    WHERE id IS NOT NULL
+),
+
+scan_schedule AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.SCHEDULE
+),
+
+keys_schedule_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_schedule
+    WHERE id IS NOT NULL
+),
+
+scan_schedule_practitioner AS (
+    SELECT
+        id,
+        lds_start_date_time,
+        schedule_id,
+        practitioner_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.SCHEDULE_PRACTITIONER
+),
+
+scan_concept AS (
+    SELECT
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_TERMINOLOGY.CONCEPT
+),
+
+scan_concept_map AS (
+    SELECT
+        source_code_id,
+        id,
+        lds_start_date_time
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_TERMINOLOGY.CONCEPT_MAP
+),
+
+keys_concept_map_source_code_id AS (
+    SELECT DISTINCT source_code_id AS key_value
+    FROM scan_concept_map
+    WHERE source_code_id IS NOT NULL
+),
+
+scan_patient_person AS (
+    SELECT
+        patient_id,
+        person_id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_COMMON.PATIENT_PERSON
+),
+
+scan_person AS (
+    SELECT
+        id
+    FROM "NCL_Data_Store_OLIDS_Alpha".OLIDS_MASKED.PERSON
+),
+
+keys_person_id AS (
+    SELECT DISTINCT id AS key_value
+    FROM scan_person
+    WHERE id IS NOT NULL
+),
+
+stats_patient AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.sk_patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.birth_year IS NULL) AS null_count_3,
+        COUNT_IF(s.birth_month IS NULL) AS null_count_4,
+        COUNT_IF(s.gender_concept_id IS NULL) AS null_count_5,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_6,
+        COUNT(DISTINCT s.registered_practice_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.registered_practice_id END) AS orphan_distinct_1,
+        COUNT_IF(s.registered_practice_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1
+    FROM scan_patient s
+    LEFT JOIN keys_organisation_id r1 ON s.registered_practice_id = r1.key_value
+),
+
+stats_episode_of_care AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.episode_of_care_start_date IS NULL) AS null_count_4,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_5,
+        COUNT_IF(s.episode_type_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.episode_status_source_concept_id IS NULL) AS null_count_7,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.organisation_id_publisher) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.organisation_id_publisher END) AS orphan_distinct_3,
+        COUNT_IF(s.organisation_id_publisher IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.organisation_id_managing) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.organisation_id_managing END) AS orphan_distinct_4,
+        COUNT_IF(s.organisation_id_managing IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.care_manager_practitioner_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.care_manager_practitioner_id END) AS orphan_distinct_5,
+        COUNT_IF(s.care_manager_practitioner_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5
+    FROM scan_episode_of_care s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_organisation_id r3 ON s.organisation_id_publisher = r3.key_value
+    LEFT JOIN keys_organisation_id r4 ON s.organisation_id_managing = r4.key_value
+    LEFT JOIN keys_practitioner_id r5 ON s.care_manager_practitioner_id = r5.key_value
+),
+
+stats_observation AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_4,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_5,
+        COUNT_IF(s.observation_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.result_value_units_concept_id IS NULL) AS null_count_7,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_8,
+        COUNT_IF(s.episodicity_concept_id IS NULL) AS null_count_9,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_3,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_4,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.parent_observation_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.parent_observation_id END) AS orphan_distinct_5,
+        COUNT_IF(s.parent_observation_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5
+    FROM scan_observation s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_encounter_id r3 ON s.encounter_id = r3.key_value
+    LEFT JOIN keys_practitioner_id r4 ON s.practitioner_id = r4.key_value
+    LEFT JOIN keys_observation_id r5 ON s.parent_observation_id = r5.key_value
+),
+
+stats_medication_statement AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_4,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_5,
+        COUNT_IF(s.medication_statement_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.authorisation_type_concept_id IS NULL) AS null_count_7,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_8,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.organisation_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.organisation_id END) AS orphan_distinct_3,
+        COUNT_IF(s.organisation_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_4,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_5,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5,
+        COUNT(DISTINCT s.observation_id) AS fk_distinct_6,
+        COUNT(DISTINCT CASE WHEN r6.key_value IS NULL THEN s.observation_id END) AS orphan_distinct_6,
+        COUNT_IF(s.observation_id IS NOT NULL AND r6.key_value IS NULL) AS orphan_rows_6,
+        COUNT(DISTINCT s.allergy_intolerance_id) AS fk_distinct_7,
+        COUNT(DISTINCT CASE WHEN r7.key_value IS NULL THEN s.allergy_intolerance_id END) AS orphan_distinct_7,
+        COUNT_IF(s.allergy_intolerance_id IS NOT NULL AND r7.key_value IS NULL) AS orphan_rows_7,
+        COUNT(DISTINCT s.diagnostic_order_id) AS fk_distinct_8,
+        COUNT(DISTINCT CASE WHEN r8.key_value IS NULL THEN s.diagnostic_order_id END) AS orphan_distinct_8,
+        COUNT_IF(s.diagnostic_order_id IS NOT NULL AND r8.key_value IS NULL) AS orphan_rows_8,
+        COUNT(DISTINCT s.referral_request_id) AS fk_distinct_9,
+        COUNT(DISTINCT CASE WHEN r9.key_value IS NULL THEN s.referral_request_id END) AS orphan_distinct_9,
+        COUNT_IF(s.referral_request_id IS NOT NULL AND r9.key_value IS NULL) AS orphan_rows_9
+    FROM scan_medication_statement s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_organisation_id r3 ON s.organisation_id = r3.key_value
+    LEFT JOIN keys_encounter_id r4 ON s.encounter_id = r4.key_value
+    LEFT JOIN keys_practitioner_id r5 ON s.practitioner_id = r5.key_value
+    LEFT JOIN keys_observation_id r6 ON s.observation_id = r6.key_value
+    LEFT JOIN keys_allergy_intolerance_id r7 ON s.allergy_intolerance_id = r7.key_value
+    LEFT JOIN keys_diagnostic_order_id r8 ON s.diagnostic_order_id = r8.key_value
+    LEFT JOIN keys_referral_request_id r9 ON s.referral_request_id = r9.key_value
+),
+
+stats_medication_order AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_4,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_5,
+        COUNT_IF(s.medication_order_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_7,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.organisation_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.organisation_id END) AS orphan_distinct_3,
+        COUNT_IF(s.organisation_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.medication_statement_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.medication_statement_id END) AS orphan_distinct_4,
+        COUNT_IF(s.medication_statement_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_5,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_6,
+        COUNT(DISTINCT CASE WHEN r6.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_6,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r6.key_value IS NULL) AS orphan_rows_6,
+        COUNT(DISTINCT s.observation_id) AS fk_distinct_7,
+        COUNT(DISTINCT CASE WHEN r7.key_value IS NULL THEN s.observation_id END) AS orphan_distinct_7,
+        COUNT_IF(s.observation_id IS NOT NULL AND r7.key_value IS NULL) AS orphan_rows_7,
+        COUNT(DISTINCT s.allergy_intolerance_id) AS fk_distinct_8,
+        COUNT(DISTINCT CASE WHEN r8.key_value IS NULL THEN s.allergy_intolerance_id END) AS orphan_distinct_8,
+        COUNT_IF(s.allergy_intolerance_id IS NOT NULL AND r8.key_value IS NULL) AS orphan_rows_8,
+        COUNT(DISTINCT s.diagnostic_order_id) AS fk_distinct_9,
+        COUNT(DISTINCT CASE WHEN r9.key_value IS NULL THEN s.diagnostic_order_id END) AS orphan_distinct_9,
+        COUNT_IF(s.diagnostic_order_id IS NOT NULL AND r9.key_value IS NULL) AS orphan_rows_9,
+        COUNT(DISTINCT s.referral_request_id) AS fk_distinct_10,
+        COUNT(DISTINCT CASE WHEN r10.key_value IS NULL THEN s.referral_request_id END) AS orphan_distinct_10,
+        COUNT_IF(s.referral_request_id IS NOT NULL AND r10.key_value IS NULL) AS orphan_rows_10
+    FROM scan_medication_order s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_organisation_id r3 ON s.organisation_id = r3.key_value
+    LEFT JOIN keys_medication_statement_id r4 ON s.medication_statement_id = r4.key_value
+    LEFT JOIN keys_encounter_id r5 ON s.encounter_id = r5.key_value
+    LEFT JOIN keys_practitioner_id r6 ON s.practitioner_id = r6.key_value
+    LEFT JOIN keys_observation_id r7 ON s.observation_id = r7.key_value
+    LEFT JOIN keys_allergy_intolerance_id r8 ON s.allergy_intolerance_id = r8.key_value
+    LEFT JOIN keys_diagnostic_order_id r9 ON s.diagnostic_order_id = r9.key_value
+    LEFT JOIN keys_referral_request_id r10 ON s.referral_request_id = r10.key_value
+),
+
+stats_diagnostic_order AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_4,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_5,
+        COUNT_IF(s.diagnostic_order_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.result_value_units_concept_id IS NULL) AS null_count_7,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_8,
+        COUNT_IF(s.episodicity_concept_id IS NULL) AS null_count_9,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_3,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_4,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.parent_observation_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.parent_observation_id END) AS orphan_distinct_5,
+        COUNT_IF(s.parent_observation_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5
+    FROM scan_diagnostic_order s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_encounter_id r3 ON s.encounter_id = r3.key_value
+    LEFT JOIN keys_practitioner_id r4 ON s.practitioner_id = r4.key_value
+    LEFT JOIN keys_observation_id r5 ON s.parent_observation_id = r5.key_value
+),
+
+stats_encounter AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_4,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_5,
+        COUNT_IF(s.encounter_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_7,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_2,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.episode_of_care_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.episode_of_care_id END) AS orphan_distinct_3,
+        COUNT_IF(s.episode_of_care_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3
+    FROM scan_encounter s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_practitioner_id r2 ON s.practitioner_id = r2.key_value
+    LEFT JOIN keys_episode_of_care_id r3 ON s.episode_of_care_id = r3.key_value
+),
+
+stats_allergy_intolerance AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.patient_id IS NULL) AS null_count_2,
+        COUNT_IF(s.person_id IS NULL) AS null_count_3,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_4,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_5,
+        COUNT_IF(s.allergy_intolerance_source_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_7,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_3,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_4,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4
+    FROM scan_allergy_intolerance s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_practitioner_id r3 ON s.practitioner_id = r3.key_value
+    LEFT JOIN keys_encounter_id r4 ON s.encounter_id = r4.key_value
+),
+
+stats_procedure_request AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_3,
+        COUNT_IF(s.procedure_request_source_concept_id IS NULL) AS null_count_4,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_5,
+        COUNT_IF(s.status_concept_id IS NULL) AS null_count_6,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_3,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_4,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4
+    FROM scan_procedure_request s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_encounter_id r3 ON s.encounter_id = r3.key_value
+    LEFT JOIN keys_practitioner_id r4 ON s.practitioner_id = r4.key_value
+),
+
+stats_referral_request AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2,
+        COUNT_IF(s.clinical_effective_date IS NULL) AS null_count_3,
+        COUNT_IF(s.referral_request_source_concept_id IS NULL) AS null_count_4,
+        COUNT_IF(s.date_precision_concept_id IS NULL) AS null_count_5,
+        COUNT_IF(s.referral_request_priority_concept_id IS NULL) AS null_count_6,
+        COUNT_IF(s.referral_request_type_concept_id IS NULL) AS null_count_7,
+        COUNT_IF(s.referral_request_specialty_concept_id IS NULL) AS null_count_8,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.organisation_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.organisation_id END) AS orphan_distinct_3,
+        COUNT_IF(s.organisation_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.encounter_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.encounter_id END) AS orphan_distinct_4,
+        COUNT_IF(s.encounter_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_5,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5,
+        COUNT(DISTINCT s.requester_organisation_id) AS fk_distinct_6,
+        COUNT(DISTINCT CASE WHEN r6.key_value IS NULL THEN s.requester_organisation_id END) AS orphan_distinct_6,
+        COUNT_IF(s.requester_organisation_id IS NOT NULL AND r6.key_value IS NULL) AS orphan_rows_6,
+        COUNT(DISTINCT s.recipient_organisation_id) AS fk_distinct_7,
+        COUNT(DISTINCT CASE WHEN r7.key_value IS NULL THEN s.recipient_organisation_id END) AS orphan_distinct_7,
+        COUNT_IF(s.recipient_organisation_id IS NOT NULL AND r7.key_value IS NULL) AS orphan_rows_7
+    FROM scan_referral_request s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_organisation_id r3 ON s.organisation_id = r3.key_value
+    LEFT JOIN keys_encounter_id r4 ON s.encounter_id = r4.key_value
+    LEFT JOIN keys_practitioner_id r5 ON s.practitioner_id = r5.key_value
+    LEFT JOIN keys_organisation_id r6 ON s.requester_organisation_id = r6.key_value
+    LEFT JOIN keys_organisation_id r7 ON s.recipient_organisation_id = r7.key_value
+),
+
+stats_location_contact AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.contact_type_concept_id IS NULL) AS null_count_2,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_3,
+        COUNT(DISTINCT s.location_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.location_id END) AS orphan_distinct_1,
+        COUNT_IF(s.location_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1
+    FROM scan_location_contact s
+    LEFT JOIN keys_location_id r1 ON s.location_id = r1.key_value
+),
+
+stats_appointment AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.appointment_status_concept_id IS NULL) AS null_count_2,
+        COUNT_IF(s.booking_method_concept_id IS NULL) AS null_count_3,
+        COUNT_IF(s.contact_mode_concept_id IS NULL) AS null_count_4,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_5,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2,
+        COUNT(DISTINCT s.organisation_id) AS fk_distinct_3,
+        COUNT(DISTINCT CASE WHEN r3.key_value IS NULL THEN s.organisation_id END) AS orphan_distinct_3,
+        COUNT_IF(s.organisation_id IS NOT NULL AND r3.key_value IS NULL) AS orphan_rows_3,
+        COUNT(DISTINCT s.practitioner_in_role_id) AS fk_distinct_4,
+        COUNT(DISTINCT CASE WHEN r4.key_value IS NULL THEN s.practitioner_in_role_id END) AS orphan_distinct_4,
+        COUNT_IF(s.practitioner_in_role_id IS NOT NULL AND r4.key_value IS NULL) AS orphan_rows_4,
+        COUNT(DISTINCT s.schedule_id) AS fk_distinct_5,
+        COUNT(DISTINCT CASE WHEN r5.key_value IS NULL THEN s.schedule_id END) AS orphan_distinct_5,
+        COUNT_IF(s.schedule_id IS NOT NULL AND r5.key_value IS NULL) AS orphan_rows_5
+    FROM scan_appointment s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+    LEFT JOIN keys_organisation_id r3 ON s.organisation_id = r3.key_value
+    LEFT JOIN keys_practitioner_in_role_id r4 ON s.practitioner_in_role_id = r4.key_value
+    LEFT JOIN keys_schedule_id r5 ON s.schedule_id = r5.key_value
+),
+
+stats_appointment_practitioner AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2,
+        COUNT(DISTINCT s.appointment_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.appointment_id END) AS orphan_distinct_1,
+        COUNT_IF(s.appointment_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_2,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2
+    FROM scan_appointment_practitioner s
+    LEFT JOIN keys_appointment_id r1 ON s.appointment_id = r1.key_value
+    LEFT JOIN keys_practitioner_id r2 ON s.practitioner_id = r2.key_value
+),
+
+stats_patient_registered_practitioner_in_role AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_patient_registered_practitioner_in_role s
+),
+
+stats_location AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_location s
+),
+
+stats_flag AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_flag s
+),
+
+stats_patient_address AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.address_type_concept_id IS NULL) AS null_count_2,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_3,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2
+    FROM scan_patient_address s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+),
+
+stats_patient_contact AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.contact_type_concept_id IS NULL) AS null_count_2,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_3,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2
+    FROM scan_patient_contact s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+),
+
+stats_patient_uprn AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_patient_uprn s
+),
+
+stats_organisation AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_organisation s
+),
+
+stats_practitioner AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_practitioner s
+),
+
+stats_practitioner_in_role AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_1,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.organisation_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.organisation_id END) AS orphan_distinct_2,
+        COUNT_IF(s.organisation_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2
+    FROM scan_practitioner_in_role s
+    LEFT JOIN keys_practitioner_id r1 ON s.practitioner_id = r1.key_value
+    LEFT JOIN keys_organisation_id r2 ON s.organisation_id = r2.key_value
+),
+
+stats_schedule AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_schedule s
+),
+
+stats_schedule_practitioner AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2,
+        COUNT(DISTINCT s.schedule_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.schedule_id END) AS orphan_distinct_1,
+        COUNT_IF(s.schedule_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.practitioner_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.practitioner_id END) AS orphan_distinct_2,
+        COUNT_IF(s.practitioner_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2
+    FROM scan_schedule_practitioner s
+    LEFT JOIN keys_schedule_id r1 ON s.schedule_id = r1.key_value
+    LEFT JOIN keys_practitioner_id r2 ON s.practitioner_id = r2.key_value
+),
+
+stats_concept AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_concept s
+),
+
+stats_concept_map AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT_IF(s.id IS NULL) AS null_count_1,
+        COUNT_IF(s.lds_start_date_time IS NULL) AS null_count_2
+    FROM scan_concept_map s
+),
+
+stats_patient_person AS (
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNT(DISTINCT s.patient_id) AS fk_distinct_1,
+        COUNT(DISTINCT CASE WHEN r1.key_value IS NULL THEN s.patient_id END) AS orphan_distinct_1,
+        COUNT_IF(s.patient_id IS NOT NULL AND r1.key_value IS NULL) AS orphan_rows_1,
+        COUNT(DISTINCT s.person_id) AS fk_distinct_2,
+        COUNT(DISTINCT CASE WHEN r2.key_value IS NULL THEN s.person_id END) AS orphan_distinct_2,
+        COUNT_IF(s.person_id IS NOT NULL AND r2.key_value IS NULL) AS orphan_rows_2
+    FROM scan_patient_person s
+    LEFT JOIN keys_patient_id r1 ON s.patient_id = r1.key_value
+    LEFT JOIN keys_person_id r2 ON s.person_id = r2.key_value
+),
+
+completeness_results AS (
+    SELECT 'PATIENT' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_patient
+    UNION ALL
+    SELECT 'PATIENT' AS table_name, 'sk_patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_patient
+    UNION ALL
+    SELECT 'PATIENT' AS table_name, 'birth_year' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_patient
+    UNION ALL
+    SELECT 'PATIENT' AS table_name, 'birth_month' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_patient
+    UNION ALL
+    SELECT 'PATIENT' AS table_name, 'gender_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_patient
+    UNION ALL
+    SELECT 'PATIENT' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_patient
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'episode_of_care_start_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'episode_type_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'episode_status_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'observation_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'result_value_units_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_8 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'episodicity_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_9 AS null_count FROM stats_observation
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'medication_statement_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'authorisation_type_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_8 AS null_count FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'medication_order_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_medication_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'diagnostic_order_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'result_value_units_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_8 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'episodicity_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_9 AS null_count FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'encounter_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_encounter
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'id' AS column_name, 0.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'patient_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'person_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'allergy_intolerance_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'procedure_request_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'status_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_procedure_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'clinical_effective_date' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'referral_request_source_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'date_precision_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'referral_request_priority_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_6 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'referral_request_type_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_7 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'referral_request_specialty_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_8 AS null_count FROM stats_referral_request
+    UNION ALL
+    SELECT 'LOCATION_CONTACT' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_location_contact
+    UNION ALL
+    SELECT 'LOCATION_CONTACT' AS table_name, 'contact_type_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_location_contact
+    UNION ALL
+    SELECT 'LOCATION_CONTACT' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_location_contact
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'appointment_status_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'booking_method_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'contact_mode_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_4 AS null_count FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_5 AS null_count FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT_PRACTITIONER' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_appointment_practitioner
+    UNION ALL
+    SELECT 'APPOINTMENT_PRACTITIONER' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_appointment_practitioner
+    UNION ALL
+    SELECT 'PATIENT_REGISTERED_PRACTITIONER_IN_ROLE' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_patient_registered_practitioner_in_role
+    UNION ALL
+    SELECT 'PATIENT_REGISTERED_PRACTITIONER_IN_ROLE' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_patient_registered_practitioner_in_role
+    UNION ALL
+    SELECT 'LOCATION' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_location
+    UNION ALL
+    SELECT 'LOCATION' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_location
+    UNION ALL
+    SELECT 'FLAG' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_flag
+    UNION ALL
+    SELECT 'FLAG' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_flag
+    UNION ALL
+    SELECT 'PATIENT_ADDRESS' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_patient_address
+    UNION ALL
+    SELECT 'PATIENT_ADDRESS' AS table_name, 'address_type_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_patient_address
+    UNION ALL
+    SELECT 'PATIENT_ADDRESS' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_patient_address
+    UNION ALL
+    SELECT 'PATIENT_CONTACT' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_patient_contact
+    UNION ALL
+    SELECT 'PATIENT_CONTACT' AS table_name, 'contact_type_concept_id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_patient_contact
+    UNION ALL
+    SELECT 'PATIENT_CONTACT' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_3 AS null_count FROM stats_patient_contact
+    UNION ALL
+    SELECT 'PATIENT_UPRN' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_patient_uprn
+    UNION ALL
+    SELECT 'PATIENT_UPRN' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_patient_uprn
+    UNION ALL
+    SELECT 'ORGANISATION' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_organisation
+    UNION ALL
+    SELECT 'ORGANISATION' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_organisation
+    UNION ALL
+    SELECT 'PRACTITIONER' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_practitioner
+    UNION ALL
+    SELECT 'PRACTITIONER' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_practitioner
+    UNION ALL
+    SELECT 'PRACTITIONER_IN_ROLE' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_practitioner_in_role
+    UNION ALL
+    SELECT 'PRACTITIONER_IN_ROLE' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_practitioner_in_role
+    UNION ALL
+    SELECT 'SCHEDULE' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_schedule
+    UNION ALL
+    SELECT 'SCHEDULE' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_schedule
+    UNION ALL
+    SELECT 'SCHEDULE_PRACTITIONER' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_schedule_practitioner
+    UNION ALL
+    SELECT 'SCHEDULE_PRACTITIONER' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_schedule_practitioner
+    UNION ALL
+    SELECT 'CONCEPT' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_concept
+    UNION ALL
+    SELECT 'CONCEPT' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_concept
+    UNION ALL
+    SELECT 'CONCEPT_MAP' AS table_name, 'id' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_1 AS null_count FROM stats_concept_map
+    UNION ALL
+    SELECT 'CONCEPT_MAP' AS table_name, 'lds_start_date_time' AS column_name, 1.0 AS tolerance_percent, total_rows, null_count_2 AS null_count FROM stats_concept_map
+),
+
+reference_results AS (
+    SELECT 'PATIENT' AS table_name, 'registered_practice_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_patient
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'organisation_id_publisher' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'organisation_id_managing' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'EPISODE_OF_CARE' AS table_name, 'care_manager_practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_episode_of_care
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_observation
+    UNION ALL
+    SELECT 'OBSERVATION' AS table_name, 'parent_observation_id' AS column_name, 'OBSERVATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_observation
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'observation_id' AS column_name, 'OBSERVATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_6 AS fk_distinct, orphan_distinct_6 AS orphan_distinct, orphan_rows_6 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'allergy_intolerance_id' AS column_name, 'ALLERGY_INTOLERANCE.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_7 AS fk_distinct, orphan_distinct_7 AS orphan_distinct, orphan_rows_7 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'diagnostic_order_id' AS column_name, 'DIAGNOSTIC_ORDER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_8 AS fk_distinct, orphan_distinct_8 AS orphan_distinct, orphan_rows_8 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_STATEMENT' AS table_name, 'referral_request_id' AS column_name, 'REFERRAL_REQUEST.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_9 AS fk_distinct, orphan_distinct_9 AS orphan_distinct, orphan_rows_9 AS orphan_rows FROM stats_medication_statement
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'medication_statement_id' AS column_name, 'MEDICATION_STATEMENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_6 AS fk_distinct, orphan_distinct_6 AS orphan_distinct, orphan_rows_6 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'observation_id' AS column_name, 'OBSERVATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_7 AS fk_distinct, orphan_distinct_7 AS orphan_distinct, orphan_rows_7 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'allergy_intolerance_id' AS column_name, 'ALLERGY_INTOLERANCE.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_8 AS fk_distinct, orphan_distinct_8 AS orphan_distinct, orphan_rows_8 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'diagnostic_order_id' AS column_name, 'DIAGNOSTIC_ORDER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_9 AS fk_distinct, orphan_distinct_9 AS orphan_distinct, orphan_rows_9 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'MEDICATION_ORDER' AS table_name, 'referral_request_id' AS column_name, 'REFERRAL_REQUEST.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_10 AS fk_distinct, orphan_distinct_10 AS orphan_distinct, orphan_rows_10 AS orphan_rows FROM stats_medication_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'DIAGNOSTIC_ORDER' AS table_name, 'parent_observation_id' AS column_name, 'OBSERVATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_diagnostic_order
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_encounter
+    UNION ALL
+    SELECT 'ENCOUNTER' AS table_name, 'episode_of_care_id' AS column_name, 'EPISODE_OF_CARE.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_encounter
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'ALLERGY_INTOLERANCE' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_allergy_intolerance
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_procedure_request
+    UNION ALL
+    SELECT 'PROCEDURE_REQUEST' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_procedure_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'encounter_id' AS column_name, 'ENCOUNTER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'requester_organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_6 AS fk_distinct, orphan_distinct_6 AS orphan_distinct, orphan_rows_6 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'REFERRAL_REQUEST' AS table_name, 'recipient_organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_7 AS fk_distinct, orphan_distinct_7 AS orphan_distinct, orphan_rows_7 AS orphan_rows FROM stats_referral_request
+    UNION ALL
+    SELECT 'LOCATION_CONTACT' AS table_name, 'location_id' AS column_name, 'LOCATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_location_contact
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_3 AS fk_distinct, orphan_distinct_3 AS orphan_distinct, orphan_rows_3 AS orphan_rows FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'practitioner_in_role_id' AS column_name, 'PRACTITIONER_IN_ROLE.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_4 AS fk_distinct, orphan_distinct_4 AS orphan_distinct, orphan_rows_4 AS orphan_rows FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT' AS table_name, 'schedule_id' AS column_name, 'SCHEDULE.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_5 AS fk_distinct, orphan_distinct_5 AS orphan_distinct, orphan_rows_5 AS orphan_rows FROM stats_appointment
+    UNION ALL
+    SELECT 'APPOINTMENT_PRACTITIONER' AS table_name, 'appointment_id' AS column_name, 'APPOINTMENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_appointment_practitioner
+    UNION ALL
+    SELECT 'APPOINTMENT_PRACTITIONER' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_appointment_practitioner
+    UNION ALL
+    SELECT 'PATIENT_ADDRESS' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_patient_address
+    UNION ALL
+    SELECT 'PATIENT_ADDRESS' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_patient_address
+    UNION ALL
+    SELECT 'PATIENT_CONTACT' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_patient_contact
+    UNION ALL
+    SELECT 'PATIENT_CONTACT' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_patient_contact
+    UNION ALL
+    SELECT 'PRACTITIONER_IN_ROLE' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_practitioner_in_role
+    UNION ALL
+    SELECT 'PRACTITIONER_IN_ROLE' AS table_name, 'organisation_id' AS column_name, 'ORGANISATION.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_practitioner_in_role
+    UNION ALL
+    SELECT 'SCHEDULE_PRACTITIONER' AS table_name, 'schedule_id' AS column_name, 'SCHEDULE.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_schedule_practitioner
+    UNION ALL
+    SELECT 'SCHEDULE_PRACTITIONER' AS table_name, 'practitioner_id' AS column_name, 'PRACTITIONER.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_schedule_practitioner
+    UNION ALL
+    SELECT 'PATIENT_PERSON' AS table_name, 'patient_id' AS column_name, 'PATIENT.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_1 AS fk_distinct, orphan_distinct_1 AS orphan_distinct, orphan_rows_1 AS orphan_rows FROM stats_patient_person
+    UNION ALL
+    SELECT 'PATIENT_PERSON' AS table_name, 'person_id' AS column_name, 'PERSON.id' AS parent, 0.0 AS tolerance_percent, fk_distinct_2 AS fk_distinct, orphan_distinct_2 AS orphan_distinct, orphan_rows_2 AS orphan_rows FROM stats_patient_person
+),
+
+concept_keys AS (
+    SELECT *
+    FROM (
+        SELECT
+            'PATIENT' AS table_name,
+            CASE
+            WHEN GROUPING(gender_concept_id) = 0 THEN 'gender_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(gender_concept_id) = 0 THEN gender_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_patient
+        GROUP BY GROUPING SETS ((gender_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'EPISODE_OF_CARE' AS table_name,
+            CASE
+            WHEN GROUPING(episode_type_source_concept_id) = 0 THEN 'episode_type_source_concept_id'
+            WHEN GROUPING(episode_status_source_concept_id) = 0 THEN 'episode_status_source_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(episode_type_source_concept_id) = 0 THEN episode_type_source_concept_id
+            WHEN GROUPING(episode_status_source_concept_id) = 0 THEN episode_status_source_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_episode_of_care
+        GROUP BY GROUPING SETS ((episode_type_source_concept_id), (episode_status_source_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'OBSERVATION' AS table_name,
+            CASE
+            WHEN GROUPING(observation_source_concept_id) = 0 THEN 'observation_source_concept_id'
+            WHEN GROUPING(result_value_units_concept_id) = 0 THEN 'result_value_units_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            WHEN GROUPING(episodicity_concept_id) = 0 THEN 'episodicity_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(observation_source_concept_id) = 0 THEN observation_source_concept_id
+            WHEN GROUPING(result_value_units_concept_id) = 0 THEN result_value_units_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            WHEN GROUPING(episodicity_concept_id) = 0 THEN episodicity_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_observation
+        GROUP BY GROUPING SETS ((observation_source_concept_id), (result_value_units_concept_id), (date_precision_concept_id), (episodicity_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'MEDICATION_STATEMENT' AS table_name,
+            CASE
+            WHEN GROUPING(medication_statement_source_concept_id) = 0 THEN 'medication_statement_source_concept_id'
+            WHEN GROUPING(authorisation_type_concept_id) = 0 THEN 'authorisation_type_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(medication_statement_source_concept_id) = 0 THEN medication_statement_source_concept_id
+            WHEN GROUPING(authorisation_type_concept_id) = 0 THEN authorisation_type_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_medication_statement
+        GROUP BY GROUPING SETS ((medication_statement_source_concept_id), (authorisation_type_concept_id), (date_precision_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'MEDICATION_ORDER' AS table_name,
+            CASE
+            WHEN GROUPING(medication_order_source_concept_id) = 0 THEN 'medication_order_source_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(medication_order_source_concept_id) = 0 THEN medication_order_source_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_medication_order
+        GROUP BY GROUPING SETS ((medication_order_source_concept_id), (date_precision_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'DIAGNOSTIC_ORDER' AS table_name,
+            CASE
+            WHEN GROUPING(diagnostic_order_source_concept_id) = 0 THEN 'diagnostic_order_source_concept_id'
+            WHEN GROUPING(result_value_units_concept_id) = 0 THEN 'result_value_units_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            WHEN GROUPING(episodicity_concept_id) = 0 THEN 'episodicity_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(diagnostic_order_source_concept_id) = 0 THEN diagnostic_order_source_concept_id
+            WHEN GROUPING(result_value_units_concept_id) = 0 THEN result_value_units_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            WHEN GROUPING(episodicity_concept_id) = 0 THEN episodicity_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_diagnostic_order
+        GROUP BY GROUPING SETS ((diagnostic_order_source_concept_id), (result_value_units_concept_id), (date_precision_concept_id), (episodicity_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'ENCOUNTER' AS table_name,
+            CASE
+            WHEN GROUPING(encounter_source_concept_id) = 0 THEN 'encounter_source_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(encounter_source_concept_id) = 0 THEN encounter_source_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_encounter
+        GROUP BY GROUPING SETS ((encounter_source_concept_id), (date_precision_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'ALLERGY_INTOLERANCE' AS table_name,
+            CASE
+            WHEN GROUPING(allergy_intolerance_source_concept_id) = 0 THEN 'allergy_intolerance_source_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(allergy_intolerance_source_concept_id) = 0 THEN allergy_intolerance_source_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_allergy_intolerance
+        GROUP BY GROUPING SETS ((allergy_intolerance_source_concept_id), (date_precision_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'PROCEDURE_REQUEST' AS table_name,
+            CASE
+            WHEN GROUPING(procedure_request_source_concept_id) = 0 THEN 'procedure_request_source_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            WHEN GROUPING(status_concept_id) = 0 THEN 'status_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(procedure_request_source_concept_id) = 0 THEN procedure_request_source_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            WHEN GROUPING(status_concept_id) = 0 THEN status_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_procedure_request
+        GROUP BY GROUPING SETS ((procedure_request_source_concept_id), (date_precision_concept_id), (status_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'REFERRAL_REQUEST' AS table_name,
+            CASE
+            WHEN GROUPING(referral_request_source_concept_id) = 0 THEN 'referral_request_source_concept_id'
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN 'date_precision_concept_id'
+            WHEN GROUPING(referral_request_priority_concept_id) = 0 THEN 'referral_request_priority_concept_id'
+            WHEN GROUPING(referral_request_type_concept_id) = 0 THEN 'referral_request_type_concept_id'
+            WHEN GROUPING(referral_request_specialty_concept_id) = 0 THEN 'referral_request_specialty_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(referral_request_source_concept_id) = 0 THEN referral_request_source_concept_id
+            WHEN GROUPING(date_precision_concept_id) = 0 THEN date_precision_concept_id
+            WHEN GROUPING(referral_request_priority_concept_id) = 0 THEN referral_request_priority_concept_id
+            WHEN GROUPING(referral_request_type_concept_id) = 0 THEN referral_request_type_concept_id
+            WHEN GROUPING(referral_request_specialty_concept_id) = 0 THEN referral_request_specialty_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_referral_request
+        GROUP BY GROUPING SETS ((referral_request_source_concept_id), (date_precision_concept_id), (referral_request_priority_concept_id), (referral_request_type_concept_id), (referral_request_specialty_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'LOCATION_CONTACT' AS table_name,
+            CASE
+            WHEN GROUPING(contact_type_concept_id) = 0 THEN 'contact_type_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(contact_type_concept_id) = 0 THEN contact_type_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_location_contact
+        GROUP BY GROUPING SETS ((contact_type_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'APPOINTMENT' AS table_name,
+            CASE
+            WHEN GROUPING(appointment_status_concept_id) = 0 THEN 'appointment_status_concept_id'
+            WHEN GROUPING(booking_method_concept_id) = 0 THEN 'booking_method_concept_id'
+            WHEN GROUPING(contact_mode_concept_id) = 0 THEN 'contact_mode_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(appointment_status_concept_id) = 0 THEN appointment_status_concept_id
+            WHEN GROUPING(booking_method_concept_id) = 0 THEN booking_method_concept_id
+            WHEN GROUPING(contact_mode_concept_id) = 0 THEN contact_mode_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_appointment
+        GROUP BY GROUPING SETS ((appointment_status_concept_id), (booking_method_concept_id), (contact_mode_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'PATIENT_ADDRESS' AS table_name,
+            CASE
+            WHEN GROUPING(address_type_concept_id) = 0 THEN 'address_type_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(address_type_concept_id) = 0 THEN address_type_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_patient_address
+        GROUP BY GROUPING SETS ((address_type_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+    UNION ALL
+    SELECT *
+    FROM (
+        SELECT
+            'PATIENT_CONTACT' AS table_name,
+            CASE
+            WHEN GROUPING(contact_type_concept_id) = 0 THEN 'contact_type_concept_id'
+            END AS concept_field,
+            CASE
+            WHEN GROUPING(contact_type_concept_id) = 0 THEN contact_type_concept_id
+            END AS concept_id,
+            COUNT(*) AS row_count
+        FROM scan_patient_contact
+        GROUP BY GROUPING SETS ((contact_type_concept_id))
+    ) keys
+    WHERE concept_id IS NOT NULL
+),
+
+concept_checks AS (
+    SELECT *
+    FROM (VALUES
+        ('PATIENT', 'gender_concept_id', 0.0),
+        ('EPISODE_OF_CARE', 'episode_type_source_concept_id', 0.0),
+        ('EPISODE_OF_CARE', 'episode_status_source_concept_id', 0.0),
+        ('OBSERVATION', 'observation_source_concept_id', 0.0),
+        ('OBSERVATION', 'result_value_units_concept_id', 0.0),
+        ('OBSERVATION', 'date_precision_concept_id', 0.0),
+        ('OBSERVATION', 'episodicity_concept_id', 0.0),
+        ('MEDICATION_STATEMENT', 'medication_statement_source_concept_id', 0.0),
+        ('MEDICATION_STATEMENT', 'authorisation_type_concept_id', 0.0),
+        ('MEDICATION_STATEMENT', 'date_precision_concept_id', 0.0),
+        ('MEDICATION_ORDER', 'medication_order_source_concept_id', 0.0),
+        ('MEDICATION_ORDER', 'date_precision_concept_id', 0.0),
+        ('DIAGNOSTIC_ORDER', 'diagnostic_order_source_concept_id', 0.0),
+        ('DIAGNOSTIC_ORDER', 'result_value_units_concept_id', 0.0),
+        ('DIAGNOSTIC_ORDER', 'date_precision_concept_id', 0.0),
+        ('DIAGNOSTIC_ORDER', 'episodicity_concept_id', 0.0),
+        ('ENCOUNTER', 'encounter_source_concept_id', 0.0),
+        ('ENCOUNTER', 'date_precision_concept_id', 0.0),
+        ('ALLERGY_INTOLERANCE', 'allergy_intolerance_source_concept_id', 0.0),
+        ('ALLERGY_INTOLERANCE', 'date_precision_concept_id', 0.0),
+        ('PROCEDURE_REQUEST', 'procedure_request_source_concept_id', 0.0),
+        ('PROCEDURE_REQUEST', 'date_precision_concept_id', 0.0),
+        ('PROCEDURE_REQUEST', 'status_concept_id', 0.0),
+        ('REFERRAL_REQUEST', 'referral_request_source_concept_id', 0.0),
+        ('REFERRAL_REQUEST', 'date_precision_concept_id', 0.0),
+        ('REFERRAL_REQUEST', 'referral_request_priority_concept_id', 0.0),
+        ('REFERRAL_REQUEST', 'referral_request_type_concept_id', 0.0),
+        ('REFERRAL_REQUEST', 'referral_request_specialty_concept_id', 0.0),
+        ('LOCATION_CONTACT', 'contact_type_concept_id', 0.0),
+        ('APPOINTMENT', 'appointment_status_concept_id', 0.0),
+        ('APPOINTMENT', 'booking_method_concept_id', 0.0),
+        ('APPOINTMENT', 'contact_mode_concept_id', 0.0),
+        ('PATIENT_ADDRESS', 'address_type_concept_id', 0.0),
+        ('PATIENT_CONTACT', 'contact_type_concept_id', 0.0)
+    ) AS checks(table_name, concept_field, tolerance_percent)
+),
+
+concept_results AS (
+    SELECT
+        checks.table_name,
+        checks.concept_field,
+        checks.tolerance_percent,
+        COUNT(keys.concept_id) AS total_distinct,
+        COALESCE(SUM(keys.row_count), 0) AS total_rows,
+        COUNT_IF(keys.concept_id IS NOT NULL AND cm.key_value IS NULL) AS unmapped_concepts,
+        COALESCE(SUM(CASE WHEN cm.key_value IS NULL THEN keys.row_count END), 0) AS unmapped_rows
+    FROM concept_checks checks
+    LEFT JOIN concept_keys keys
+        ON keys.table_name = checks.table_name AND keys.concept_field = checks.concept_field
+    LEFT JOIN keys_concept_map_source_code_id cm ON keys.concept_id = cm.key_value
+    GROUP BY checks.table_name, checks.concept_field, checks.tolerance_percent
+)
+
+SELECT
+    'column_completeness' AS test_name,
+    table_name,
+    column_name AS test_subject,
+    CASE WHEN COALESCE(100.0 * null_count / NULLIF(total_rows, 0), 0) <= tolerance_percent THEN 'PASS' ELSE 'FAIL' END AS status,
+    ROUND(100.0 - COALESCE(100.0 * null_count / NULLIF(total_rows, 0), 0), 2) AS metric_value,
+    ROUND(100.0 - tolerance_percent, 2) AS threshold,
+    OBJECT_CONSTRUCT(
+        'total_rows', total_rows,
+        'null_count', null_count,
+        'null_percentage', ROUND(COALESCE(100.0 * null_count / NULLIF(total_rows, 0), 0), 4),
+        'threshold_null_pct', tolerance_percent
+    )::VARCHAR AS details
+FROM completeness_results
+
+UNION ALL
+
+SELECT
+    'referential_integrity' AS test_name,
+    table_name,
+    column_name AS test_subject,
+    CASE WHEN COALESCE(100.0 * orphan_distinct / NULLIF(fk_distinct, 0), 0) <= tolerance_percent THEN 'PASS' ELSE 'FAIL' END AS status,
+    ROUND(100.0 - COALESCE(100.0 * orphan_distinct / NULLIF(fk_distinct, 0), 0), 2) AS metric_value,
+    ROUND(100.0 - tolerance_percent, 2) AS threshold,
+    OBJECT_CONSTRUCT(
+        'references', parent,
+        'distinct_fk', fk_distinct,
+        'orphaned_distinct_fk', orphan_distinct,
+        'orphaned_rows', orphan_rows,
+        'tolerance_percent', tolerance_percent
+    )::VARCHAR AS details
+FROM reference_results
+
+UNION ALL
+
+SELECT
+    'concept_mapping_integrity' AS test_name,
+    table_name,
+    concept_field AS test_subject,
+    CASE WHEN COALESCE(100.0 * unmapped_concepts / NULLIF(total_distinct, 0), 0) <= tolerance_percent THEN 'PASS' ELSE 'FAIL' END AS status,
+    ROUND(100.0 - COALESCE(100.0 * unmapped_concepts / NULLIF(total_distinct, 0), 0), 2) AS metric_value,
+    ROUND(100.0 - tolerance_percent, 2) AS threshold,
+    OBJECT_CONSTRUCT(
+        'total_distinct_concepts', total_distinct,
+        'total_rows', total_rows,
+        'unmapped_concepts', unmapped_concepts,
+        'unmapped_rows', unmapped_rows,
+        'tolerance_percent', tolerance_percent
+    )::VARCHAR AS details
+FROM concept_results
+
+ORDER BY status DESC, test_name, table_name, test_subject;
@@ -0,0 +1,8 @@
+"""Put scripts/ and scripts/tests/ on sys.path, as the scripts do when run directly."""
+
+import sys
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TESTS_DIR.parent))
+sys.path.insert(0, str(TESTS_DIR))
@@ -0,0 +1,107 @@
+"""Unit tests for common.async_queries, against a fake connector connection."""
+
+import pytest
+
+from common import async_queries
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.sfqid = None
+
+    def execute_async(self, query):
+        self.sfqid = self.conn.submit(query)
+
+    def execute(self, sql):
+        self.conn.executed.append(sql)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Queries finish after `polls[query]` status checks; queries in `failing` raise when polled."""
+
+    def __init__(self, polls=None, failing=()):
+        self.polls = polls or {}
+        self.failing = set(failing)
+        self.queries = {}
+        self.executed = []
+        self.max_in_flight = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def submit(self, query):
+        query_id = f'q{len(self.queries)}'
+        self.queries[query_id] = [query, self.polls.get(query, 0)]
+        self.max_in_flight = max(self.max_in_flight, len(self.running()))
+        return query_id
+
+    def running(self):
+        return [query_id for query_id, (_, remaining) in self.queries.items() if remaining > 0]
+
+    def get_query_status_throw_if_error(self, query_id):
+        query, remaining = self.queries[query_id]
+        if query in self.failing:
+            self.queries[query_id][1] = 0
+            raise RuntimeError(f'{query} failed')
+        self.queries[query_id][1] = max(remaining - 1, 0)
+        return remaining
+
+    def is_still_running(self, status):
+        return status > 0
+
+
+def collect(conn, query_id):
+    return conn.queries[query_id][0].lower()
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(async_queries, 'POLL_INTERVAL_SECONDS', 0)
+
+
+def test_results_follow_query_order_and_respect_jobs():
+    conn = FakeConnection(polls={'A': 3, 'B': 0, 'C': 1})
+    queries = {'a': 'A', 'b': 'B', 'c': 'C'}
+    completed = []
+    results = async_queries.run_queries(
+        conn, queries, jobs=2, collect=collect,
+        on_complete=lambda key, query_id, result: completed.append(key))
+    assert list(results.items()) == [('a', 'a'), ('b', 'b'), ('c', 'c')]
+    assert completed == ['b', 'c', 'a']
+    assert conn.max_in_flight <= 2
+
+
+def test_failure_cancels_queries_in_flight():
+    conn = FakeConnection(polls={'SLOW': 5}, failing={'BAD'})
+    with pytest.raises(RuntimeError, match='BAD failed'):
+        async_queries.run_queries(conn, {'slow': 'SLOW', 'bad': 'BAD'}, jobs=2, collect=collect)
+    assert conn.executed == ["SELECT SYSTEM$CANCEL_QUERY('q0')"]
+
+
+def test_on_error_result_is_kept_and_run_continues():
+    conn = FakeConnection(failing={'BAD'})
+    errors = []
+
+    def on_error(key, query_id, error):
+        errors.append((key, query_id, str(error)))
+        return []
+
+    results = async_queries.run_queries(
+        conn, {'bad': 'BAD', 'good': 'GOOD'}, jobs=1, collect=collect, on_error=on_error)
+    assert results == {'bad': [], 'good': 'good'}
+    assert errors == [('bad', 'q0', 'BAD failed')]
+    assert conn.executed == []
+
+
+def test_submit_failure_reports_no_query_id():
+    def submit(conn, query):
+        raise ValueError('No SQL statements found')
+
+    results = async_queries.run_queries(
+        FakeConnection(), {'empty': ''}, jobs=1, submit=submit,
+        on_error=lambda key, query_id, error: (query_id, str(error)))
+    assert results == {'empty': (None, 'No SQL statements found')}
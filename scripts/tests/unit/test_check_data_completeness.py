@@ -0,0 +1,27 @@
+"""Unit tests for check_data_completeness progress output."""
+
+from check_data_completeness import field_progress
+
+CHECKS = [
+    ('OLIDS_MASKED', 'PATIENT', 'id'),
+    ('OLIDS_COMMON', 'OBSERVATION', 'id'),
+    ('OLIDS_MASKED', 'PATIENT', 'sk_patient_id'),
+    ('OLIDS_COMMON', 'ENCOUNTER', 'id'),
+]
+
+
+def test_field_lines_follow_check_order_whatever_order_tables_finish(capsys):
+    report = field_progress(CHECKS)
+
+    report(('OLIDS_COMMON', 'OBSERVATION'), 'q1', [])
+    assert capsys.readouterr().out == ''
+
+    report(('OLIDS_MASKED', 'PATIENT'), 'q0', [])
+    assert capsys.readouterr().out == (
+        "  Checking 1/4: PATIENT.id\n"
+        "  Checking 2/4: OBSERVATION.id\n"
+        "  Checking 3/4: PATIENT.sk_patient_id\n"
+    )
+
+    report(('OLIDS_COMMON', 'ENCOUNTER'), 'q2', [])
+    assert capsys.readouterr().out == "  Checking 4/4: ENCOUNTER.id\n"
@@ -0,0 +1,160 @@
+"""Unit tests for common.check_registry planning and schema compilation."""
+
+import pytest
+
+from common import check_registry
+
+REGISTRY = """
+defaults:
+  tolerance_percent: 1.0
+  source_tolerance_percent:
+    references: 0.0
+tables:
+- table: PATIENT
+  schema: OLIDS_MASKED
+  model: base_olids_patient
+  columns:
+  - name: id
+    completeness: true
+  - name: gender_concept_id
+    concept_mapping:
+      tolerance_percent: 2.0
+- table: OBSERVATION
+  schema: OLIDS_COMMON
+  model: base_olids_observation
+  columns:
+  - name: patient_id
+    completeness:
+      only: dbt
+    references:
+      table: PATIENT
+  - name: lds_start_date_time
+    completeness:
+      only: source
+      source_tolerance_percent: 0.5
+- table: CONCEPT_MAP
+  schema: OLIDS_TERMINOLOGY
+  model: base_olids_concept_map
+  columns: []
+"""
+
+SCHEMA = """version: 2
+models:
+- name: base_olids_patient
+  description: Patients.
+  columns:
+    - name: id
+      description: Patient id.
+      tests:
+        - unique
+        - column_completeness:
+            arguments:
+              tolerance_percent: 9.0
+    - name: stale
+      tests:
+        - column_completeness
+- name: base_olids_observation
+  description: Observations.
+
+- name: base_olids_concept_map
+  description: Concept map.
+"""
+
+
+@pytest.fixture
+def tables(tmp_path):
+    path = tmp_path / 'checks.yml'
+    path.write_text(REGISTRY)
+    return check_registry.load_registry(path)
+
+
+def test_plan_source_scans(tables):
+    plan = check_registry.plan_scans(tables)
+    assert list(plan) == [
+        ('OLIDS_MASKED', 'PATIENT'),
+        ('OLIDS_COMMON', 'OBSERVATION'),
+        ('OLIDS_TERMINOLOGY', 'CONCEPT_MAP'),
+    ]
+    patient, observation, concept_map = plan.values()
+    assert patient['columns'] == ['id', 'gender_concept_id']
+    assert patient['completeness'] == [('id', 1.0)]
+    assert patient['concepts'] == [('gender_concept_id', 2.0)]
+    assert patient['keys'] == ['id']
+    # dbt-only completeness on patient_id is left out; the reference uses the source default
+    assert observation['columns'] == ['patient_id', 'lds_start_date_time']
+    assert observation['completeness'] == [('lds_start_date_time', 0.5)]
+    assert observation['references'] == [('patient_id', 'PATIENT', 'id', 0.0)]
+    assert concept_map['columns'] == ['source_code_id']
+    assert concept_map['keys'] == ['source_code_id']
+
+
+def test_plan_dbt_scans_use_dbt_tolerances(tables):
+    observation = check_registry.plan_scans(tables, scope='dbt')[('OLIDS_COMMON', 'OBSERVATION')]
+    assert observation['columns'] == ['patient_id']
+    assert observation['completeness'] == [('patient_id', 1.0)]
+    assert observation['references'] == [('patient_id', 'PATIENT', 'id', 1.0)]
+
+
+def test_compile_base_schema(tables):
+    assert check_registry.compile_schema(tables, SCHEMA) == """version: 2
+models:
+- name: base_olids_patient
+  description: Patients.
+  columns:
+    - name: id
+      description: Patient id.
+      tests:
+        - column_completeness:
+            arguments:
+              tolerance_percent: 1.0
+        - unique
+    - name: gender_concept_id
+      tests:
+        - concept_mapping_integrity:
+            arguments:
+              tolerance_percent: 2.0
+- name: base_olids_observation
+  description: Observations.
+  columns:
+    - name: patient_id
+      tests:
+        - column_completeness:
+            arguments:
+              tolerance_percent: 1.0
+        - referential_integrity:
+            arguments:
+              to: ref('base_olids_patient')
+              field: id
+              tolerance_percent: 1.0
+
+- name: base_olids_concept_map
+  description: Concept map.
+"""
+
+
+def test_compile_stable_schema_keeps_windowed_completeness_and_concepts(tables):
+    schema = SCHEMA.replace('base_olids_', 'stable_')
+    compiled = check_registry.compile_schema(tables, schema, layer='stable')
+    assert """- name: stable_observation
+  description: Observations.
+  columns:
+    - name: patient_id
+      tests:
+        - column_completeness:
+            arguments:
+              tolerance_percent: 1.0
+              incremental_window: true
+
+""" in compiled
+    assert 'referential_integrity' not in compiled
+
+
+def test_compile_schema_is_idempotent(tables):
+    compiled = check_registry.compile_schema(tables, SCHEMA)
+    assert check_registry.compile_schema(tables, compiled) == compiled
+
+
+def test_compile_schema_requires_tested_models(tables):
+    schema = SCHEMA.replace('- name: base_olids_observation\n', '- name: base_olids_other\n')
+    with pytest.raises(ValueError, match='models not in schema: base_olids_observation'):
+        check_registry.compile_schema(tables, schema)
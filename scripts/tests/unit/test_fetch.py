@@ -0,0 +1,59 @@
+"""Unit tests for common.fetch.write_partitioned."""
+
+import gzip
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from common import fetch
+
+
+def batches():
+    """Two unsorted batches, upper-case column names as Snowflake returns them, and a NULL partition."""
+    yield pa.record_batch({
+        'TABLE_NAME': ['OBSERVATION', 'PATIENT', 'OBSERVATION'],
+        'FIELD': ['a/b', 'x', 'a/b'],
+        'VALUE': [1, 2, 3],
+    })
+    yield pa.record_batch({'TABLE_NAME': ['PATIENT'], 'FIELD': [None], 'VALUE': [4]}, schema=pa.schema([
+        ('TABLE_NAME', pa.string()), ('FIELD', pa.string()), ('VALUE', pa.int64()),
+    ]))
+    yield pa.record_batch({'TABLE_NAME': ['OBSERVATION'], 'FIELD': ['a/b'], 'VALUE': [5]})
+
+
+def test_parquet_partitions(tmp_path):
+    rows = fetch.write_partitioned(batches(), tmp_path, ['table_name', 'field'])
+    assert rows == {
+        tmp_path / 'table_name=OBSERVATION' / 'field=a_b': 3,
+        tmp_path / 'table_name=PATIENT' / 'field=x': 1,
+        tmp_path / 'table_name=PATIENT' / 'field=__NULL__': 1,
+    }
+    observation = pq.read_table(tmp_path / 'table_name=OBSERVATION' / 'field=a_b' / 'part-0.parquet')
+    assert observation.column_names == ['VALUE']
+    assert observation['VALUE'].to_pylist() == [1, 3, 5]
+
+    dataset = ds.dataset(tmp_path, format='parquet', partitioning='hive').to_table()
+    assert sorted(zip(dataset['table_name'].to_pylist(), dataset['VALUE'].to_pylist())) == [
+        ('OBSERVATION', 1), ('OBSERVATION', 3), ('OBSERVATION', 5), ('PATIENT', 2), ('PATIENT', 4),
+    ]
+
+
+@pytest.mark.parametrize('file_format, opener', [('csv', open), ('csv.gz', gzip.open)])
+def test_csv_partitions(tmp_path, file_format, opener):
+    # Directory names follow partition_by as given, whatever the case of the column
+    rows = fetch.write_partitioned(batches(), tmp_path, ['Table_Name'], file_format=file_format)
+    assert rows == {tmp_path / 'Table_Name=OBSERVATION': 3, tmp_path / 'Table_Name=PATIENT': 2}
+    with opener(tmp_path / 'Table_Name=PATIENT' / f'part-0.{file_format}', 'rt') as handle:
+        assert handle.read() == 'FIELD,VALUE\n"x",2\n,4\n'
+
+
+def test_empty_input_writes_nothing(tmp_path):
+    assert fetch.write_partitioned(iter([]), tmp_path / 'out', ['table_name']) == {}
+    assert not (tmp_path / 'out').exists()
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unknown format 'json'"):
+        fetch.write_partitioned(batches(), tmp_path, ['table_name'], file_format='json')
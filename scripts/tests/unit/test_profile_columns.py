@@ -0,0 +1,23 @@
+"""Unit tests for the profile query built by profile_columns.py."""
+
+from collections import OrderedDict
+
+import profile_columns
+
+COLUMNS = OrderedDict([('CLINICAL_EFFECTIVE_DATE', 'DATE'), ('RESULT_VALUE_UNITS', 'TEXT')])
+
+
+def test_segmented_query_keeps_top_k_and_histograms_out_of_the_grouping_sets():
+    query = profile_columns.build_profile_query('OLIDS_MASKED', 'OBSERVATION', COLUMNS, True, 2026)
+    segments, overall = query.split('overall AS (')
+    assert 'GROUPING SETS' in segments
+    assert 'APPROX_TOP_K' not in segments and 'c0_h0' not in segments
+    assert 'APPROX_TOP_K(RESULT_VALUE_UNITS' in overall and 'c0_h0' in overall
+    assert 'GROUP BY' not in overall
+    assert 'LEFT JOIN overall ON segments.all_rows = 1' in overall
+
+
+def test_unsegmented_query_is_a_single_aggregate():
+    query = profile_columns.build_profile_query('OLIDS_COMMON', 'CONCEPT', COLUMNS, False, 2026)
+    assert 'GROUP BY' not in query and 'WITH' not in query
+    assert 'APPROX_TOP_K' in query and 'c0_h0' in query
@@ -0,0 +1,27 @@
+"""Unit tests for the approximate referential integrity decision in ri_engine.py."""
+
+import ri_engine
+
+
+def estimate(sampled_orphans, sampled_values):
+    return ri_engine.estimate_orphans({
+        'SAMPLED_FK_VALUES': sampled_values,
+        'SAMPLED_ORPHAN_FK_VALUES': sampled_orphans,
+        'SAMPLED_ROWS': sampled_values,
+        'SAMPLED_ORPHAN_ROWS': sampled_orphans,
+        'APPROX_DISTINCT_FK_VALUES': sampled_values * 10,
+        'TOTAL_ROWS_WITH_FK': sampled_values * 10,
+    }, hll_error=0.0)
+
+
+def test_any_sampled_orphan_is_broken_like_the_exact_check():
+    # 1 in 100,000 is far below the threshold, but it is a real orphan
+    assert ri_engine.classify(estimate(1, 100_000), threshold_pct=1.0) == 'FAIL'
+
+
+def test_clean_sample_passes_when_interval_is_within_threshold():
+    assert ri_engine.classify(estimate(0, 100_000), threshold_pct=1.0) == 'PASS'
+
+
+def test_small_clean_sample_needs_an_exact_check():
+    assert ri_engine.classify(estimate(0, 50), threshold_pct=1.0) == 'EXACT'
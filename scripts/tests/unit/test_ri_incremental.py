@@ -0,0 +1,50 @@
+"""Unit tests for the incremental referential integrity state in ri_incremental.py."""
+
+import pytest
+
+import ri_incremental
+
+duckdb = pytest.importorskip('duckdb')
+
+RELATIONSHIP = {
+    'child_schema': 'S', 'child_table': 'CHILD', 'fk_column': 'PARENT_ID',
+    'parent_schema': 'S', 'parent_table': 'PARENT', 'pk_column': 'ID',
+}
+COLUMNS = {('S', 'CHILD'): {'ID', 'PARENT_ID', 'LDS_START_DATE_TIME'},
+           ('S', 'PARENT'): {'ID', 'LDS_START_DATE_TIME'}}
+
+
+@pytest.fixture
+def conn():
+    con = duckdb.connect()
+    con.execute("CREATE SCHEMA S")
+    con.execute("CREATE TABLE S.PARENT (ID VARCHAR, LDS_START_DATE_TIME TIMESTAMP)")
+    con.execute("CREATE TABLE S.CHILD (ID VARCHAR, PARENT_ID VARCHAR, LDS_START_DATE_TIME TIMESTAMP)")
+    con.execute("INSERT INTO S.PARENT VALUES ('p1', '2026-01-01 09:00')")
+    con.execute("INSERT INTO S.CHILD VALUES ('c1', 'p1', '2026-01-01 10:00'), ('c2', 'x', '2026-01-01 10:00')")
+    return con
+
+
+def run(conn, db):
+    [result] = ri_incremental.run_incremental(conn, [RELATIONSHIP], 'memory', COLUMNS, db)
+    return result
+
+
+def test_rows_loaded_later_at_the_watermark_timestamp_are_checked(conn, tmp_path):
+    db = ri_incremental.open_state(tmp_path / 'ri_state.sqlite')
+    assert run(conn, db)['orphaned_fk'] == 1
+
+    # A later batch carrying the same lds_start_date_time as the watermark
+    conn.execute("INSERT INTO S.CHILD VALUES ('c3', 'y', '2026-01-01 10:00'), ('c4', 'x', '2026-01-01 10:00')")
+    result = run(conn, db)
+    assert result['mode'] == 'incremental'
+    assert result['orphaned_fk'] == 2
+    assert result['new_orphans'] == 1
+
+
+def test_rescanned_watermark_rows_are_not_counted_twice(conn, tmp_path):
+    db = ri_incremental.open_state(tmp_path / 'ri_state.sqlite')
+    run(conn, db)
+    conn.execute("INSERT INTO S.CHILD VALUES ('c3', 'x', '2026-01-01 11:00')")
+    assert run(conn, db)['orphaned_rows'] == 2
+    assert run(conn, db)['orphaned_rows'] == 2
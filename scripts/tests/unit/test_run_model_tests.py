@@ -0,0 +1,100 @@
+"""Unit tests for run_model_tests."""
+
+import sys
+
+import pytest
+
+import run_model_tests
+from run_model_tests import collect_tests, condition_met, evaluate_tests
+
+
+def make_test(kind='column_completeness', tolerance=1.0, severity='ERROR', warn_if='!= 0', error_if='!= 0'):
+    return {
+        'name': f'{kind}_test', 'kind': kind, 'model': 'base_olids_patient', 'column': 'id',
+        'tolerance_percent': tolerance, 'severity': severity, 'warn_if': warn_if, 'error_if': error_if,
+    }
+
+
+@pytest.mark.parametrize('failures, condition, expected', [
+    (0, '!= 0', False),
+    (3, '!= 0', True),
+    (10, '>10', False),
+    (11, ' > 10 ', True),
+    (5, '>=5', True),
+    (4, '<5', True),
+    (5, '==5', True),
+    (5, '<=4', False),
+])
+def test_condition_met(failures, condition, expected):
+    assert condition_met(failures, condition) is expected
+
+
+def test_condition_met_rejects_unsupported_condition():
+    with pytest.raises(ValueError, match='unsupported test condition'):
+        condition_met(1, 'between 1 and 2')
+
+
+def test_evaluate_completeness_within_and_over_tolerance():
+    tests = [make_test(tolerance=1.0), make_test(tolerance=0.5)]
+    row = {'TOTAL_ROWS': 1000, 'NULL_COUNT_1': 10, 'NULL_COUNT_2': 10}
+    within, over = evaluate_tests(tests, row)
+    assert (within['status'], within['failures'], within['failure_pct']) == ('PASS', 0, 1.0)
+    assert (over['status'], over['failures'], over['failure_pct']) == ('FAIL', 10, 1.0)
+
+
+def test_evaluate_key_lookup_uses_distinct_counts():
+    tests = [make_test('referential_integrity', tolerance=0.0)]
+    row = {'TOTAL_ROWS': 1000, 'DISTINCT_1': 200, 'FAILED_DISTINCT_1': 2}
+    [result] = evaluate_tests(tests, row)
+    assert (result['status'], result['failures'], result['failure_pct']) == ('FAIL', 2, 1.0)
+
+
+def test_evaluate_severity_and_conditions():
+    row = {'TOTAL_ROWS': 100, 'NULL_COUNT_1': 20}
+    assert evaluate_tests([make_test(tolerance=0.0, severity='WARN')], row)[0]['status'] == 'WARN'
+    assert evaluate_tests([make_test(tolerance=0.0, error_if='>50')], row)[0]['status'] == 'WARN'
+    assert evaluate_tests([make_test(tolerance=0.0, error_if='>50', warn_if='>50')], row)[0]['status'] == 'PASS'
+
+
+def test_evaluate_empty_model_passes():
+    row = {'TOTAL_ROWS': 0, 'NULL_COUNT_1': 0}
+    [result] = evaluate_tests([make_test(tolerance=0.0)], row)
+    assert (result['status'], result['failure_pct']) == ('PASS', 0.0)
+
+
+def completeness_node(unique_id, column, where=None):
+    return {
+        'unique_id': unique_id, 'name': unique_id.split('.')[-1], 'resource_type': 'test',
+        'attached_node': 'model.olids.base_olids_patient', 'column_name': column,
+        'config': {'enabled': True, 'where': where},
+        'test_metadata': {'name': 'column_completeness', 'kwargs': {'column_name': column}},
+    }
+
+
+MANIFEST = {'nodes': {
+    'model.olids.base_olids_patient': {
+        'resource_type': 'model', 'name': 'base_olids_patient', 'relation_name': 'DEV.OLIDS_BASE.PATIENT',
+    },
+    'test.olids.id_all': completeness_node('test.olids.id_all', 'id'),
+    'test.olids.id_recent': completeness_node('test.olids.id_recent', 'id', "lds_start_date_time > '2024-01-01'"),
+    'test.olids.sk_recent': completeness_node('test.olids.sk_recent', 'sk_patient_id', "lds_start_date_time > '2024-01-01'"),
+}}
+
+
+def test_collect_tests_groups_by_model_and_where():
+    groups = collect_tests(MANIFEST)
+    model_id = 'model.olids.base_olids_patient'
+    assert [(key, [t['name'] for t in tests]) for key, tests in groups.items()] == [
+        ((model_id, None), ['id_all']),
+        ((model_id, "lds_start_date_time > '2024-01-01'"), ['id_recent', 'sk_recent']),
+    ]
+
+
+def test_show_sql_keeps_one_query_per_where_clause(monkeypatch, capsys):
+    monkeypatch.setattr(run_model_tests.lineage, 'load_manifest', lambda path: MANIFEST)
+    monkeypatch.setattr(sys, 'argv', ['run_model_tests.py', '--show-sql'])
+    run_model_tests.main()
+    output = capsys.readouterr().out
+    assert output.count('FROM DEV.OLIDS_BASE.PATIENT') == 2
+    assert "-- base_olids_patient (where lds_start_date_time > '2024-01-01')" in output
+    assert "    WHERE lds_start_date_time > '2024-01-01'" in output
@@ -0,0 +1,56 @@
+"""Unit tests for sql_splitter."""
+
+from sql_splitter import join_statements, mask_literals, split_statements, unmask_literals
+
+
+def test_split_on_top_level_semicolons():
+    assert split_statements('SELECT 1; SELECT 2;') == ['SELECT 1', 'SELECT 2']
+
+
+def test_split_ignores_semicolons_in_literals_and_comments():
+    sql = (
+        "SELECT 'a;b', \"c;d\" -- e;f\n"
+        "/* g; h */ FROM t;\n"
+        "EXECUTE IMMEDIATE $$ SELECT 1; SELECT 2; $$;\n"
+        "SELECT 'it''s;', 'x\\';y'"
+    )
+    assert split_statements(sql) == [
+        "SELECT 'a;b', \"c;d\" -- e;f\n/* g; h */ FROM t",
+        'EXECUTE IMMEDIATE $$ SELECT 1; SELECT 2; $$',
+        "SELECT 'it''s;', 'x\\';y'",
+    ]
+
+
+def test_split_drops_comment_only_fragments():
+    sql = '-- header;\nSELECT 1;\n/* trailing */;\n-- end'
+    assert split_statements(sql) == ['-- header;\nSELECT 1']
+
+
+def test_split_keeps_unterminated_last_statement():
+    assert split_statements('SELECT 1;\nSELECT 2\n') == ['SELECT 1', 'SELECT 2']
+
+
+def test_join_survives_trailing_line_comment():
+    statements = ['SELECT 1 -- c', 'SELECT 2']
+    assert split_statements(join_statements(statements)) == statements
+
+
+def test_join_round_trips_split():
+    sql = "SET x = 'a;b';\n-- note\nSELECT $x // why;\n;SELECT 3 /* done */"
+    statements = split_statements(sql)
+    assert len(statements) == 3
+    assert split_statements(join_statements(statements)) == statements
+
+
+def test_mask_literals_replaces_strings_and_drops_comments():
+    sql = "SELECT 'a--b', $$x$$, \"Col\" -- note\nFROM t /* c */"
+    masked, literals = mask_literals(sql)
+    assert masked == 'SELECT \x000\x00, \x001\x00, "Col" \nFROM t  '
+    assert literals == ["'a--b'", '$$x$$']
+
+
+def test_unmask_literals_restores_masked_text():
+    sql = "SELECT 'x', 'y' FROM t"
+    masked, literals = mask_literals(sql)
+    assert masked == 'SELECT \x000\x00, \x001\x00 FROM t'
+    assert unmask_literals(masked.upper(), literals) == "SELECT 'x', 'y' FROM T"
@@ -5,29 +5,24 @@ Uses SNOWFLAKE_ROLE from .env to access the alpha database.
 """
 
 import os
+import sys
+from pathlib import Path
 import json
 from datetime import datetime
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection
+
 # Load environment variables
 load_dotenv()
 
 # Database to query (quoted mixed case)
 DATABASE = '"NCL_Data_Store_OLIDS_Alpha"'
 
-# Create Snowflake session with SSO
-connection_parameters = {
-    "account": os.getenv("SNOWFLAKE_ACCOUNT"),
-    "user": os.getenv("SNOWFLAKE_USER"),
-    "authenticator": "externalbrowser",  # SSO
-    "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
-    "role": os.getenv("SNOWFLAKE_ROLE"),
-}
-
 print("Connecting to Snowflake...")
-session = Session.builder.configs(connection_parameters).create()
+session = connection.get_session()
 print(f"Connected as {session.get_current_user()}")
 print(f"Querying database: {DATABASE}\n")
 
@@ -0,0 +1,349 @@
+"""
+Generate synthetic OLIDS source data as Parquet, driven by models/sources.yml.
+
+Every table declared in sources.yml is written with its declared column names
+and types, so the output can stand in for the source databases when running
+scripts/tests/run_tests.py --backend duckdb or the local dbt benchmarks.
+
+The data is shaped to behave like OLIDS at volume:
+- Foreign keys (<table>_id) reference generated parent ids with skewed fan-out
+- person_id follows patient_id, matching PATIENT_PERSON
+- *_concept_id values follow a Zipf distribution over CONCEPT/CONCEPT_MAP
+- Controllable orphan (FK/concept not in parent) and NULL rates
+- lds_start_date_time/date_recorded spread over a configurable window of days
+
+Ids are a pure function of (table, row index), so parent ids never need to be
+held in memory. Rows are generated and written one row group at a time, so
+peak memory is bounded by --row-group-size regardless of --scale.
+
+Output layout (matches the duckdb backend):
+    <output>/<SCHEMA>/<TABLE>/part-00000.parquet
+
+Usage (from repo root):
+    python scripts/utils/generate_synthetic_data.py --output ./synthetic --scale 1
+    python scripts/utils/generate_synthetic_data.py --output ./synthetic --scale 100 --tables OBSERVATION PATIENT
+"""
+
+import argparse
+import zlib
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+
+SOURCES_FILE = "models/sources.yml"
+
+# Rows per table at --scale 1 (roughly a 10k-patient practice group).
+# Tables not listed are small reference tables with a fixed size.
+BASE_ROWS = {
+    "PATIENT": 10_000,
+    "PERSON": 10_000,
+    "PATIENT_PERSON": 10_000,
+    "PATIENT_ADDRESS": 12_000,
+    "PATIENT_CONTACT": 12_000,
+    "PATIENT_UPRN": 10_000,
+    "PATIENT_HASH": 10_000,
+    "PATIENT_REGISTERED_PRACTITIONER_IN_ROLE": 12_000,
+    "EPISODE_OF_CARE": 12_000,
+    "OBSERVATION": 1_000_000,
+    "MEDICATION_ORDER": 300_000,
+    "MEDICATION_STATEMENT": 50_000,
+    "ENCOUNTER": 200_000,
+    "APPOINTMENT": 100_000,
+    "APPOINTMENT_PRACTITIONER": 100_000,
+    "DIAGNOSTIC_ORDER": 50_000,
+    "ALLERGY_INTOLERANCE": 5_000,
+    "PROCEDURE_REQUEST": 10_000,
+    "REFERRAL_REQUEST": 10_000,
+    "FLAG": 2_000,
+}
+FIXED_ROWS = {
+    "CONCEPT": 20_000,
+    "CONCEPT_MAP": 20_000,
+    "ORGANISATION": 60,
+    "OrganisationMatrixPracticeView": 60,
+    "PRACTITIONER": 500,
+    "PRACTITIONER_IN_ROLE": 600,
+    "LOCATION": 100,
+    "LOCATION_CONTACT": 100,
+    "SCHEDULE": 2_000,
+    "SCHEDULE_PRACTITIONER": 2_000,
+}
+DEFAULT_FIXED_ROWS = 1_000
+
+# FK columns whose prefix is not the parent table name
+FK_ALIASES = {
+    "registered_practice": "ORGANISATION",
+    "service_provider_organisation": "ORGANISATION",
+    "requester_organisation": "ORGANISATION",
+    "recipient_organisation": "ORGANISATION",
+    "managing_organisation": "ORGANISATION",
+    "parent_organisation": "ORGANISATION",
+    "parent_observation": "OBSERVATION",
+}
+
+ARROW_TYPES = {
+    "TEXT": pa.string(),
+    "NUMBER": pa.int64(),
+    "FLOAT": pa.float64(),
+    "BOOLEAN": pa.bool_(),
+    "DATE": pa.date32(),
+    "TIMESTAMP_NTZ": pa.timestamp("us"),
+    "BINARY": pa.binary(),
+}
+
+# Share of practices inside the NCL/WNL STP codes used by int_wnl_practices
+IN_AREA_STP_CODES = ["Z9B2Z", "QMJ", "QRV"]
+IN_AREA_PRACTICE_SHARE = 0.8
+
+CLINICAL_HISTORY_DAYS = 20 * 365
+
+
+def load_source_tables(path: str) -> list:
+    """Return [(schema, table, [(column, data_type)])] for every declared source table."""
+    with open(path, "r") as f:
+        data = yaml.safe_load(f)
+
+    tables = []
+    for source in data.get("sources", []):
+        schema = source.get("schema", "").strip('"')
+        for table in source.get("tables", []):
+            columns = [
+                (col["name"], col.get("data_type", "TEXT").split("(")[0].upper())
+                for col in table.get("columns", [])
+            ]
+            tables.append((schema, table["name"], columns))
+    return tables
+
+
+def table_code(table: str) -> int:
+    """Stable 32-bit code for a table, used as the id namespace."""
+    return zlib.crc32(table.upper().encode("utf-8")) & 0xFFFFFFFF
+
+
+def make_ids(table: str, indices: np.ndarray) -> list:
+    """Deterministic UUID-shaped ids for row indices of a table."""
+    code = table_code(table)
+    return [f"{code:08x}-0000-4000-8000-{int(i):012x}" for i in indices]
+
+
+def practice_codes(indices: np.ndarray) -> list:
+    """ODS-style practice codes for practice indices."""
+    return [f"P{int(i):05d}" for i in indices]
+
+
+def parent_table(column: str, row_counts: dict):
+    """Return the parent table for an FK column, or None if it is not a generated FK."""
+    name = column.lower()
+    if not name.endswith("_id") or name == "id":
+        return None
+    prefix = name[:-3]
+    parent = FK_ALIASES.get(prefix, prefix.upper())
+    return parent if parent in row_counts else None
+
+
+def skewed_indices(rng, size: int, n_parent: int, skew: float) -> np.ndarray:
+    """Parent indices with long-tailed fan-out: low indices receive many more children."""
+    return np.minimum((n_parent * rng.random(size) ** skew).astype(np.int64), n_parent - 1)
+
+
+def with_orphans(rng, indices: np.ndarray, n_parent: int, orphan_rate: float) -> np.ndarray:
+    """Replace a share of indices with ones beyond the parent table (never generated)."""
+    orphan = rng.random(len(indices)) < orphan_rate
+    indices = indices.copy()
+    indices[orphan] = n_parent + rng.integers(0, max(n_parent, 1), orphan.sum())
+    return indices
+
+
+def timestamps(rng, size: int, end: datetime, days: int) -> np.ndarray:
+    """Timestamps spread uniformly over the `days` before `end`."""
+    seconds = rng.integers(0, days * 86_400, size)
+    return np.datetime64(end, "us") - seconds.astype("timedelta64[s]")
+
+
+def column_values(rng, table: str, name: str, dtype: str, row_indices: np.ndarray,
+                  patient_indices, row_counts: dict, args):
+    """Generate one column of a row group."""
+    size = len(row_indices)
+    lower = name.lower()
+    end = datetime.combine(args.end_date, datetime.min.time())
+
+    # Id, FK and concept rules only apply to OLIDS-style TEXT (UUID) keys
+    is_key = dtype == "TEXT"
+
+    if is_key and lower == "id":
+        return make_ids(table, row_indices)
+    if is_key and table == "CONCEPT_MAP" and lower in ("source_code_id", "target_code_id"):
+        return make_ids("CONCEPT", row_indices % row_counts["CONCEPT"])
+    if is_key and lower.endswith("_concept_id"):
+        # Zipf-distributed so a few concepts dominate, as in real coding
+        n_concepts = row_counts.get("CONCEPT", FIXED_ROWS["CONCEPT"])
+        indices = (rng.zipf(args.concept_skew, size) - 1) % n_concepts
+        return make_ids("CONCEPT", with_orphans(rng, indices, n_concepts, args.orphan_rate))
+
+    parent = parent_table(name, row_counts) if is_key else None
+    if parent in ("PATIENT", "PERSON") and patient_indices is not None:
+        # person_id follows patient_id, as PATIENT_PERSON links them 1:1 here
+        return make_ids(parent, patient_indices)
+    if parent:
+        n_parent = row_counts[parent]
+        indices = skewed_indices(rng, size, n_parent, args.fanout_skew)
+        return make_ids(parent, with_orphans(rng, indices, n_parent, args.orphan_rate))
+
+    n_practices = row_counts.get("ORGANISATION", FIXED_ROWS["ORGANISATION"])
+    if lower in ("organisation_code", "practicecode") and table in ("ORGANISATION", "OrganisationMatrixPracticeView"):
+        return practice_codes(row_indices % n_practices)
+    if lower == "record_owner_organisation_code":
+        return practice_codes(skewed_indices(rng, size, n_practices, args.fanout_skew))
+    if lower == "stpcode":
+        in_area = rng.random(size) < IN_AREA_PRACTICE_SHARE
+        return [IN_AREA_STP_CODES[i % len(IN_AREA_STP_CODES)] if ok else "Q0000" for i, ok in zip(row_indices, in_area)]
+    if lower == "sk_patient_id":
+        sk_patient_ids = (patient_indices if patient_indices is not None else row_indices) + 1
+        return sk_patient_ids if dtype == "NUMBER" else [str(v) for v in sk_patient_ids]
+    if lower == "birth_year" and dtype == "NUMBER":
+        return rng.integers(1920, args.end_date.year, size)
+    if lower in ("birth_month", "death_month") and dtype == "NUMBER":
+        return rng.integers(1, 13, size)
+    if lower in ("lds_start_date_time", "date_recorded") and dtype == "TIMESTAMP_NTZ":
+        # Recently loaded/recorded, so freshness checks see current data
+        return timestamps(rng, size, end, args.days)
+
+    if dtype == "BOOLEAN":
+        # Flags such as is_confidential/is_spine_sensitive are rarely set
+        return rng.random(size) < (0.02 if lower.startswith(("is_", "lds_is_")) else 0.5)
+    if dtype == "NUMBER":
+        return rng.integers(0, 1_000_000, size)
+    if dtype == "FLOAT":
+        return rng.normal(50.0, 15.0, size)
+    if dtype == "TIMESTAMP_NTZ":
+        return timestamps(rng, size, end, CLINICAL_HISTORY_DAYS)
+    if dtype == "DATE":
+        return timestamps(rng, size, end, CLINICAL_HISTORY_DAYS).astype("datetime64[D]")
+    if dtype == "BINARY":
+        return [bytes(b) for b in rng.integers(0, 256, (size, 32), dtype=np.uint8)]
+    # Categorical-looking text with a modest vocabulary
+    return [f"{lower}_{int(v)}" for v in rng.integers(0, 100, size)]
+
+
+def build_row_group(table: str, columns: list, arrow_schema: pa.Schema, start: int, stop: int,
+                    row_counts: dict, args) -> pa.Table:
+    """Build rows [start, stop) of a table as an Arrow table."""
+    # Seed per (table, row group) so output is reproducible and order-independent
+    rng = np.random.default_rng([args.seed, table_code(table), start])
+    row_indices = np.arange(start, stop, dtype=np.int64)
+    size = len(row_indices)
+
+    patient_indices = None
+    n_patients = row_counts.get("PATIENT", BASE_ROWS["PATIENT"])
+    if table in ("PATIENT", "PERSON"):
+        patient_indices = row_indices
+    elif table == "PATIENT_PERSON":
+        patient_indices = row_indices % n_patients
+    elif any(name.lower() in ("patient_id", "person_id") for name, _ in columns):
+        indices = skewed_indices(rng, size, n_patients, args.fanout_skew)
+        patient_indices = with_orphans(rng, indices, n_patients, args.orphan_rate)
+
+    arrays = []
+    for (name, dtype), field in zip(columns, arrow_schema):
+        values = column_values(rng, table, name, dtype, row_indices, patient_indices, row_counts, args)
+        mask = None
+        if name.lower() != "id" and args.null_rate > 0:
+            mask = rng.random(size) < args.null_rate
+        arrays.append(pa.array(values, type=field.type, mask=mask))
+
+    return pa.Table.from_arrays(arrays, schema=arrow_schema)
+
+
+def write_table(output_dir: Path, schema: str, table: str, columns: list, row_counts: dict, args) -> int:
+    """Stream a table to Parquet part files one row group at a time. Returns the file count."""
+    table_dir = output_dir / schema / table
+    table_dir.mkdir(parents=True, exist_ok=True)
+    for old_part in table_dir.glob("part-*.parquet"):
+        old_part.unlink()
+
+    arrow_schema = pa.schema([(name, ARROW_TYPES.get(dtype, pa.string())) for name, dtype in columns])
+    n_rows = row_counts[table]
+    writer = None
+    part = 0
+    rows_in_part = 0
+    try:
+        for start in range(0, n_rows, args.row_group_size):
+            stop = min(start + args.row_group_size, n_rows)
+            if writer is None or rows_in_part >= args.rows_per_file:
+                if writer is not None:
+                    writer.close()
+                    part += 1
+                writer = pq.ParquetWriter(table_dir / f"part-{part:05d}.parquet", arrow_schema, compression="zstd")
+                rows_in_part = 0
+            writer.write_table(build_row_group(table, columns, arrow_schema, start, stop, row_counts, args))
+            rows_in_part += stop - start
+    finally:
+        if writer is not None:
+            writer.close()
+    return part + 1
+
+
+def resolve_row_counts(tables: list, scale: float) -> dict:
+    """Rows per table: population tables scale, reference tables stay fixed."""
+    counts = {}
+    for _, table, _ in tables:
+        if table in BASE_ROWS:
+            counts[table] = max(1, int(BASE_ROWS[table] * scale))
+        else:
+            counts[table] = FIXED_ROWS.get(table, DEFAULT_FIXED_ROWS)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic OLIDS source data as Parquet")
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Output directory")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Volume multiplier (1 = ~1M observations, 100 = ~100M)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible output")
+    parser.add_argument("--tables", nargs="+", help="Only generate these tables (default: all in sources.yml)")
+    parser.add_argument("--null-rate", type=float, default=0.002, help="Share of NULLs in non-id columns")
+    parser.add_argument("--orphan-rate", type=float, default=0.005,
+                        help="Share of FK and concept values that reference no parent row")
+    parser.add_argument("--concept-skew", type=float, default=1.3,
+                        help="Zipf exponent for concept frequencies (higher = more skewed)")
+    parser.add_argument("--fanout-skew", type=float, default=2.0,
+                        help="Skew of child rows per parent (1 = uniform)")
+    parser.add_argument("--days", type=int, default=3,
+                        help="Spread of lds_start_date_time and date_recorded in days before --end-date")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Latest generated timestamp (YYYY-MM-DD, default: today). Fix it for byte-identical output")
+    parser.add_argument("--row-group-size", type=int, default=250_000,
+                        help="Rows generated and held in memory at once")
+    parser.add_argument("--rows-per-file", type=int, default=10_000_000, help="Rows per Parquet part file")
+    args = parser.parse_args()
+
+    print("Loading sources.yml...")
+    tables = load_source_tables(SOURCES_FILE)
+    row_counts = resolve_row_counts(tables, args.scale)
+
+    selected = tables
+    if args.tables:
+        wanted = {t.upper() for t in args.tables}
+        selected = [t for t in tables if t[1].upper() in wanted]
+        missing = wanted - {t[1].upper() for t in selected}
+        if missing:
+            print(f"WARNING: Not in sources.yml: {', '.join(sorted(missing))}")
+
+    print(f"Generating {len(selected)} tables at scale {args.scale} (seed {args.seed}) into {args.output}\n")
+    total_rows = 0
+    for schema, table, columns in selected:
+        started = datetime.now()
+        parts = write_table(args.output, schema, table, columns, row_counts, args)
+        elapsed = (datetime.now() - started).total_seconds()
+        total_rows += row_counts[table]
+        print(f"  ✓ {schema}.{table}: {row_counts[table]:,} rows in {parts} file(s) ({elapsed:.1f}s)")
+
+    print(f"\nGenerated {total_rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,19 @@ Query Snowflake information schema to discover table structures.
 Uses SSO authentication from .env file.
 """
 
-import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection
+
 # Load environment variables
 load_dotenv()
 
-# Create Snowflake session with SSO
-connection_parameters = {
-    "account": os.getenv("SNOWFLAKE_ACCOUNT"),
-    "user": os.getenv("SNOWFLAKE_USER"),
-    "authenticator": "externalbrowser",  # SSO
-    "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
-    "role": os.getenv("SNOWFLAKE_ROLE"),
-}
-
 print("Connecting to Snowflake...")
-session = Session.builder.configs(connection_parameters).create()
+session = connection.get_session()
 print(f"Connected as {session.get_current_user()}")
 
 # Databases and schemas to query
@@ -4,11 +4,16 @@ Identifies missing, extra, and type-mismatched columns per source table.
 """
 
 import os
+import sys
 import yaml
 from collections import defaultdict
 from dotenv import load_dotenv
+from pathlib import Path
 from snowflake.snowpark import Session
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import connection
+
 load_dotenv()
 
 SOURCES_FILE = "models/sources.yml"
@@ -100,17 +105,7 @@ def main():
     print(f"Found {len(sources)} source tables\n")
 
     print("Connecting to Snowflake...")
-    authenticator = os.getenv("SNOWFLAKE_AUTHENTICATOR", "externalbrowser")
-    sf_config = {
-        "account": os.getenv("SNOWFLAKE_ACCOUNT"),
-        "user": os.getenv("SNOWFLAKE_USER"),
-        "authenticator": authenticator,
-        "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
-        "role": os.getenv("SNOWFLAKE_ROLE"),
-    }
-    if authenticator != "externalbrowser" and os.getenv("SNOWFLAKE_PASSWORD"):
-        sf_config["password"] = os.getenv("SNOWFLAKE_PASSWORD")
-    session = Session.builder.configs(sf_config).create()
+    session = connection.get_session()
     print(f"Connected as {session.get_current_user()}\n")
 
     issues_found = 0